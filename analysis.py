@@ -4,6 +4,7 @@ from prototype import *
 from intervalUtils import *
 from circuitModels import InverterLoopMosfet
 from funCompUtils import *
+from continuation import schmittTriggerSweep
 
 def analyzeSchmittTrigger():
 	inputVoltages = np.linspace(0.35, 0.55, 50)
@@ -59,16 +60,15 @@ def schmittTriggerHysteresis():
 	inputVoltages = np.linspace(0.0, 1.8, 50)
 	inDrawVoltages = []
 	outDrawVoltages = []
+	statVars = {}
+	#allSolutions = schmittTriggerSweep("scMosfet", inputVoltages, statVars)
+	allSolutions = schmittTriggerSweep("lcMosfet", inputVoltages, statVars)
+	print ("numFullSearches", statVars['numFullSearches'], "numTracked", statVars['numTracked'])
 	for i in range(len(inputVoltages)):
-		statVars = {}
 		inputVoltage = inputVoltages[i]
 		print ("inputVoltage", inputVoltage)
-		#modelParam = [1.0] #Vdd
-		#model = SchmittMosfet(modelType = "scMosfet", modelParam = modelParam, inputVoltage = inputVoltage)
-		modelParam = [-0.4, 0.4, 1.8, 270*1e-6, -90*1e-6, 8/3.0]
-		model = SchmittMosfet(modelType = "lcMosfet", modelParam = modelParam, inputVoltage = inputVoltage)
-		allHypers = []
-		solverLoopNoLp(allHypers, model)
+		model = schmittModel("lcMosfet", inputVoltage)
+		allHypers = allSolutions[i]
 	
 		for hyper in allHypers:
 			exampleVolt = (hyper[:,0] + hyper[:,1])/2.0
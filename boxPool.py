@@ -0,0 +1,59 @@
+# Pool of hyperrectangles kept in one growable (capacity,n,2) float64 buffer.
+# A hyperrectangle in the pool is referred to by its slot, the index of its row
+# in the buffer. Freed slots are reused by the next allocations, so a solver loop
+# that frees the hyperrectangles it pops and allocates their halves keeps
+# reusing the same rows instead of creating a new array for every hyperrectangle.
+# The buffer is reallocated when it is full, so a view returned by box is only
+# valid until the next call to alloc or bisectMax
+
+import numpy as np
+
+
+class BoxPool:
+	# @param numV number of dimensions of the hyperrectangles
+	# @param capacity number of hyperrectangles the buffer holds before it is grown
+	def __init__(self, numV, capacity=1024):
+		self.numV = numV
+		self.boxes = np.zeros((max(capacity, 1), numV, 2))
+		# slots that were freed and can be allocated again
+		self.freeSlots = []
+		# slots at and above numSlots have never been allocated
+		self.numSlots = 0
+
+	# number of allocated slots
+	def __len__(self):
+		return self.numSlots - len(self.freeSlots)
+
+	# Allocate a slot and copy hyper into it if given
+	# @return the slot
+	def alloc(self, hyper=None):
+		if len(self.freeSlots) > 0:
+			slot = self.freeSlots.pop()
+		else:
+			if self.numSlots == self.boxes.shape[0]:
+				self.boxes = np.concatenate((self.boxes, np.zeros(self.boxes.shape)))
+			slot = self.numSlots
+			self.numSlots += 1
+		if hyper is not None:
+			self.boxes[slot] = hyper
+		return slot
+
+	def free(self, slot):
+		self.freeSlots.append(slot)
+
+	# Return a (n,2) view of the hyperrectangle in slot
+	def box(self, slot):
+		return self.boxes[slot]
+
+	# Bisect the hyperrectangle in slot at its longest dimension as
+	# prototype.bisectMax does. The left half is written to slot
+	# and the right half to a new slot
+	# @return (slot, rSlot) the slots of the left and right halves
+	def bisectMax(self, slot):
+		rSlot = self.alloc(self.boxes[slot])
+		hyper = self.boxes[slot]
+		bisectIndex = np.argmax(hyper[:,1] - hyper[:,0])
+		midVal = (hyper[bisectIndex,0] + hyper[bisectIndex,1])/2.0
+		hyper[bisectIndex,1] = midVal
+		self.boxes[rSlot,bisectIndex,0] = midVal
+		return slot, rSlot
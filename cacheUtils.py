@@ -0,0 +1,134 @@
+# Bounded memoization caches used by the transistor and circuit models.
+# Each cache keeps its entries in least recently used order and evicts the
+# least recently used entries once the estimated size of the entries
+# exceeds a limit in bytes. Keys are built with cacheKey from the raw bytes
+# of the voltages which is cheaper than building tuples of floats
+
+import collections
+import struct
+import sys
+import numpy as np
+
+# Default size limit of a cache in bytes
+DEFAULT_CACHE_BYTES = 16*1024*1024
+
+# Estimate of the memory used by a numpy array apart from its data
+ARRAY_OVERHEAD = sys.getsizeof(np.zeros((0)))
+
+# Tags used by cacheKey so that different values never get the same key
+FLOAT_TAG = 0
+ARRAY_TAG = 1
+LIST_TAG = 2
+STRING_TAG = 3
+FLOAT_STRUCT = struct.Struct("<Bd")
+
+
+class LRUCache:
+	# @param maxBytes size limit of the entries in bytes
+	def __init__(self, maxBytes=DEFAULT_CACHE_BYTES):
+		self.maxBytes = maxBytes
+		self.entries = collections.OrderedDict()
+		self.numBytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __contains__(self, key):
+		return key in self.entries
+
+	# Return the value stored for key or default if there is none.
+	# A hit makes key the most recently used entry
+	def get(self, key, default=None):
+		entry = self.entries.get(key)
+		if entry is None:
+			self.misses += 1
+			return default
+		if hasattr(self.entries, "move_to_end"):
+			self.entries.move_to_end(key)
+		else:
+			self.entries[key] = self.entries.pop(key)
+		self.hits += 1
+		return entry[0]
+
+	# Store value for key and evict least recently used entries
+	# until the entries fit in maxBytes
+	def put(self, key, value):
+		oldEntry = self.entries.pop(key, None)
+		if oldEntry is not None:
+			self.numBytes -= oldEntry[1]
+		entryBytes = sys.getsizeof(key) + valueBytes(value)
+		self.entries[key] = (value, entryBytes)
+		self.numBytes += entryBytes
+		while self.numBytes > self.maxBytes and len(self.entries) > 0:
+			oldKey, oldEntry = self.entries.popitem(last=False)
+			self.numBytes -= oldEntry[1]
+			self.evictions += 1
+
+	def clear(self):
+		self.entries.clear()
+		self.numBytes = 0
+
+
+# Estimate of the memory used by a cached value
+def valueBytes(value):
+	if isinstance(value, np.ndarray):
+		return ARRAY_OVERHEAD + value.nbytes
+	return sys.getsizeof(value)
+
+# Return a bytes key for the given values. The values can be floats,
+# strings, numpy arrays and lists or tuples of those. A point and an
+# interval get different keys
+def cacheKey(*values):
+	return b"".join([keyBytes(value) for value in values])
+
+# Headers written by keyBytes for arrays and strings, by shape and by string
+arrayHeaders = {}
+stringKeys = {}
+
+def keyBytes(value):
+	if isinstance(value, np.ndarray):
+		if value.dtype != np.float64:
+			value = value.astype(np.float64)
+		header = arrayHeaders.get(value.shape)
+		if header is None:
+			header = struct.pack("<BB" + "I"*value.ndim, ARRAY_TAG, value.ndim, *value.shape)
+			arrayHeaders[value.shape] = header
+		return header + value.tobytes()
+	if isinstance(value, (list, tuple)):
+		return struct.pack("<BI", LIST_TAG, len(value)) + b"".join([keyBytes(item) for item in value])
+	if isinstance(value, str):
+		stringKey = stringKeys.get(value)
+		if stringKey is None:
+			stringBytes = value.encode("utf-8")
+			stringKey = struct.pack("<BI", STRING_TAG, len(stringBytes)) + stringBytes
+			stringKeys[value] = stringKey
+		return stringKey
+	return FLOAT_STRUCT.pack(FLOAT_TAG, value)
+
+# Return the caches used by model. Models built on a circuit.Circuit
+# keep it in model.c
+def modelCaches(model):
+	circuit = getattr(model, "c", None)
+	if circuit is None or not(hasattr(circuit, "caches")):
+		return []
+	return circuit.caches()
+
+# Return the total number of hits, misses and evictions of the caches of model
+def cacheCounts(model):
+	hits, misses, evictions = 0, 0, 0
+	for cache in modelCaches(model):
+		hits += cache.hits
+		misses += cache.misses
+		evictions += cache.evictions
+	return (hits, misses, evictions)
+
+# Add the hits, misses and evictions of the caches of model since
+# cacheCounts returned countsBefore to statVars
+def addCacheCounts(statVars, model, countsBefore):
+	hits, misses, evictions = cacheCounts(model)
+	statVars['numCacheHits'] += hits - countsBefore[0]
+	statVars['numCacheMisses'] += misses - countsBefore[1]
+	statVars['numCacheEvictions'] += evictions - countsBefore[2]
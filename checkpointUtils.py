@@ -0,0 +1,115 @@
+# Checkpoints of the serial solver loops. A checkpoint holds everything
+# solverLoop and solverLoopNoLp need to continue a search: the hyperrectangles
+# still in the frontier as an (m,n,2) array in the order they are popped, the
+# hyperrectangles containing unique solutions found so far as a (k,n,2) array
+# and the numeric entries of statVars. It is written to a single .npz file
+# together with the signature of the problem it belongs to, so that a search
+# is not resumed from the checkpoint of another problem with the same number
+# of variables. The trace in statVars['stringHyperList'] is not saved
+
+import os
+import time
+import numpy as np
+
+
+# Attributes of the models that define the problem they describe
+SIGNATURE_ATTRIBUTES = ["modelType", "modelParam", "g_cc", "g_fwd", "inputVoltage", "bounds"]
+
+# Return a string identifying the problem a solver loop is solving: the class
+# of the model, the attributes in SIGNATURE_ATTRIBUTES that it has and the
+# solver options that change the search
+# @param useLp True for solverLoop and False for solverLoopNoLp
+def problemSignature(model, useLp, kAlpha, epsilonInflation):
+	signature = [("model", type(model).__name__)]
+	for name in SIGNATURE_ATTRIBUTES:
+		if hasattr(model, name):
+			signature.append((name, np.asarray(getattr(model, name)).tolist()))
+	signature += [("useLp", bool(useLp)), ("kAlpha", float(kAlpha)), ("epsilonInflation", float(epsilonInflation))]
+	return repr(signature)
+
+# Return the hyperrectangles in hypers as a (len(hypers),numV,2) array
+def stackHypers(hypers, numV):
+	if len(hypers) == 0:
+		return np.zeros((0, numV, 2))
+	return np.array([np.asarray(hyper, dtype=np.float64) for hyper in hypers])
+
+# Write a checkpoint to filename. The checkpoint is first written to a
+# temporary file which is then renamed, so a run killed while writing
+# leaves the previous checkpoint intact
+# @param filename name of the checkpoint file
+# @param frontierHypers hyperrectangles still to be processed, in the order they are popped
+# @param uniqueHypers hyperrectangles containing unique solutions
+# @param statVars statistics of the solver. Only the int and float entries are saved
+# @param numV number of variables of the model
+# @param signature problemSignature of the problem being solved
+def saveCheckpoint(filename, frontierHypers, uniqueHypers, statVars, numV, signature):
+	intNames, intValues, floatNames, floatValues = [], [], [], []
+	for key in sorted(statVars.keys()):
+		value = statVars[key]
+		if isinstance(value, bool):
+			continue
+		if isinstance(value, (int, np.integer)):
+			intNames.append(key)
+			intValues.append(value)
+		elif isinstance(value, (float, np.floating)):
+			floatNames.append(key)
+			floatValues.append(value)
+
+	tmpFilename = filename + ".tmp"
+	with open(tmpFilename, "wb") as checkpointFile:
+		np.savez(checkpointFile,
+			frontier=stackHypers(frontierHypers, numV),
+			solutions=stackHypers(uniqueHypers, numV),
+			intNames=np.array(intNames, dtype=str), intValues=np.array(intValues, dtype=np.int64),
+			floatNames=np.array(floatNames, dtype=str), floatValues=np.array(floatValues, dtype=np.float64),
+			signature=np.array(signature), savedAt=np.array(time.time()))
+	os.rename(tmpFilename, filename)
+
+# Read a checkpoint written by saveCheckpoint
+# @param filename name of the checkpoint file
+# @param numV number of variables of the model the checkpoint is resumed with
+# @return (frontierHypers, uniqueHypers, stats, signature) where frontierHypers and
+#	uniqueHypers are lists of (numV,2) arrays, stats is a dictionary of the saved statVars
+#	entries and signature is the problemSignature saved or None for older checkpoints
+def loadCheckpoint(filename, numV):
+	checkpoint = np.load(filename)
+	try:
+		frontier = checkpoint["frontier"]
+		solutions = checkpoint["solutions"]
+		if frontier.shape[1:] != (numV, 2) or solutions.shape[1:] != (numV, 2):
+			raise Exception("checkpointUtils.py loadCheckpoint: " + filename + " does not hold hyperrectangles with " + str(numV) + " variables")
+		stats = {}
+		for name, value in zip(checkpoint["intNames"].astype(str), checkpoint["intValues"]):
+			stats[str(name)] = int(value)
+		for name, value in zip(checkpoint["floatNames"].astype(str), checkpoint["floatValues"]):
+			stats[str(name)] = float(value)
+		signature = None
+		if "signature" in checkpoint.files:
+			signature = str(checkpoint["signature"])
+		return [hyper.copy() for hyper in frontier], [hyper.copy() for hyper in solutions], stats, signature
+	finally:
+		checkpoint.close()
+
+
+# Decides when the solver loops write a checkpoint
+class Checkpointer:
+	# @param filename name of the checkpoint file. If None, no checkpoint is written
+	# @param interval number of seconds between checkpoints
+	# @param signature problemSignature of the problem being solved
+	def __init__(self, filename, interval, signature):
+		self.filename = filename
+		self.interval = interval
+		self.signature = signature
+		self.lastSaved = time.time()
+		self.numSaved = 0
+
+	# True if interval seconds have passed since the last checkpoint
+	def due(self):
+		return self.filename is not None and time.time() - self.lastSaved >= self.interval
+
+	def save(self, frontierHypers, uniqueHypers, statVars, numV):
+		if self.filename is None:
+			return
+		saveCheckpoint(self.filename, frontierHypers, uniqueHypers, statVars, numV, self.signature)
+		self.lastSaved = time.time()
+		self.numSaved += 1
@@ -11,6 +11,7 @@ from cvxopt import matrix,solvers
 from scipy.spatial import ConvexHull
 from intervalBasics import *
 from lpUtilsMark import *
+from cacheUtils import LRUCache, cacheKey
 # boost built shared library from C++
 import stChannel_py
 
@@ -36,14 +37,15 @@ class ScMosfet:
 	# s, g, d: Indices indicating source, gate and drain
 	# model: MosfetModel
 	# shape: shape
-	def __init__(self, s, g, d, model, shape):
+	# cacheBytes: size limit in bytes of each of the function and gradient caches
+	def __init__(self, s, g, d, model, shape, cacheBytes=4*1024*1024):
 		self.s = s
 		self.g = g
 		self.d = d
 		self.shape = shape
 		self.model = model
-		self.gradDict = {} # stores computations of gradients for specific Vs, Vg, Vd and channelType
-		self.funDict = {} # stores computations of functions for specific Vs, Vg, Vd and channelType
+		self.gradCache = LRUCache(cacheBytes) # stores computations of gradients for specific Vs, Vg, Vd and channelType
+		self.funCache = LRUCache(cacheBytes) # stores computations of functions for specific Vs, Vg, Vd and channelType
 		self.stMosfet = stChannel_py.StMosfet()
 
 	# calculate ids from the given V
@@ -62,33 +64,28 @@ class ScMosfet:
 			fetFunc = self.stMosfet.mvs_idpMon
 			VbC[:] = [1.8, 1.8]
 
+		key = cacheKey(Vs, Vg, Vd, channelType)
+		funVal = self.funCache.get(key)
+		if funVal is not None:
+			return funVal
+
 		VdC = stChannel_py.MyList()
 		VgC = stChannel_py.MyList()
 		VsC = stChannel_py.MyList()
-		VsDict, VgDict, VdDict = None, None, None
 		if interval_p(Vd):
 			VdC[:] = [Vd[0], Vd[1]]
-			VdDict = tuple(list(Vd))
 		else:
 			VdC[:] = [Vd, Vd]
-			VdDict = Vd
 
 		if interval_p(Vg):
 			VgC[:] = [Vg[0], Vg[1]]
-			VgDict = tuple(list(Vg))
 		else:
 			VgC[:] = [Vg, Vg]
-			VgDict = Vg
 
 		if interval_p(Vs):
 			VsC[:] = [Vs[0], Vs[1]]
-			VsDict = tuple(list(Vs))
 		else:
 			VsC[:] = [Vs, Vs]
-			VsDict = Vs
-
-		if (VsDict, VgDict, VdDict, channelType) in self.funDict:
-			return self.funDict[(VsDict, VgDict, VdDict, channelType)]
 
 		iVal = fetFunc(VdC, VgC, VsC, VbC)
 
@@ -97,12 +94,7 @@ class ScMosfet:
 		else:
 			funVal = self.shape*iVal[0]
 
-		self.funDict[(VsDict, VgDict, VdDict, channelType)] = funVal
-		
-		# Clean up funDict
-		if len(self.funDict) >= 30000:
-			self.funDict = {}
-
+		self.funCache.put(key, funVal)
 		return funVal
 
 
@@ -123,33 +115,28 @@ class ScMosfet:
 			fetGrad = self.stMosfet.mvs_idpGrad
 			VbC[:] = [1.8, 1.8]
 
+		key = cacheKey(Vs, Vg, Vd, channelType)
+		grad = self.gradCache.get(key)
+		if grad is not None:
+			return grad
+
 		VdC = stChannel_py.MyList()
 		VgC = stChannel_py.MyList()
 		VsC = stChannel_py.MyList()
-		VsDict, VgDict, VdDict = None, None, None
 		if interval_p(Vd):
 			VdC[:] = [Vd[0], Vd[1]]
-			VdDict = tuple(list(Vd))
 		else:
 			VdC[:] = [Vd, Vd]
-			VdDict = Vd
 
 		if interval_p(Vg):
 			VgC[:] = [Vg[0], Vg[1]]
-			VgDict = tuple(list(Vg))
 		else:
 			VgC[:] = [Vg, Vg]
-			VgDict = Vg
 
 		if interval_p(Vs):
 			VsC[:] = [Vs[0], Vs[1]]
-			VsDict = tuple(list(Vs))
 		else:
 			VsC[:] = [Vs, Vs]
-			VsDict = Vs
-
-		if (VsDict, VgDict, VdDict, channelType) in self.gradDict:
-			return self.gradDict[(VsDict, VgDict, VdDict, channelType)]
 
 		jac = fetGrad(VdC, VgC, VsC, VbC)
 
@@ -160,10 +147,7 @@ class ScMosfet:
 		else:
 			grad = self.shape*np.array([jac[2][0],jac[1][0],jac[0][0]])
 
-		# Clean up gradDict
-		self.gradDict[(VsDict, VgDict, VdDict, channelType)] = grad
-		if len(self.gradDict) >= 30000:
-			self.gradDict = {}
+		self.gradCache.put(key, grad)
 		return grad
 
 	
@@ -208,20 +192,74 @@ class ScMosfet:
 		return(self.lp_ids_help(V[self.s], V[self.g], V[self.d], model))
 
 
+# Short channel transistors of the same channel type evaluated together
+# with one call to the batch functions of stChannel_py. Gives the same values
+# as calling ids and grad_ids of each transistor
+class ScMosfetBatch:
+	# trs: list of ScMosfet with the same channel type
+	# indices: indices of trs in the transistor list of the circuit
+	def __init__(self, trs, indices):
+		self.indices = np.array(indices, dtype=int)
+		self.s = np.array([tr.s for tr in trs], dtype=int)
+		self.g = np.array([tr.g for tr in trs], dtype=int)
+		self.d = np.array([tr.d for tr in trs], dtype=int)
+		self.shape = np.array([tr.shape for tr in trs], dtype=float)
+		self.stMosfet = trs[0].stMosfet
+		if trs[0].model.channelType == "nfet":
+			self.fetFunc = self.stMosfet.mvs_idnMon_batch
+			self.fetGrad = self.stMosfet.mvs_idnGrad_batch
+			self.Vb = np.zeros((len(trs), 2))
+		else:
+			self.fetFunc = self.stMosfet.mvs_idpMon_batch
+			self.fetGrad = self.stMosfet.mvs_idpGrad_batch
+			self.Vb = np.full((len(trs), 2), 1.8)
+
+	# Return the (Vd, Vg, Vs) interval arrays of the transistors and whether
+	# any of their terminal voltages is an interval
+	# lo, hi: lower and upper bounds of the node voltages
+	# isInterval: mask of the nodes whose voltage is an interval
+	def terminals(self, lo, hi, isInterval):
+		Vd = np.stack((lo[self.d], hi[self.d]), axis=1)
+		Vg = np.stack((lo[self.g], hi[self.g]), axis=1)
+		Vs = np.stack((lo[self.s], hi[self.s]), axis=1)
+		trInterval = isInterval[self.s] | isInterval[self.g] | isInterval[self.d]
+		return Vd, Vg, Vs, trInterval
+
+	# Return an array of shape (numTr, 2) with the ids interval of each transistor.
+	# Point transistors get the interval [ids, ids]
+	def ids(self, lo, hi, isInterval):
+		Vd, Vg, Vs, trInterval = self.terminals(lo, hi, isInterval)
+		iVal = self.fetFunc(Vd, Vg, Vs, self.Vb)
+		funVal = np.where(trInterval[:,np.newaxis],
+					np.stack((np.nextafter(iVal[:,0], float("-inf")), np.nextafter(iVal[:,1], float("inf"))), axis=1),
+					iVal[:,[0,0]])
+		return self.shape[:,np.newaxis]*funVal
+
+	# Return an array of shape (numTr, 3, 2) with the gradient of ids of each transistor
+	# with respect to Vs, Vg and Vd. Point transistors get intervals [grad, grad]
+	def grad_ids(self, lo, hi, isInterval):
+		Vd, Vg, Vs, trInterval = self.terminals(lo, hi, isInterval)
+		jac = self.fetGrad(Vd, Vg, Vs, self.Vb)[:,[2,1,0],:]
+		grad = np.where(trInterval[:,np.newaxis,np.newaxis],
+					np.stack((np.nextafter(jac[:,:,0], float("-inf")), np.nextafter(jac[:,:,1], float("inf"))), axis=2),
+					jac[:,:,[0,0]])
+		return self.shape[:,np.newaxis,np.newaxis]*grad
+
+
 # @author Mark Greenstreet, Itrat Akhter
 # Long channel mosfet model
 # s, g, d: Indices indicating source, gate and drain
 # model: MosfetModel
 # shape: shape
 class LcMosfet:
-	def __init__(self, s, g, d, model, shape=3.0):
+	def __init__(self, s, g, d, model, shape=3.0, cacheBytes=4*1024*1024):
 		self.s = s
 		self.g = g
 		self.d = d
 		self.shape = shape
 		self.model = model
-		self.funDict = {}
-		self.gradDict = {}
+		self.funCache = LRUCache(cacheBytes)
+		self.gradCache = LRUCache(cacheBytes)
 
 	# @author Itrat Akhter
 	# ids helper function. 
@@ -253,24 +291,11 @@ class LcMosfet:
 	# ids helper function that takes advantage of monotonicity properties. 
 	# Vs, Vg, Vd can be interval or point values
 	def ids_help_mon(self, Vs, Vg, Vd, channelType, Vt, ks):
-		VsDict, VgDict, VdDict = None, None, None
-		if interval_p(Vd):
-			VdDict = tuple(list(Vd))
-		else:
-			VdDict = Vd
+		key = cacheKey(Vs, Vg, Vd, channelType)
+		currentVal = self.funCache.get(key)
+		if currentVal is not None:
+			return currentVal
 
-		if interval_p(Vg):
-			VgDict = tuple(list(Vg))
-		else:
-			VgDict = Vg
-
-		if interval_p(Vs):
-			VsDict = tuple(list(Vs))
-		else:
-			VsDict = Vs
-
-		if (VsDict, VgDict, VdDict, channelType) in self.funDict:
-			return self.funDict[(VsDict, VgDict, VdDict, channelType)]
 		if(channelType == 'pfet'):
 			currentVal = interval_neg(self.ids_help(interval_neg(Vs), interval_neg(Vg), interval_neg(Vd), 'nfet', -Vt, -ks))
 
@@ -293,10 +318,7 @@ class LcMosfet:
 
 
 		else: currentVal = self.ids_help(Vs, Vg, Vd, channelType, Vt, ks)
-		self.funDict[(VsDict, VgDict, VdDict, channelType)] = currentVal
-		# Clean up funDict
-		if len(self.funDict) >= 30000:
-			self.funDict = {}
+		self.funCache.put(key, currentVal)
 		return currentVal
 	
 	# @author Mark Greenstreet
@@ -331,24 +353,11 @@ class LcMosfet:
 
 	# @author Mark Greenstreet
 	def grad_ids_help(self, Vs, Vg, Vd, channelType, Vt, ks):
-		VsDict, VgDict, VdDict = None, None, None
-		if interval_p(Vd):
-			VdDict = tuple(list(Vd))
-		else:
-			VdDict = Vd
+		key = cacheKey(Vs, Vg, Vd, channelType)
+		grad = self.gradCache.get(key)
+		if grad is not None:
+			return grad
 
-		if interval_p(Vg):
-			VgDict = tuple(list(Vg))
-		else:
-			VgDict = Vg
-
-		if interval_p(Vs):
-			VsDict = tuple(list(Vs))
-		else:
-			VsDict = Vs
-
-		if (VsDict, VgDict, VdDict, channelType) in self.gradDict:
-			return self.gradDict[(VsDict, VgDict, VdDict, channelType)]
 		if(channelType == 'pfet'):
 			# self.grad_ids_help(-Vs, -Vg, -Vd, 'nfet', -Vt, -ks)
 			# returns the partials of -Ids wrt. -Vs, -Vg, and -Vd,
@@ -383,10 +392,7 @@ class LcMosfet:
 				dd = ks*(Vgse - Vds) + self.model.gds
 				grad = np.array([-(dg + dd), dg, dd])
 
-		self.gradDict[(VsDict, VgDict, VdDict, channelType)] = grad
-		# Clean up gradDict
-		if len(self.gradDict) >= 30000:
-			self.gradDict = {}
+		self.gradCache.put(key, grad)
 		return grad
 
 	# @author Mark Greenstreet
@@ -742,40 +748,116 @@ class LcMosfet:
 		return idsLp
 
 
+# Stamp matrix that maps a vector of device quantities (for example
+# transistor currents) to a vector of circuit quantities (for example
+# node currents). The rows have few nonzero entries which are small integers
+class Stamp:
+	def __init__(self, mat):
+		self.mat = mat
+		self.pos = np.maximum(mat, 0.0)
+		self.neg = np.maximum(-mat, 0.0)
+		self.abs = np.absolute(mat)
+		# Bound on the relative floating point error of the sum in each row
+		self.errFactor = (np.count_nonzero(mat, axis=1) + 1)*np.finfo(float).eps
+
+	# Multiply the stamp matrix with the point vector vec
+	def apply(self, vec):
+		return np.dot(self.mat, vec)
+
+	# Multiply the stamp matrix with the interval vector [lo, hi]. The result
+	# is widened by a bound on the floating point error of the sums and rounded
+	# outward so that it contains the exact product
+	def applyInterval(self, lo, hi):
+		resLo = np.dot(self.pos, lo) - np.dot(self.neg, hi)
+		resHi = np.dot(self.pos, hi) - np.dot(self.neg, lo)
+		err = self.errFactor*np.dot(self.abs, np.maximum(np.absolute(lo), np.absolute(hi)))
+		return np.nextafter(resLo - err, float("-inf")), np.nextafter(resHi + err, float("inf"))
+
+
 # @author Mark Greenstreet, Itrat Akhter
 # Circuit combining different transistor models
 class Circuit:
-	def __init__(self, tr):
-		self.tr = tr # list of transistor objects (long channel - Mosfet or short channel - StMosfet)
-		self.funDict = {}
-		self.gradDict = {}
+	# tr: list of transistor objects (long channel - Mosfet or short channel - StMosfet)
+	# cacheBytes: size limit in bytes of each of the function and jacobian caches
+	def __init__(self, tr, cacheBytes=16*1024*1024):
+		self.tr = tr
+		self.funCache = LRUCache(cacheBytes)
+		self.gradCache = LRUCache(cacheBytes)
+		self.numNodes = None
+
+	# Return the caches of the circuit and its transistors
+	def caches(self):
+		allCaches = [self.funCache, self.gradCache]
+		for tr in self.tr:
+			allCaches += [tr.funCache, tr.gradCache]
+		return allCaches
+
+	# Build the stamp matrices that turn the transistor currents into node
+	# currents and the transistor gradients into the jacobian. The current of
+	# transistor i flows into its source node and out of its drain node.
+	# Column 3*i + k of the jacobian stamp is the derivative of the current of
+	# transistor i with respect to its source (k = 0), gate (k = 1) or drain (k = 2)
+	# voltage and row r*numNodes + c is the jacobian entry J[r,c]
+	# @param numNodes number of nodes in the circuit
+	def compile(self, numNodes):
+		numTr = len(self.tr)
+		currentMat = np.zeros((numNodes, numTr))
+		jacMat = np.zeros((numNodes*numNodes, 3*numTr))
+		for i in range(numTr):
+			tr = self.tr[i]
+			currentMat[tr.s, i] += 1.0
+			currentMat[tr.d, i] -= 1.0
+			sgd = [tr.s, tr.g, tr.d]
+			for k in range(len(sgd)):
+				jacMat[tr.s*numNodes + sgd[k], 3*i + k] += 1.0
+				jacMat[tr.d*numNodes + sgd[k], 3*i + k] -= 1.0
+		self.currentStamp = Stamp(currentMat)
+		self.jacStamp = Stamp(jacMat)
+		self.numNodes = numNodes
+
+		# Short channel transistors are evaluated in one batch per channel type.
+		# The other transistors are evaluated one at a time
+		self.scBatches = []
+		for isNfet in [True, False]:
+			indices = [i for i in range(numTr) if isinstance(self.tr[i], ScMosfet) and (self.tr[i].model.channelType == "nfet") == isNfet]
+			if len(indices) > 0:
+				self.scBatches.append(ScMosfetBatch([self.tr[i] for i in indices], indices))
+		self.otherTr = [i for i in range(numTr) if not(isinstance(self.tr[i], ScMosfet))]
+
+	# Return the lower and upper bounds of the node voltages V
+	# and a mask of the nodes whose voltage is an interval
+	def nodeBounds(self, V):
+		lo, hi = np.zeros((len(V))), np.zeros((len(V)))
+		isInterval = np.zeros((len(V)), dtype=bool)
+		for i in range(len(V)):
+			if interval_p(V[i]):
+				lo[i], hi[i] = V[i][0], V[i][1]
+				isInterval[i] = True
+			else:
+				lo[i], hi[i] = V[i], V[i]
+		return lo, hi, isInterval
 
 	# @author Mark Greenstreet
 	# Return node currents given the voltages at nodes
 	def f(self, V):
-		vTuple = ()
-		for x in V:
-			if interval_p(x):
-				vTuple += (tuple(list(x)),)
-			else:
-				vTuple += ((x),)
-		if vTuple in self.funDict:
-			#print ("funCollide")
-			return self.funDict[vTuple]
-		intervalVal = any([interval_p(x) for x in V])
-		if intervalVal:
+		key = cacheKey(V)
+		I_node = self.funCache.get(key)
+		if I_node is not None:
+			return I_node
+		if self.numNodes != len(V):
+			self.compile(len(V))
+		lo, hi, isInterval = self.nodeBounds(V)
+		Ids = np.zeros((len(self.tr), 2))
+		for i in self.otherTr:
+			Ids[i] = interval_fix(self.tr[i].ids(V))
+		for scBatch in self.scBatches:
+			Ids[scBatch.indices] = scBatch.ids(lo, hi, isInterval)
+		if np.any(isInterval):
 			I_node = np.zeros((len(V),2))
+			I_node[:,0], I_node[:,1] = self.currentStamp.applyInterval(Ids[:,0], Ids[:,1])
 		else:
-			I_node = np.zeros(len(V))
-		for i in range(len(self.tr)):
-			tr = self.tr[i]
-			Ids = tr.ids(V)
-			#print "Circuit.f: i = " + str(i) + ", tr.s = " + str(tr.s) + "(" + str(V[tr.s]) + "), tr.g = " + str(tr.g) + "(" + str(V[tr.g]) + "), tr.d = " + str(tr.d) + "(" + str(V[tr.d]) + "), ids = " + str(Ids)
-			I_node[tr.s] = interval_add(I_node[tr.s], Ids)
-			I_node[tr.d] = interval_sub(I_node[tr.d], Ids)
-		self.funDict[vTuple] = I_node
-		if len(self.funDict) > 30000:
-			self.funDict = {}
+			I_node = self.currentStamp.apply(Ids[:,0])
+		self.funCache.put(key, I_node)
 		return I_node
 
 	# @author Mark Greenstreet
@@ -783,32 +865,27 @@ class Circuit:
 	def jacobian(self, V):
 		#print ("Calculating jacobian for V")
 		#print (V)
-		vTuple = ()
-		for x in V:
-			if interval_p(x):
-				vTuple += (tuple(list(x)),)
-			else:
-				vTuple += ((x),)
-		if vTuple in self.gradDict:
-			#print ("grad collide")
-			return self.gradDict[vTuple]
-		intervalVal = any([interval_p(x) for x in V])	
-		
-		if intervalVal:
-			J = np.zeros([len(V), len(V), 2])
+		key = cacheKey(V)
+		J = self.gradCache.get(key)
+		if J is not None:
+			return J
+		if self.numNodes != len(V):
+			self.compile(len(V))
+		lo, hi, isInterval = self.nodeBounds(V)
+		grads = np.zeros((len(self.tr), 3, 2))
+		for i in self.otherTr:
+			grads[i] = [interval_fix(g) for g in self.tr[i].grad_ids(V)]
+		for scBatch in self.scBatches:
+			grads[scBatch.indices] = scBatch.grad_ids(lo, hi, isInterval)
+		grads = grads.reshape((3*len(self.tr), 2))
+
+		if np.any(isInterval):
+			J = np.zeros([len(V)*len(V), 2])
+			J[:,0], J[:,1] = self.jacStamp.applyInterval(grads[:,0], grads[:,1])
+			J = J.reshape((len(V), len(V), 2))
 		else:
-			J = np.zeros([len(V), len(V)])
-		for i in range(len(self.tr)):
-			tr = self.tr[i]
-			g = tr.grad_ids(V)
-			#print 'i = ' + str(i) + ', tr.s = ' + str(tr.s) + ', tr.g = ' + str(tr.g) + ', tr.d = ' + str(tr.d) + ', g = ' + str(g)
-			sgd = [tr.s, tr.g, tr.d]
-			for i in range(len(sgd)):
-				J[tr.s, sgd[i]] = interval_add(J[tr.s, sgd[i]], g[i])
-				J[tr.d, sgd[i]] = interval_sub(J[tr.d, sgd[i]], g[i])
-		self.gradDict[vTuple] = J
-		if len(self.gradDict) > 30000:
-			self.gradDict = {}
+			J = self.jacStamp.apply(grads[:,0]).reshape((len(V), len(V)))
+		self.gradCache.put(key, J)
 		return J
 
 	
@@ -871,8 +948,7 @@ class Circuit:
 						lp.ineq_constraint(greatConstr, -V[ind][0])
 						lp.ineq_constraint(lessConstr, V[ind][1])
 					else:
-						lp.ineq_constraint(greatConstr, -V[ind])
-						lp.ineq_constraint(lessConstr, V[ind])
+						lp.eq_constraint(lessConstr, V[ind])
 
 			eqCoeffs[tr.s, n_nodes + i] += 1.0
 			eqCoeffs[tr.d, n_nodes + i] += -1.0
@@ -881,8 +957,7 @@ class Circuit:
 		# need to add equality constraints that the sum of the currents into each node is zero
 		for i in range(n_nodes):
 			if all([i != gpi for gpi in grndPowerIndex]):
-				lp.ineq_constraint(list(-eqCoeffs[i]), 0.0)
-				lp.ineq_constraint(list(eqCoeffs[i]), 0.0)
+				lp.eq_constraint(list(eqCoeffs[i]), 0.0)
 
 		#print ("lp")
 		#print (lp)
@@ -896,7 +971,9 @@ class Circuit:
 	# grndPower Index is the list of indices indicating
 	# ground and power in V
 	def linearConstraints(self, V, grndPowerIndex):
-		lp = self.lp(V, grndPowerIndex)
+		# All the lps solved here have the same constraints, so they are
+		# converted for the LP backend once
+		lp = FixedConstraintLP(self.lp(V, grndPowerIndex))
 		n_nodes = len(V)
 		n_tr = len(self.tr)
 		nvars = len(V) + n_tr
@@ -905,40 +982,31 @@ class Circuit:
 		tighterHyper = [x for x in V]
 		feasible = True
 		numSuccessLp, numUnsuccessLp, numTotalLp = 0, 0, 0
-		for i in range(n_nodes):
-			if interval_p(tighterHyper[i]):
-				numTotalLp += 2
-				cost = np.zeros((nvars))
-
-				#minimize variable i
-				cost[i] = 1.0
-				lp.add_cost(list(cost))
-				minSol = lp.solve()
-
-				#maximize variable i
-				cost[i] = -1.0
-				lp.add_cost(list(cost))
-				maxSol = lp.solve()
-
-				if minSol is None or maxSol is None:
-					numUnsuccessLp += 2
-					continue
-
-				if minSol["status"] == "primal infeasible" and maxSol["status"] == "primal infeasible":
-					numSuccessLp += 2
-					feasible = False
-					break
-
-				if minSol["status"] == "optimal":
-					tighterHyper[i][0] = minSol['x'][i]
-					numSuccessLp += 1
-				else:
-					numUnsuccessLp += 1
-				if maxSol["status"] == "optimal":
-					tighterHyper[i][1] = maxSol['x'][i]
-					numSuccessLp += 1
-				else:
-					numUnsuccessLp += 1
+		#minimize and maximize each interval variable, with the pool
+		#selected by setLpPool
+		intervalIndices = [i for i in range(n_nodes) if interval_p(tighterHyper[i])]
+		for i, minSol, maxSol in minMaxSolutions(lp, nvars, intervalIndices):
+			numTotalLp += 2
+
+			if minSol is None or maxSol is None:
+				numUnsuccessLp += 2
+				continue
+
+			if minSol["status"] == "primal infeasible" and maxSol["status"] == "primal infeasible":
+				numSuccessLp += 2
+				feasible = False
+				break
+
+			if minSol["status"] == "optimal":
+				tighterHyper[i][0] = minSol['x'][i]
+				numSuccessLp += 1
+			else:
+				numUnsuccessLp += 1
+			if maxSol["status"] == "optimal":
+				tighterHyper[i][1] = maxSol['x'][i]
+				numSuccessLp += 1
+			else:
+				numUnsuccessLp += 1
 
 
 		#print ("numTotalLp", numTotalLp, "numSuccessLp", numSuccessLp, "numUnsuccessLp", numUnsuccessLp)
@@ -10,13 +10,30 @@
 # and maximize each variable to give a tighter hyperrectangle
 
 import numpy as np
-import lpUtils
+import lpUtilsMark
 from cvxopt import matrix,solvers
 from scipy.spatial import ConvexHull
 import circuit
 import funCompUtils as fcUtils
 from intervalBasics import *
 
+'''
+Round the interval [lo, hi] outward by an ulp. lo and hi are
+arrays of lower and upper bounds
+'''
+def roundOut(lo, hi):
+	return np.nextafter(lo, np.float("-inf")), np.nextafter(hi, np.float("inf"))
+
+'''
+Multiply the intervals [lo, hi] by the constant c with
+the same rounding as interval_mult
+'''
+def scaleInterval(c, lo, hi):
+	if c >= 0:
+		return roundOut(c*lo, c*hi)
+	return roundOut(c*hi, c*lo)
+
+
 '''
 Rambus ring oscillator with tanh as the inverter model
 @param modelParam is constants in tanh where y = tanh(modelParam[0]*x + modelParam[1])
@@ -30,116 +47,149 @@ class RambusTanh:
 		self.g_cc = g_cc
 		self.g_fwd = g_fwd
 		self.numStages = numStages
-		self.xs = []
-		self.ys = []
-		self.zs = []
-		for i in range(numStages*2):
-			self.xs.append("x" + str(i))
-			self.ys.append("y" + str(i))
-			self.zs.append("z" + str(i))
 
 		self.bounds = np.zeros((numStages*2, 2))
 		for i in range(numStages*2):
 			self.bounds[i] = [-1.0, 1.0]
 
-	def f(self, V):
-		intervalVal = any([interval_p(x) for x in V])
-		lenV = len(V)
-		
-		if intervalVal:
-			fVal = np.zeros((lenV,2))
-		else:
-			fVal = np.zeros((lenV))
-
-		for i in range(lenV):
-			fwdInd = (i-1)%lenV
-			ccInd = (i + lenV//2) % lenV
-			tanhFwd = fcUtils.tanhFun(V[fwdInd], self.modelParam[0], self.modelParam[1])
-			tanhCc = fcUtils.tanhFun(V[ccInd], self.modelParam[0], self.modelParam[1])
-			fwdTerm = interval_sub(tanhFwd, V[i])
-			ccTerm = interval_sub(tanhCc, V[i])
-			fVal[i] = interval_add(interval_mult(self.g_fwd, fwdTerm),interval_mult(self.g_cc, ccTerm))
-
-		return fVal
+		# index of the node driving the forward and cross coupled
+		# inverter of each node
+		lenV = numStages*2
+		self.nodeInd = np.arange(lenV)
+		self.fwdInd = (self.nodeInd - 1)%lenV
+		self.ccInd = (self.nodeInd + lenV//2)%lenV
+
+		# the oscillator is invariant under rotation of the node voltages
+		self.rotationSymmetric = True
+
+		# Variables of the linear programs built by linearConstraints: the node
+		# voltages xs, the outputs ys of the forward inverters and the outputs zs of
+		# the cross coupled inverters, each of length lenV, in that order.
+		# The inequality constraints are written into lpA and lpB which have room
+		# for the tanh constraints of every inverter. The equality constraints
+		# (the currents into each node add up to zero) do not depend on the
+		# hyperrectangle and are built here
+		self.lpA = np.zeros((2*lenV*fcUtils.MAX_TANH_CONSTRAINT_ROWS, 3*lenV))
+		self.lpB = np.zeros((2*lenV*fcUtils.MAX_TANH_CONSTRAINT_ROWS))
+		self.lpAeq = np.zeros((lenV, 3*lenV))
+		self.lpAeq[self.nodeInd, lenV + self.nodeInd] = g_fwd
+		self.lpAeq[self.nodeInd, self.nodeInd] = -g_fwd-g_cc
+		self.lpAeq[self.nodeInd, 2*lenV + self.nodeInd] = g_cc
+		self.lpBeq = np.zeros((lenV))
 
+	def f(self, V):
+		V = np.asarray(V)
+		return self.fBatch(V[np.newaxis])[0]
 
 	'''Get jacobian of rambus oscillator at V
 	'''
 	def jacobian(self,V):
-		lenV = len(V)
-		intervalVal = any([interval_p(x) for x in V])
+		V = np.asarray(V)
+		return self.jacobianBatch(V[np.newaxis])[0]
 
-		if intervalVal:
-			jac = np.zeros((lenV, lenV, 2))
-		else:
-			jac = np.zeros((lenV, lenV))
-		for i in range(lenV):
-			if intervalVal:
-				jac[i,i] = interval_fix(-(self.g_fwd + self.g_cc))
-			else:
-				jac[i,i] = -(self.g_fwd + self.g_cc)
-			jac[i,(i-1)%lenV] = interval_mult(self.g_fwd, fcUtils.tanhFunder(V[(i-1)%lenV], self.modelParam[0], self.modelParam[1]))
-			jac[i,(i + lenV//2) % lenV] = interval_mult(self.g_cc, fcUtils.tanhFunder(V[(i + lenV//2) % lenV], self.modelParam[0], self.modelParam[1]))
+	'''Evaluate the function at m points or hyperrectangles at once.
+	V is a (m,n) array of points or a (m,n,2) array of hyperrectangles.
+	All the nodes are evaluated together with the same rounding as
+	fcUtils.tanhFun and the interval operations in intervalBasics
+	'''
+	def fBatch(self, V):
+		V = np.asarray(V)
+		a, b = self.modelParam[0], self.modelParam[1]
+		tanhVal = np.tanh(a*V + b)
+		if V.ndim == 2:
+			fwdTerm = tanhVal[:,self.fwdInd] - V
+			ccTerm = tanhVal[:,self.ccInd] - V
+			return self.g_fwd*fwdTerm + self.g_cc*ccTerm
+
+		tanhLo = np.nextafter(np.minimum(tanhVal[:,:,0], tanhVal[:,:,1]), np.float("-inf"))
+		tanhHi = np.nextafter(np.maximum(tanhVal[:,:,0], tanhVal[:,:,1]), np.float("inf"))
+		fwdTermLo, fwdTermHi = roundOut(tanhLo[:,self.fwdInd] - V[:,:,1], tanhHi[:,self.fwdInd] - V[:,:,0])
+		ccTermLo, ccTermHi = roundOut(tanhLo[:,self.ccInd] - V[:,:,1], tanhHi[:,self.ccInd] - V[:,:,0])
+		fwdTermLo, fwdTermHi = scaleInterval(self.g_fwd, fwdTermLo, fwdTermHi)
+		ccTermLo, ccTermHi = scaleInterval(self.g_cc, ccTermLo, ccTermHi)
+		fVal = np.zeros(V.shape)
+		fVal[:,:,0], fVal[:,:,1] = roundOut(fwdTermLo + ccTermLo, fwdTermHi + ccTermHi)
+		return fVal
 
+	'''Get the jacobians at m points or hyperrectangles at once.
+	V is a (m,n) array of points or a (m,n,2) array of hyperrectangles.
+	The derivatives are computed with the same rounding as
+	fcUtils.tanhFunder and interval_mult
+	'''
+	def jacobianBatch(self, V):
+		V = np.asarray(V)
+		a, b = self.modelParam[0], self.modelParam[1]
+		numPoints, lenV = V.shape[0], V.shape[1]
+		coshVal = np.cosh(a*V + b)
+		grad = np.divide(a, coshVal*coshVal)
+		diagVal = -(self.g_fwd + self.g_cc)
+		if V.ndim == 2:
+			jac = np.zeros((numPoints, lenV, lenV))
+			jac[:,self.nodeInd,self.nodeInd] = diagVal
+			jac[:,self.nodeInd,self.fwdInd] = self.g_fwd*grad[:,self.fwdInd]
+			jac[:,self.nodeInd,self.ccInd] = self.g_cc*grad[:,self.ccInd]
+			return jac
+
+		separX = b/(-a*1.0)
+		gradLo = np.minimum(grad[:,:,0], grad[:,:,1])
+		gradHi = np.maximum(grad[:,:,0], grad[:,:,1])
+		# tanh has its largest derivative at separX
+		separInside = np.logical_not((V[:,:,0] - separX)*(V[:,:,1] - separX) >= 0)
+		if np.any(separInside):
+			den0 = np.cosh(separX)*np.cosh(separX)
+			grad0 = np.divide(a,den0)
+			gradLo = np.where(separInside, np.minimum(gradLo, grad0), gradLo)
+			gradHi = np.where(separInside, np.maximum(gradHi, grad0), gradHi)
+		gradLo = np.nextafter(gradLo, np.float("-inf"))
+		gradHi = np.nextafter(gradHi, np.float("inf"))
+
+		jac = np.zeros((numPoints, lenV, lenV, 2))
+		jac[:,self.nodeInd,self.nodeInd,:] = diagVal
+		fwdLo, fwdHi = scaleInterval(self.g_fwd, gradLo[:,self.fwdInd], gradHi[:,self.fwdInd])
+		jac[:,self.nodeInd,self.fwdInd,0] = fwdLo
+		jac[:,self.nodeInd,self.fwdInd,1] = fwdHi
+		ccLo, ccHi = scaleInterval(self.g_cc, gradLo[:,self.ccInd], gradHi[:,self.ccInd])
+		jac[:,self.nodeInd,self.ccInd,0] = ccLo
+		jac[:,self.nodeInd,self.ccInd,1] = ccHi
 		return jac
 
 
 
 	def linearConstraints(self, hyperRectangle):
-		solvers.options["show_progress"] = False
-		allConstraints = ""
 		lenV = self.numStages*2
-
-		allConstraints = ""
+		numRows = 0
 		for i in range(lenV):
-			fwdInd = (i-1)%lenV
-			ccInd = (i+lenV//2)%lenV
-			#print ("fwdInd ", fwdInd, " ccInd ", ccInd)
-			#print "hyperRectangle[fwdInd][0]", hyperRectangle[fwdInd][0], "hyperRectangle[fwdInd][1]", hyperRectangle[fwdInd][1]
-			
-			triangleClaimFwd = fcUtils.tanhLinearConstraints(self.modelParam[0], self.modelParam[1], self.xs[fwdInd], self.ys[i], hyperRectangle[fwdInd,0],hyperRectangle[fwdInd,1])
-			#print ("triangleClaimFwd", triangleClaimFwd)
-			allConstraints += triangleClaimFwd
-
-			triangleClaimCc = fcUtils.tanhLinearConstraints(self.modelParam[0], self.modelParam[1], self.xs[ccInd], self.zs[i], hyperRectangle[ccInd,0],hyperRectangle[ccInd,1])
-			#print ("triangleClaimCc", triangleClaimCc)
-			allConstraints += triangleClaimCc
-				
-			allConstraints += str(self.g_fwd) + " " + self.ys[i] + " + " + str(-self.g_fwd-self.g_cc) + \
-			" " + self.xs[i] + " + " + str(self.g_cc) + " "  + self.zs[i] + " >= 0.0\n"
-			allConstraints += str(self.g_fwd) + " " + self.ys[i] + " + " + str(-self.g_fwd-self.g_cc) + \
-			" " + self.xs[i] + " + " + str(self.g_cc) + " "  + self.zs[i] + " <= 0.0\n"
-		
-
-		#print "allConstraints"
-		#print allConstraints
-		variableDict, A, B = lpUtils.constructCoeffMatrices(allConstraints)
+			fwdInd = self.fwdInd[i]
+			ccInd = self.ccInd[i]
+			numRows = fcUtils.tanhLinearConstraintRows(self.modelParam[0], self.modelParam[1], fwdInd, lenV + i,
+								hyperRectangle[fwdInd,0], hyperRectangle[fwdInd,1], self.lpA, self.lpB, numRows)
+			numRows = fcUtils.tanhLinearConstraintRows(self.modelParam[0], self.modelParam[1], ccInd, 2*lenV + i,
+								hyperRectangle[ccInd,0], hyperRectangle[ccInd,1], self.lpA, self.lpB, numRows)
+
+		# solved with the backend selected by lpUtilsMark.setLpBackend and
+		# the pool selected by lpUtilsMark.setLpPool
+		lp = lpUtilsMark.FixedConstraintLP.fromArrays(self.lpA[:numRows], self.lpB[:numRows], self.lpAeq, self.lpBeq)
 		newHyperRectangle = np.copy(hyperRectangle)
 		feasible = True
 		numSuccessLp, numUnsuccessLp, numTotalLp = 0, 0, 0
-		for i in range(lenV):
+		for i, minSol, maxSol in lpUtilsMark.minMaxSolutions(lp, 3*lenV, list(range(lenV))):
 			numTotalLp += 2
-			#print "min max ", i
-			minObjConstraint = "min 1 " + self.xs[i]
-			maxObjConstraint = "max 1 " + self.xs[i]
-			Cmin = lpUtils.constructObjMatrix(minObjConstraint,variableDict)
-			Cmax = lpUtils.constructObjMatrix(maxObjConstraint,variableDict)
-			minSol = solvers.lp(Cmin,A,B)
-			maxSol = solvers.lp(Cmax,A,B)
+			if minSol is None or maxSol is None:
+				numUnsuccessLp += 2
+				continue
 			if minSol["status"] == "primal infeasible" and maxSol["status"] == "primal infeasible":
 				feasible = False
 				numSuccessLp += 2
 				break
 			else:
 				if minSol["status"] == "optimal":
-					newHyperRectangle[i,0] = minSol['x'][variableDict[self.xs[i]]] - 1e-6
+					newHyperRectangle[i,0] = minSol['x'][i] - 1e-6
 					numSuccessLp += 1
 				else:
 					numUnsuccessLp += 1
 					#print ("min lp not optimal", minSol["status"])
-					#print (allConstraints)
 				if maxSol["status"] == "optimal":
-					newHyperRectangle[i,1] = maxSol['x'][variableDict[self.xs[i]]] + 1e-6
+					newHyperRectangle[i,1] = maxSol['x'][i] + 1e-6
 					numSuccessLp += 1
 				else:
 					numUnsuccessLp += 1
@@ -237,6 +287,8 @@ Rambus ring oscillator with 2 CMOS transistors having
 '''
 class RambusMosfet:
 	def __init__(self, modelType, modelParam, g_cc, g_fwd, numStages):
+		self.modelType = modelType
+		self.modelParam = modelParam
 		self.g_cc = g_cc
 		self.g_fwd = g_fwd
 		self.numStages = numStages
@@ -277,6 +329,9 @@ class RambusMosfet:
 		for i in range(numStages*2):
 			self.bounds[i] = [0.0, self.Vdd]
 
+		# the oscillator is invariant under rotation of the node voltages
+		self.rotationSymmetric = True
+
 
 	def f(self,V):
 		myV = [x for x in V] + [0.0, self.Vdd]
@@ -314,6 +369,8 @@ short channel Mosfet models
 '''
 class InverterMosfet:
 	def __init__(self, modelType, modelParam, inputVoltage):
+		self.modelType = modelType
+		self.modelParam = modelParam
 		self.inputVoltage = inputVoltage
 		s0 = 3.0
 		if modelType == "lcMosfet":
@@ -375,6 +432,8 @@ having long channel or short channel Mosfet models
 '''
 class InverterLoopMosfet:
 	def __init__(self, modelType, modelParam, numInverters):
+		self.modelType = modelType
+		self.modelParam = modelParam
 		s0 = 3.0
 		if modelType == "lcMosfet":
 			model = circuit.LcMosfet
@@ -441,6 +500,8 @@ with long channel and short channel Mosfet models
 '''
 class SchmittMosfet:
 	def __init__(self, modelType, modelParam, inputVoltage):
+		self.modelType = modelType
+		self.modelParam = modelParam
 		s0 = 3.0
 		self.inputVoltage = inputVoltage
 
@@ -0,0 +1,169 @@
+# Sweeps of a parameter of a model, such as the input voltage of the schmitt
+# trigger, that carry the solutions found for one parameter value over to the next.
+# A hyperrectangle containing a unique solution for one value is inflated around
+# the position predicted from the last two values and checked with the Krawczyk
+# operator for the next value. The whole search space is only searched again at
+# the first and last values and where tracking a solution fails. That happens at
+# a fold, where the solution meets another one and both disappear, or when the
+# solution moved further than the inflated hyperrectangle. The solutions the search
+# finds that were not tracked there are tracked in both directions, which also finds
+# the branches created at folds in between. Like any continuation method, a branch
+# that neither exists at a searched value nor meets a tracked branch at a fold
+# (a closed branch lying between two values that are searched) is not found
+
+import numpy as np
+import time
+import intervalUtils
+from prototype import solverLoopNoLp, addToSolutions, schmittModel, bisectMax, newStatVars
+from traceUtils import NullTrace
+
+
+# Track the solution in hyper for the model of the previous parameter value to model
+# @param model model for the new parameter value
+# @param hyper hyperrectangle containing a unique solution for the previous value
+# @param prevHyper hyperrectangle of the same solution for the value before that,
+#	None if there is none. Used to predict where the solution moves. Without it
+#	the prediction is one Newton step for model from the center of hyper
+# @param stepRatio ratio of the parameter step to the previous one
+# @param trackRadius radius of the hyperrectangle checked around the predicted solution
+#	as a proportion of the width of model.bounds
+# @param statVars statistics of the sweep
+# @return a hyperrectangle containing a unique solution for model near hyper or
+#	None if none was found
+def trackSolution(model, hyper, prevHyper, stepRatio, trackRadius, kAlpha, epsilonInflation, contractor, statVars):
+	center = (hyper[:,0] + hyper[:,1])/2.0
+	if prevHyper is not None:
+		shift = stepRatio*(center - (prevHyper[:,0] + prevHyper[:,1])/2.0)
+	else:
+		try:
+			shift = -np.linalg.solve(model.jacobian(center), model.f(center))
+		except np.linalg.LinAlgError:
+			shift = np.zeros(center.shape)
+	boundsWidth = model.bounds[:,1] - model.bounds[:,0]
+	radius = trackRadius*boundsWidth + np.absolute(shift) + (hyper[:,1] - hyper[:,0])/2.0
+
+	# a larger hyperrectangle catches a solution that moved further but
+	# is less likely to be shown to contain a unique solution
+	for scale in [1.0, 4.0]:
+		trackHyper = np.zeros(hyper.shape)
+		trackHyper[:,0] = np.maximum(center + shift - scale*radius, model.bounds[:,0])
+		trackHyper[:,1] = np.minimum(center + shift + scale*radius, model.bounds[:,1])
+		feasibility = checkTrackHyper(model, trackHyper, kAlpha, epsilonInflation, contractor, statVars)
+		if feasibility[0]:
+			return feasibility[1]
+
+	# check a small hyperrectangle around the solution Newton's
+	# method finds from the predicted position
+	converged, soln = intervalUtils.newton(model, center + shift)
+	if converged and np.all(np.absolute(soln - center - shift) <= 4.0*radius):
+		newtonHyper = np.zeros(hyper.shape)
+		newtonHyper[:,0] = soln - 1e-3*radius
+		newtonHyper[:,1] = soln + 1e-3*radius
+		feasibility = checkTrackHyper(model, newtonHyper, kAlpha, epsilonInflation, contractor, statVars)
+		if feasibility[0]:
+			return feasibility[1]
+	return None
+
+# checkExistenceOfSolution for trackSolution, counted in statVars
+def checkTrackHyper(model, hyper, kAlpha, epsilonInflation, contractor, statVars):
+	statVars['numTrackChecks'] += 1
+	start = time.time()
+	feasibility = intervalUtils.checkExistenceOfSolution(model, hyper, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor)
+	end = time.time()
+	statVars['totalKTime'] += end - start
+	statVars['numK'] += 1
+	return feasibility
+
+# Find the solutions of the model for each parameter value in params by tracking them
+# from one value to the next (see the top of this file)
+# @param makeModel function taking a parameter value and returning the model for it
+# @param params increasing or decreasing list of parameter values
+# @param statVars dictionary for the statistics of the sweep. The statistics of the
+#	full searches are added up with those of the tracking. numFullSearches counts
+#	the full searches, numTracked the solutions tracked from one value to the next,
+#	numTrackFailures the failed attempts and numTrackChecks the Krawczyk checks they made
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param trackRadius radius of the hyperrectangle in which a solution is looked for
+#	around its predicted position, as a proportion of the width of the model bounds
+# @param contractor the contraction operator, one of intervalUtils.CONTRACTORS
+# @param traceSink object with append and extend methods that receives the trace
+#	of the full searches. If None, the trace is dropped
+# @return list with, for each parameter value, the list of hyperrectangles containing
+#	unique solutions for that value
+def continuationSweep(makeModel, params, statVars=None, kAlpha=1.0, epsilonInflation=0.001, trackRadius=0.01, contractor="krawczyk", traceSink=None):
+	if statVars is None:
+		statVars = {}
+	statVars.update(newStatVars())
+	statVars.update({'numFullSearches':0, 'numTracked':0, 'numTrackFailures':0, 'numTrackChecks':0})
+	statVars['stringHyperList'] = NullTrace() if traceSink is None else traceSink
+
+	numParams = len(params)
+	models = [makeModel(param) for param in params]
+	solutions = [[] for k in range(numParams)]
+	searched = [False]*numParams
+
+	# solutions still to be tracked as (k, hyper, prevHyper, direction) where
+	# hyper contains a unique solution for params[k] and direction is 1 or -1
+	toTrack = []
+
+	# search the whole space for params[k] for solutions that are not in solutions[k]
+	# and track the ones found in both directions
+	def fullSearch(k):
+		searched[k] = True
+		statVars['numFullSearches'] += 1
+		numKnown = len(solutions[k])
+		solverLoopNoLp(solutions[k], models[k], statVars=statVars, bisectFun=bisectMax, kAlpha=kAlpha, epsilonInflation=epsilonInflation, contractor=contractor)
+		for hyper in solutions[k][numKnown:]:
+			toTrack.append((k, hyper, None, 1))
+			toTrack.append((k, hyper, None, -1))
+
+	fullSearch(0)
+	if numParams > 1:
+		fullSearch(numParams - 1)
+
+	while len(toTrack) > 0:
+		k, hyper, prevHyper, direction = toTrack.pop()
+		j = k + direction
+		if j < 0 or j >= numParams:
+			continue
+		stepRatio = 0.0
+		if prevHyper is not None:
+			stepRatio = (params[j] - params[k])/float(params[k] - params[k - direction])
+		trackedHyper = trackSolution(models[j], hyper, prevHyper, stepRatio, trackRadius, kAlpha, epsilonInflation, contractor, statVars)
+		if trackedHyper is None:
+			# the solution disappeared at a fold or could not be followed. The
+			# solution it meets at the fold still exists for params[k] and the
+			# solutions created at the fold exist for params[j]. Both are found
+			# by full searches
+			statVars['numTrackFailures'] += 1
+			if not(searched[k]):
+				fullSearch(k)
+			if not(searched[j]):
+				fullSearch(j)
+			continue
+
+		numKnown = len(solutions[j])
+		addToSolutions(models[j], solutions[j], trackedHyper, kAlpha, epsilonInflation, contractor=contractor)
+		# stop once the branch reaches a solution that is already known
+		if len(solutions[j]) > numKnown:
+			statVars['numTracked'] += 1
+			toTrack.append((j, trackedHyper, hyper, direction))
+
+	if statVars['numK'] != 0:
+		statVars['avgKTime'] = (statVars['totalKTime']*1.0)/statVars['numK']
+	if statVars['numIa'] != 0:
+		statVars['avgIaTime'] = (statVars['totalIaTime']*1.0)/statVars['numIa']
+	return solutions
+
+# Find the dc equilibrium points of the schmitt trigger for each input
+# voltage in inputVoltages with continuationSweep
+# @param modelType "lcMosfet" or "scMosfet" (see prototype.schmittTrigger)
+# @param inputVoltages increasing or decreasing list of input voltages
+# @param statVars dictionary for the statistics of the sweep (see continuationSweep)
+# @return list with, for each input voltage, the list of hyperrectangles containing
+#	unique dc equilibrium points
+def schmittTriggerSweep(modelType, inputVoltages, statVars, kAlpha=1.0, epsilonInflation=0.001, trackRadius=0.01, contractor="krawczyk", traceSink=None):
+	return continuationSweep(lambda inputVoltage: schmittModel(modelType, inputVoltage), inputVoltages, statVars=statVars,
+							kAlpha=kAlpha, epsilonInflation=epsilonInflation, trackRadius=trackRadius, contractor=contractor, traceSink=traceSink)
@@ -0,0 +1,222 @@
+import sys
+import os
+import time
+import fnmatch
+import platform
+import argparse
+import collections
+import subprocess
+import numpy as np
+
+sys.path.append('../')
+from prototype import *
+from jobScheduler import Job, runJobs
+import benchmarkStore
+
+# Benchmark of the solver on the standard problems. Every problem runs in its own
+# process through jobScheduler.runJobs. The time taken by the solver, the number of
+# solutions, numK, numIa, numBisection, the peak RSS of the process and the cpu,
+# python and numpy versions are appended to a benchmarkStore as one run. The run
+# can be compared with a baseline run from the store: counts that changed, times
+# and peak RSS that grew by more than the tolerance and problems that no longer
+# finish are reported as regressions and make the script exit with status 1
+#
+# python benchmark.py --problems "rambus_*_2" "schmitt_*" --save-baseline
+# python benchmark.py --problems "rambus_*_2" "schmitt_*" --time-tolerance 0.2
+
+# The standard problems as name: (function, keyword arguments). The function
+# is called with statVars and the keyword arguments and returns the solutions
+problems = collections.OrderedDict()
+for modelType in ["tanh", "lcMosfet", "scMosfet"]:
+	for numStages in [2, 4, 6]:
+		problems["rambus_"+modelType+"_"+str(numStages)] = (rambusOscillator, {"modelType": modelType, "numStages": numStages, "g_cc": 4.0, "epsilonInflation": 0.001})
+problems["schmitt_lcMosfet_0.9"] = (schmittTrigger, {"modelType": "lcMosfet", "inputVoltage": 0.9})
+problems["schmitt_scMosfet_0.5"] = (schmittTrigger, {"modelType": "scMosfet", "inputVoltage": 0.5})
+for modelType in ["tanh", "lcMosfet", "scMosfet"]:
+	problems["inverterLoop_"+modelType+"_4"] = (inverterLoop, {"modelType": modelType, "numInverters": 4})
+
+# Rough estimate of the time taken by a problem, used to order the jobs
+def expectedTime(name):
+	if name.startswith("rambus_"):
+		return 75.0**((int(name.split("_")[-1]) - 2)/2.0)
+	return 1.0
+
+# Solve the problem called name and return its row
+def runProblem(name, repeat):
+	fun, kwargs = problems[name]
+	statVars = {}
+	start = time.time()
+	allHypers = fun(statVars=statVars, **kwargs)
+	solveTime = time.time() - start
+	return {"problem": name, "repeat": repeat, "solveTime": solveTime, "numSolutions": len(allHypers),
+			"numK": statVars["numK"], "numIa": statVars["numIa"], "numBisection": statVars["numBisection"]}
+
+# Return the cpu, machine, python and numpy versions and the git commit of the solver
+def environment():
+	cpu = platform.processor()
+	try:
+		with open("/proc/cpuinfo") as cpuinfo:
+			for line in cpuinfo:
+				if line.startswith("model name"):
+					cpu = line.split(":", 1)[1].strip()
+					break
+	except IOError:
+		pass
+	try:
+		gitCommit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")).decode().strip()
+	except (OSError, subprocess.CalledProcessError):
+		gitCommit = ""
+	return {"cpu": cpu, "machine": platform.machine(), "python": platform.python_version(),
+			"numpy": np.__version__, "gitCommit": gitCommit}
+
+# Run the problems numRepeats times and return the rows of the run
+def runBenchmark(names, runId, numRepeats, numCores, timeout, memoryLimit):
+	jobs, jobProblems = [], {}
+	for name in names:
+		for repeat in range(numRepeats):
+			jobName = name + "_repeat_" + str(repeat)
+			jobs.append(Job(jobName, runProblem, (name, repeat), expectedTime(name)))
+			jobProblems[jobName] = (name, repeat)
+
+	env = environment()
+	rows = []
+	def onRow(row):
+		# wallTime in the store is the time taken by the solver and
+		# jobTime the time taken by the whole job
+		row["jobTime"] = row["wallTime"]
+		row["wallTime"] = row.get("solveTime", "")
+		row["problem"], row["repeat"] = jobProblems[row["Job"]]
+		row["runId"] = runId
+		row["savedAt"] = time.time()
+		row.update(env)
+		rows.append(row)
+	runJobs(jobs, None, [], numCores=numCores, timeout=timeout, memoryLimit=memoryLimit, onRow=onRow)
+	return rows
+
+# Return a dictionary from problem names to the row of the repeat with the
+# smallest wall time, or of the first repeat if none of them finished
+def bestRows(rows):
+	best = {}
+	for row in rows:
+		name = row["problem"]
+		if name not in best:
+			best[name] = row
+		elif row["status"] == "ok" and (best[name]["status"] != "ok" or row["wallTime"] < best[name]["wallTime"]):
+			best[name] = row
+	return best
+
+# Compare the rows of a run with the rows of the baseline run
+# @param timeTolerance relative growth of the wall time above which it is a regression
+# @param rssTolerance relative growth of the peak RSS above which it is a regression
+# @param countTolerance relative change of numK, numIa and numBisection above which
+#	it is a regression. The number of solutions has to be the same
+# @return (regressions, notes) lists of messages
+def compareRuns(rows, baselineRows, timeTolerance, rssTolerance, countTolerance):
+	regressions, notes = [], []
+	best, baselineBest = bestRows(rows), bestRows(baselineRows)
+	if len(rows) > 0 and len(baselineRows) > 0:
+		for key in ["cpu", "machine", "python", "numpy"]:
+			if str(rows[0][key]) != str(baselineRows[0][key]):
+				notes.append(key + " differs from the baseline: " + str(rows[0][key]) + " vs " + str(baselineRows[0][key]))
+
+	for name in best:
+		row = best[name]
+		if name not in baselineBest:
+			notes.append(name + ": not in the baseline")
+			continue
+		baseRow = baselineBest[name]
+		if baseRow["status"] != "ok":
+			if row["status"] == "ok":
+				notes.append(name + ": finishes now, baseline status " + str(baseRow["status"]))
+			continue
+		if row["status"] != "ok":
+			regressions.append(name + ": status " + str(row["status"]))
+			continue
+		if row["numSolutions"] != baseRow["numSolutions"]:
+			regressions.append(name + ": numSolutions " + str(row["numSolutions"]) + " vs " + str(baseRow["numSolutions"]))
+		for key in ["numK", "numIa", "numBisection"]:
+			if abs(row[key] - baseRow[key]) > countTolerance*baseRow[key]:
+				regressions.append(name + ": " + key + " " + str(row[key]) + " vs " + str(baseRow[key]))
+		for key, tolerance in [("wallTime", timeTolerance), ("peakRssKb", rssTolerance)]:
+			if np.isnan(row[key]) or np.isnan(baseRow[key]):
+				continue
+			ratio = row[key]/max(baseRow[key], 1e-9)
+			if ratio > 1.0 + tolerance:
+				regressions.append(name + ": " + key + " " + str(row[key]) + " vs " + str(baseRow[key]) + " (x" + ("%.2f" % ratio) + ")")
+			elif ratio < 1.0 - tolerance:
+				notes.append(name + ": " + key + " " + str(row[key]) + " vs " + str(baseRow[key]) + " (x" + ("%.2f" % ratio) + ")")
+	return regressions, notes
+
+# Write runId to the baseline file of the store in storeDir
+def saveBaseline(storeDir, runId):
+	baselineName = os.path.join(storeDir, "baseline")
+	with open(baselineName + ".tmp", "w") as baselineFile:
+		baselineFile.write(runId + "\n")
+	os.rename(baselineName + ".tmp", baselineName)
+
+# Return the run id in the baseline file of the store in storeDir or None
+def readBaseline(storeDir):
+	baselineName = os.path.join(storeDir, "baseline")
+	if not(os.path.exists(baselineName)):
+		return None
+	with open(baselineName) as baselineFile:
+		return baselineFile.read().strip()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description="Benchmark the solver on the standard problems")
+	parser.add_argument("--problems", nargs="*", default=["*"], help="shell style patterns of the problems to run (default: all). Problems: " + ", ".join(problems.keys()))
+	parser.add_argument("--store", default="../data/benchmarks", help="directory of the benchmark store")
+	parser.add_argument("--repeats", type=int, default=1, help="number of runs of every problem. The fastest one is compared")
+	parser.add_argument("--cores", type=int, default=1, help="number of problems run at the same time. More than one disturbs the timings")
+	parser.add_argument("--timeout", type=float, default=36000, help="time in seconds after which a problem is killed")
+	parser.add_argument("--memory", type=float, default=None, help="memory limit of every problem in GB")
+	parser.add_argument("--baseline", default=None, help="run id of the baseline (default: the one saved in the store)")
+	parser.add_argument("--save-baseline", action="store_true", help="make this run the baseline of the store")
+	parser.add_argument("--time-tolerance", type=float, default=0.1, help="relative growth of the wall time reported as a regression")
+	parser.add_argument("--rss-tolerance", type=float, default=0.1, help="relative growth of the peak RSS reported as a regression")
+	parser.add_argument("--count-tolerance", type=float, default=0.0, help="relative change of numK, numIa and numBisection reported as a regression")
+	args = parser.parse_args()
+
+	names = [name for name in problems if any(fnmatch.fnmatch(name, pattern) for pattern in args.problems)]
+	if len(names) == 0:
+		raise Exception("benchmark.py: no problem matches " + str(args.problems))
+	memoryLimit = None
+	if args.memory is not None:
+		memoryLimit = int(args.memory*1024**3)
+
+	baselineId = args.baseline
+	if baselineId is None:
+		baselineId = readBaseline(args.store)
+
+	runId = time.strftime("%Y%m%d-%H%M%S") + "-" + str(os.getpid())
+	rows = runBenchmark(names, runId, args.repeats, args.cores, args.timeout, memoryLimit)
+	segmentName = benchmarkStore.appendRows(args.store, rows)
+	print ("run", runId, "written to", segmentName)
+
+	# read the run back so it is compared with the same types as the baseline
+	store = benchmarkStore.loadStore(args.store)
+	rows = benchmarkStore.selectRun(store, runId)
+	for name, row in sorted(bestRows(rows).items()):
+		print ("%-24s %-10s wallTime %10.3f numSolutions %5d numK %8d numIa %8d numBisection %8d peakRssKb %8d" % (name, row["status"],
+			row["wallTime"], np.nan_to_num(row["numSolutions"]), np.nan_to_num(row["numK"]), np.nan_to_num(row["numIa"]),
+			np.nan_to_num(row["numBisection"]), np.nan_to_num(row["peakRssKb"])))
+
+	regressions = []
+	if baselineId is not None:
+		baselineRows = benchmarkStore.selectRun(store, baselineId)
+		if len(baselineRows) == 0:
+			raise Exception("benchmark.py: no run " + baselineId + " in the store " + args.store)
+		regressions, notes = compareRuns(rows, baselineRows, args.time_tolerance, args.rss_tolerance, args.count_tolerance)
+		print ("compared with baseline", baselineId)
+		for note in notes:
+			print ("note:", note)
+		for regression in regressions:
+			print ("regression:", regression)
+		if len(regressions) == 0:
+			print ("no regressions")
+	if args.save_baseline:
+		saveBaseline(args.store, runId)
+		print ("baseline of", args.store, "is now", runId)
+	if len(regressions) > 0:
+		sys.exit(1)
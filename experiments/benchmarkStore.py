@@ -0,0 +1,82 @@
+# Append-only columnar store of benchmark results. The store is a directory
+# holding one .npz segment per benchmark run, with one array per column and one
+# entry per row. A segment is never changed once written: it is written to a
+# temporary file which is then renamed, so a run killed while writing leaves
+# the store as it was. Loading the store concatenates the segments in the
+# order they were written
+
+import os
+import time
+import numpy as np
+
+# Columns of the store as (name, kind) where kind is "f" for float columns
+# and "s" for string columns
+COLUMNS = [("runId", "s"), ("savedAt", "f"), ("problem", "s"), ("repeat", "f"), ("status", "s"),
+			("wallTime", "f"), ("jobTime", "f"), ("numSolutions", "f"), ("numK", "f"), ("numIa", "f"),
+			("numBisection", "f"), ("peakRssKb", "f"), ("cpu", "s"), ("machine", "s"), ("python", "s"),
+			("numpy", "s"), ("gitCommit", "s")]
+
+
+# Return the rows as a dictionary from column names to arrays. Missing or
+# empty values are nan in float columns and "" in string columns
+def rowsToColumns(rows):
+	columns = {}
+	for name, kind in COLUMNS:
+		if kind == "f":
+			values = []
+			for row in rows:
+				value = row.get(name, "")
+				values.append(np.nan if value is None or value == "" else float(value))
+			columns[name] = np.array(values, dtype=np.float64)
+		else:
+			columns[name] = np.array([str(row.get(name, "")) for row in rows], dtype=str)
+	return columns
+
+# Write rows as a new segment of the store in storeDir
+# @param rows list of dictionaries from column names to values
+# @return the name of the segment file
+def appendRows(storeDir, rows):
+	if not(os.path.isdir(storeDir)):
+		os.makedirs(storeDir)
+	columns = rowsToColumns(rows)
+	# the time in the name orders the segments in the order they were written
+	segmentName = os.path.join(storeDir, "%.6f_%d.npz" % (time.time(), os.getpid()))
+	tmpName = segmentName + ".tmp"
+	with open(tmpName, "wb") as segmentFile:
+		np.savez(segmentFile, **columns)
+	os.rename(tmpName, segmentName)
+	return segmentName
+
+# Read one segment written by appendRows as a dictionary from column names to arrays
+def loadSegment(segmentName):
+	segment = np.load(segmentName)
+	try:
+		numRows = len(segment["runId"])
+		columns = {}
+		for name, kind in COLUMNS:
+			if name in segment.files:
+				columns[name] = segment[name]
+			elif kind == "f":
+				# column added after the segment was written
+				columns[name] = np.full((numRows), np.nan)
+			else:
+				columns[name] = np.array([""]*numRows, dtype=str)
+	finally:
+		segment.close()
+	return columns
+
+# Read all the segments of the store in storeDir
+# @return dictionary from column names to arrays with the rows of all the segments
+def loadStore(storeDir):
+	segmentNames = []
+	if os.path.isdir(storeDir):
+		segmentNames = sorted([name for name in os.listdir(storeDir) if name.endswith(".npz")])
+	segments = [loadSegment(os.path.join(storeDir, name)) for name in segmentNames]
+	if len(segments) == 0:
+		return rowsToColumns([])
+	return dict([(name, np.concatenate([segment[name] for segment in segments])) for name, kind in COLUMNS])
+
+# Return the rows of the columns whose runId is runId, as a list of dictionaries
+def selectRun(columns, runId):
+	indices = np.nonzero(columns["runId"] == runId)[0]
+	return [dict([(name, columns[name][i]) for name, kind in COLUMNS]) for i in indices]
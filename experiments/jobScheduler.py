@@ -0,0 +1,171 @@
+# Run experiment jobs in parallel processes, at most numCores at a time.
+# The jobs expected to take longest are started first so that a long job
+# does not start last and keep the run going alone while the other cores
+# are idle. The expected time of a job is the wall time recorded for it in the
+# result file by an earlier run if there is one, and its own estimate otherwise.
+# Every job runs in its own process, is killed when it runs for longer than the
+# timeout and gets an address space limit if a memory limit is given. Only the
+# parent process writes to the result file. Each job adds one row, written with
+# one append and synced to disk, so a run that is killed leaves only
+# complete rows and the rows of the finished jobs
+
+import os
+import csv
+import time
+import traceback
+import multiprocessing
+try:
+	import resource
+except ImportError:
+	resource = None
+try:
+	from StringIO import StringIO
+except ImportError:
+	from io import StringIO
+
+# Columns added by runJobs to the row of every job. status is "ok",
+# "timeout", "memory", "error" or "crashed_<exitcode>"
+SCHEDULER_COLUMNS = ["Job", "status", "wallTime", "peakRssKb"]
+
+
+class Job:
+	# @param name unique name of the job, written to the Job column
+	# @param target function run by the job. It returns a dictionary
+	#	from column names to the values in the row of the job
+	# @param args arguments of target
+	# @param expectedTime estimate of the time taken by the job in seconds
+	def __init__(self, name, target, args, expectedTime):
+		self.name = name
+		self.target = target
+		self.args = args
+		self.expectedTime = expectedTime
+
+# Run job in the current process and send its row through conn
+# @param memoryLimit limit of the address space of the process in bytes or None
+def runJob(job, conn, memoryLimit):
+	if memoryLimit is not None and resource is not None:
+		resource.setrlimit(resource.RLIMIT_AS, (memoryLimit, memoryLimit))
+	try:
+		row = job.target(*job.args)
+		row["status"] = "ok"
+	except MemoryError:
+		row = {"status": "memory"}
+	except Exception:
+		traceback.print_exc()
+		row = {"status": "error"}
+	if resource is not None:
+		peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		# ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+		if os.uname()[0] == "Darwin":
+			peakRss = peakRss // 1024
+		row["peakRssKb"] = peakRss
+	conn.send(row)
+	conn.close()
+
+# Append row to the csv file filename with one write, adding the header
+# if the file is empty
+# @param columns the columns of the file
+# @param row dictionary from column names to values. Missing columns are left empty
+def appendRow(filename, columns, row):
+	buf = StringIO()
+	writer = csv.writer(buf)
+	if not(os.path.exists(filename)) or os.path.getsize(filename) == 0:
+		writer.writerow(columns)
+	writer.writerow([row.get(column, "") for column in columns])
+	data = buf.getvalue()
+	if not(isinstance(data, bytes)):
+		data = data.encode("utf-8")
+	fd = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+	try:
+		os.write(fd, data)
+		os.fsync(fd)
+	finally:
+		os.close(fd)
+
+# Return a dictionary from job names to the wall times recorded in the result
+# file filename. Jobs that timed out are recorded with the timeout
+def readPreviousTimes(filename):
+	times = {}
+	if not(os.path.exists(filename)):
+		return times
+	with open(filename) as resultFile:
+		for row in csv.DictReader(resultFile):
+			name, wallTime = row.get("Job"), row.get("wallTime")
+			if name is None or wallTime is None or wallTime == "":
+				continue
+			try:
+				times[name] = float(wallTime)
+			except ValueError:
+				pass
+	return times
+
+# Run jobs in parallel and append one row for each job to the csv file resultFilename
+# @param jobs list of Job
+# @param resultFilename csv file the rows are appended to. If None, the rows
+#	are only passed to onRow
+# @param columns the columns of the result file. SCHEDULER_COLUMNS are added
+#	to them if they are not there
+# @param numCores maximum number of jobs running at the same time. If None,
+#	the number of cpus is used
+# @param timeout in seconds after which a job is killed
+# @param memoryLimit limit of the address space of each job in bytes or None
+# @param pollInterval time in seconds between checks of the running jobs
+# @param onRow function called with the row of every finished job
+def runJobs(jobs, resultFilename, columns, numCores=None, timeout=36000, memoryLimit=None, pollInterval=0.1, onRow=None):
+	if numCores is None:
+		numCores = multiprocessing.cpu_count()
+	columns = columns + [column for column in SCHEDULER_COLUMNS if column not in columns]
+	previousTimes = {}
+	if resultFilename is not None:
+		previousTimes = readPreviousTimes(resultFilename)
+	# sorted by increasing expected time, so pop returns the longest job
+	pending = sorted(jobs, key=lambda job: previousTimes.get(job.name, job.expectedTime))
+
+	# (job, process, connection, start time) of the running jobs
+	running = []
+	try:
+		while len(pending) > 0 or len(running) > 0:
+			while len(pending) > 0 and len(running) < numCores:
+				job = pending.pop()
+				recvConn, sendConn = multiprocessing.Pipe(False)
+				process = multiprocessing.Process(target=runJob, name=job.name, args=(job, sendConn, memoryLimit))
+				process.start()
+				sendConn.close()
+				running.append((job, process, recvConn, time.time()))
+				print ("started", job.name, "pending", len(pending))
+
+			stillRunning = []
+			for job, process, conn, start in running:
+				wallTime = time.time() - start
+				if conn.poll():
+					try:
+						row = conn.recv()
+					except EOFError:
+						# the job exited without sending its row
+						row = None
+					process.join()
+					if row is None:
+						row = {"status": "crashed_" + str(process.exitcode)}
+				elif wallTime > timeout:
+					process.terminate()
+					process.join()
+					row = {"status": "timeout"}
+				else:
+					stillRunning.append((job, process, conn, start))
+					continue
+				conn.close()
+				row["Job"] = job.name
+				row["wallTime"] = wallTime
+				if resultFilename is not None:
+					appendRow(resultFilename, columns, row)
+				if onRow is not None:
+					onRow(row)
+				print ("finished", job.name, row["status"], "wallTime", wallTime)
+			running = stillRunning
+			if len(running) > 0:
+				time.sleep(pollInterval)
+	finally:
+		for job, process, conn, start in running:
+			if process.is_alive():
+				process.terminate()
+				process.join()
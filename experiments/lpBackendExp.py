@@ -0,0 +1,99 @@
+import sys
+import csv
+import time
+import numpy as np
+
+sys.path.append('../')
+from prototype import *
+import lpUtilsMark
+
+# Compare the LP backends of lpUtilsMark on the rambus oscillator and the
+# schmitt trigger. For every backend, the problems are solved with useLp = True
+# and the solving time, the time spent in linear programs and the number of
+# solutions are written to a csv file. The linear programs built by
+# circuit.Circuit.lp during the cvxopt run are also recorded and the minimum
+# and maximum of every interval node voltage is computed with every backend
+# to compare the backends on exactly the same linear programs
+
+problems = [("rambus", "lcMosfet", 2), ("rambus", "lcMosfet", 3), ("rambus", "scMosfet", 2),
+			("schmitt", "lcMosfet", 0.9), ("schmitt", "scMosfet", 0.9)]
+
+def runProblem(problem, statVars, lpBackend):
+	problemType, modelType, param = problem
+	if problemType == "rambus":
+		return rambusOscillator(modelType=modelType, numStages=param, g_cc=4.0, statVars=statVars, epsilonInflation=0.001, useLp=True, lpBackend=lpBackend)
+	return schmittTrigger(modelType=modelType, inputVoltage=param, statVars=statVars, useLp=True, lpBackend=lpBackend)
+
+# Solve problem with every backend and return the rows for the csv file.
+# The linear programs of the first run are appended to recordedLps
+def runBackends(problem, recordedLps):
+	rows = []
+	lpFun = circuit.Circuit.lp
+	for lpBackend in lpUtilsMark.LP_BACKENDS:
+		def recordingLp(self, V, grndPowerIndex):
+			lp = lpFun(self, V, grndPowerIndex)
+			recordedLps.append((lp, len(V), [interval_p(v) for v in V]))
+			return lp
+		if len(rows) == 0:
+			circuit.Circuit.lp = recordingLp
+		statVars = {}
+		start = time.time()
+		try:
+			allHypers = runProblem(problem, statVars, lpBackend)
+		finally:
+			circuit.Circuit.lp = lpFun
+		timeTaken = time.time() - start
+		print (problem, lpBackend, "numSolutions", len(allHypers), "timeTaken", timeTaken, "totalLPTime", statVars["totalLPTime"])
+		rows.append(["_".join([str(p) for p in problem]), lpBackend, len(allHypers), statVars["numLpCalls"], statVars["numSuccessLpCalls"], statVars["totalLPTime"], timeTaken])
+	return rows
+
+# Compute the minimum and maximum of every interval node voltage in the recorded
+# linear programs with every backend. Print the time taken by every backend and
+# the largest difference of its bounds with the bounds found by the first backend
+def compareOnRecordedLps(recordedLps):
+	allBounds = []
+	for lpBackend in lpUtilsMark.LP_BACKENDS:
+		bounds = []
+		start = time.time()
+		for lp, numNodes, isInterval in recordedLps:
+			fixedLp = lpUtilsMark.FixedConstraintLP(lp, lpBackend)
+			numVars = len(lp.A[0]) if len(lp.A) > 0 else len(lp.Aeq[0])
+			for i in range(numNodes):
+				if not(isInterval[i]):
+					continue
+				for sign in [1.0, -1.0]:
+					cost = np.zeros((numVars))
+					cost[i] = sign
+					sol = fixedLp.solve(cost)
+					if sol is None or sol["status"] != "optimal":
+						bounds.append(None)
+					else:
+						bounds.append(sol['x'][i])
+		print (lpBackend, "numLps", len(bounds), "timeTaken", time.time() - start)
+		allBounds.append(bounds)
+
+	for b in range(1, len(allBounds)):
+		maxDiff, numStatusDiff = 0.0, 0
+		for bound0, bound in zip(allBounds[0], allBounds[b]):
+			if bound0 is None or bound is None:
+				if (bound0 is None) != (bound is None):
+					numStatusDiff += 1
+				continue
+			maxDiff = max(maxDiff, abs(bound0 - bound))
+		print (lpUtilsMark.LP_BACKENDS[0], "vs", lpUtilsMark.LP_BACKENDS[b], "maxDiff", maxDiff, "numStatusDiff", numStatusDiff)
+
+
+if __name__ == "__main__":
+	timingFilename = "lpBackend_timing.csv"
+	if len(sys.argv) > 1:
+		timingFilename = sys.argv[1]
+	csvTimeData = [["Problem", "lpBackend", "NumSolutions", "numLpCalls", "numSuccessLpCalls", "totalLPTime", "timeTaken"]]
+	recordedLps = []
+	for problem in problems:
+		csvTimeData += runBackends(problem, recordedLps)
+	compareOnRecordedLps(recordedLps)
+
+	timeFile = open(timingFilename, 'w')
+	with timeFile:
+		writer = csv.writer(timeFile)
+		writer.writerows(csvTimeData)
@@ -1,355 +1,134 @@
 import sys
-import csv
-import multiprocessing
+import argparse
 
 sys.path.append('../')
 from prototype import *
-
-def runRambusExperiment(timingFilename, modelType, numStages, gcc):
-	useLp = True
-	numTrials = 1
-
-	headers = ["Problem", "bisectType", "kAlpha", "epsilonInflation", "NumSolutions", "numBisection", "numLP", "numK", "numIa","numSingleKill", "numDoubleKill", "totalLPTime", "totalKTime", "totalIaTime","avgLPTime", "avgKTime","avgIaTime"]
-	for i in range(numTrials):
-		headers.append("Run_"+str(i))
-	headers.append("AverageRun")
-	headers.append("UseLp")
-	csvTimeData = [headers]
-
-	#kAlphaArray = [0.2, 0.4, 0.6, 0.8, 1.0]
-	kAlphaArray = [1.0]
-	#bisectionTypes = ["bisectMax", "bisectNewton"]
-	bisectionTypes = ["bisectMax"]
-	#epsilonInflations = [0.0001, 0.001, 0.01, 0.1]
-	epsilonInflations = [0.001]
-
-	for epsilonInflation in epsilonInflations:
-		for bisectType in bisectionTypes:
-			for kAlpha in kAlphaArray:	
-				print ("rambus modelType", modelType, "numStages", numStages, "gcc", gcc)
-				print ("bisectType", bisectType, "kAlpha", kAlpha, "epsilonInflation", epsilonInflation)
-				problemName = "rambus_"+modelType+"_stgs_"+str(numStages)+"_gcc_"+str(gcc)
-
-				timeData = [problemName]
-				if not(useLp):
-					problemName += "_useLP_false"
-
-				totalRun = 0
-				for n in range(numTrials):
-					# churning before carrying out actual experiment
-					rambusOscillator(modelType="tanh", numStages=2, g_cc=4.0, statVars={}, kAlpha=1.0, epsilonInflation=0.01, bisectType="bisectMax", numSolutions="all", useLp=False)
-					start = time.time()
-					statVars = {}
-					allHypers = rambusOscillator(modelType=modelType, numStages=numStages, g_cc=gcc, statVars=statVars, kAlpha=kAlpha, epsilonInflation=epsilonInflation, bisectType=bisectType, numSolutions="all", useLp=useLp)
-					end = time.time()
-					numSolutions = len(allHypers)
-					timeTaken = end - start
-					totalRun += timeTaken
-					print ("run ", n, "timeTaken", timeTaken)
-
-					if n == 0:
-						timeData.append(bisectType)
-						timeData.append(kAlpha)
-						timeData.append(epsilonInflation)
-						timeData.append(numSolutions)
-						timeData.append(statVars["numBisection"])
-						timeData.append(statVars["numLp"])
-						timeData.append(statVars["numK"])
-						timeData.append(statVars["numIa"])
-						timeData.append(statVars["numSingleKill"])
-						timeData.append(statVars["numDoubleKill"])
-						timeData.append(statVars["totalLPTime"])
-						timeData.append(statVars["totalKTime"])
-						timeData.append(statVars["totalIaTime"])
-						timeData.append(statVars["avgLPTime"])
-						timeData.append(statVars["avgKTime"])
-						timeData.append(statVars["avgIaTime"])
-
-					timeData.append(timeTaken)
-
-				avgRun = totalRun/(numTrials*1.0)
-				timeData.append(avgRun)
-				if not(useLp):
-					timeData.append("False")
-				else:
-					timeData.append("True")
-
-				csvTimeData.append(timeData)
-					
-	timeFile = open(timingFilename, 'a')
-	with timeFile:
-		writer = csv.writer(timeFile)
-		writer.writerows(csvTimeData)
-
-def runSchmittExperiment(timingFilename, modelType, inputVoltage, bisectType):
-	numTrials = 1
-	useLp = False
-	
-	headers = ["Problem", "bisectType","NumSolutions", "numBisection", "numLP", "numK", "numIa","numSingleKill", "numDoubleKill", "totalLPTime", "totalKTime", "totalIaTime","avgLPTime", "avgKTime","avgIaTime"]
-	for i in range(numTrials):
-		headers.append("Run_"+str(i))
-	headers.append("UseLp")
-	csvTimeData = [headers]
-
+from jobScheduler import Job, runJobs
+
+# Run the solver on a grid of configurations of the rambus oscillator, the
+# schmitt trigger, the inverter and the inverter loop. The configurations run
+# in parallel with jobScheduler.runJobs and every one of them adds one row
+# to the timing file
+
+# Columns of the timing file. jobScheduler.SCHEDULER_COLUMNS are added after them
+columns = ["Problem", "bisectType", "kAlpha", "epsilonInflation", "NumSolutions", "numBisection", "numLP", "numK", "numIa","numSingleKill", "numDoubleKill", "totalLPTime", "totalKTime", "totalIaTime","avgLPTime", "avgKTime","avgIaTime", "Run_0", "UseLp"]
+
+# Return the row of the timing file for one run of the solver
+def statRow(problemName, bisectType, kAlpha, epsilonInflation, allHypers, statVars, timeTaken, useLp):
+	row = {"Problem": problemName, "bisectType": bisectType, "kAlpha": kAlpha, "epsilonInflation": epsilonInflation,
+			"NumSolutions": len(allHypers), "Run_0": timeTaken, "UseLp": str(useLp)}
+	for column, statName in [("numBisection", "numBisection"), ("numLP", "numLp"), ("numK", "numK"), ("numIa", "numIa"),
+							("numSingleKill", "numSingleKill"), ("numDoubleKill", "numDoubleKill"),
+							("totalLPTime", "totalLPTime"), ("totalKTime", "totalKTime"), ("totalIaTime", "totalIaTime"),
+							("avgLPTime", "avgLPTime"), ("avgKTime", "avgKTime"), ("avgIaTime", "avgIaTime")]:
+		row[column] = statVars[statName]
+	return row
+
+def runRambusExperiment(modelType, numStages, gcc, bisectType, kAlpha, epsilonInflation, useLp):
+	print ("rambus modelType", modelType, "numStages", numStages, "gcc", gcc)
+	print ("bisectType", bisectType, "kAlpha", kAlpha, "epsilonInflation", epsilonInflation)
+	problemName = "rambus_"+modelType+"_stgs_"+str(numStages)+"_gcc_"+str(gcc)
+	# churning before carrying out actual experiment
+	rambusOscillator(modelType="tanh", numStages=2, g_cc=4.0, statVars={}, kAlpha=1.0, epsilonInflation=0.01, bisectType="bisectMax", numSolutions="all", useLp=False)
+	statVars = {}
+	start = time.time()
+	allHypers = rambusOscillator(modelType=modelType, numStages=numStages, g_cc=gcc, statVars=statVars, kAlpha=kAlpha, epsilonInflation=epsilonInflation, bisectType=bisectType, numSolutions="all", useLp=useLp)
+	timeTaken = time.time() - start
+	print ("timeTaken", timeTaken)
+	return statRow(problemName, bisectType, kAlpha, epsilonInflation, allHypers, statVars, timeTaken, useLp)
+
+def runSchmittExperiment(modelType, inputVoltage, bisectType, kAlpha, epsilonInflation, useLp):
 	print ("schmitt modelType", modelType, "inputVoltage", inputVoltage)
 	problemName = "schmitt_"+modelType+"_input_voltage_"+str(inputVoltage)
-	timeData = [problemName]
-
-	for n in range(numTrials):
-		statVars = {}
-		start = time.time()
-		allHypers = schmittTrigger(modelType=modelType, inputVoltage = inputVoltage, bisectType=bisectType, statVars=statVars, numSolutions = "all", useLp = useLp)
-		end = time.time()
-		numSolutions = len(allHypers)
-		timeTaken = end - start
-		print ("run ", n, "timeTaken", timeTaken)
-
-		if n == 0:
-			timeData.append(bisectType)
-			timeData.append(numSolutions)
-			timeData.append(statVars["numBisection"])
-			timeData.append(statVars["numLp"])
-			timeData.append(statVars["numK"])
-			timeData.append(statVars["numIa"])
-			timeData.append(statVars["numSingleKill"])
-			timeData.append(statVars["numDoubleKill"])
-			timeData.append(statVars["totalLPTime"])
-			timeData.append(statVars["totalKTime"])
-			timeData.append(statVars["totalIaTime"])
-			timeData.append(statVars["avgLPTime"])
-			timeData.append(statVars["avgKTime"])
-			timeData.append(statVars["avgIaTime"])
-
-		timeData.append(timeTaken)
-	
-	if not(useLp):
-		timeData.append("False")
-	else:
-		timeData.append("True")
-	csvTimeData.append(timeData)
-					
-	timeFile = open(timingFilename, 'a')
-	with timeFile:
-		writer = csv.writer(timeFile)
-		writer.writerows(csvTimeData)
-
-def runInverterLoopExperiment(timingFilename, modelType, numInverters, bisectType):
-	numTrials = 1
-	useLp = False
-	
-	headers = ["Problem", "bisectType","NumSolutions", "numBisection", "numLP", "numK", "numSingleKill", "numDoubleKill", "totalLPTime", "totalKTime", "avgLPTime", "avgKTime"]
-	for i in range(numTrials):
-		headers.append("Run_"+str(i))
-	headers.append("UseLp")
-	csvTimeData = [headers]
-
-	print ("inverterLoop modelType", modelType, "numInverters", numInverters)
-	problemName = "inverterLoop_"+modelType+"_numInverters_"+str(numInverters)
-	timeData = [problemName]
-
-	for n in range(numTrials):
-		statVars = {}
-		start = time.time()
-		allHypers = inverterLoop(modelType=modelType, numInverters=numInverters, bisectType=bisectType, statVars=statVars, numSolutions="all" , useLp=useLp)
-		end = time.time()
-		numSolutions = len(allHypers)
-		timeTaken = end - start
-		print ("run ", n, "timeTaken", timeTaken)
-
-		if n == 0:
-			timeData.append(bisectType)
-			timeData.append(numSolutions)
-			timeData.append(statVars["numBisection"])
-			timeData.append(statVars["numLp"])
-			timeData.append(statVars["numK"])
-			timeData.append(statVars["numSingleKill"])
-			timeData.append(statVars["numDoubleKill"])
-			timeData.append(statVars["totalLPTime"])
-			timeData.append(statVars["totalKTime"])
-			timeData.append(statVars["avgLPTime"])
-			timeData.append(statVars["avgKTime"])
-
-		timeData.append(timeTaken)
-	
-	if not(useLp):
-		timeData.append("False")
-	else:
-		timeData.append("True")
-	csvTimeData.append(timeData)
-					
-	timeFile = open(timingFilename, 'a')
-	with timeFile:
-		writer = csv.writer(timeFile)
-		writer.writerows(csvTimeData)
-
-
-def runInverterExperiment(timingFilename, modelType, inputVoltage, bisectType):
-	numTrials = 1
-	useLp = False
-	
-	headers = ["Problem", "bisectType", "NumSolutions", "numBisection", "numLP", "numK", "numSingleKill", "numDoubleKill", "totalLPTime", "totalKTime", "avgLPTime", "avgKTime"]
-	for i in range(numTrials):
-		headers.append("Run_"+str(i))
-	headers.append("UseLp")
-	csvTimeData = [headers]
-
+	statVars = {}
+	start = time.time()
+	allHypers = schmittTrigger(modelType=modelType, inputVoltage=inputVoltage, statVars=statVars, kAlpha=kAlpha, epsilonInflation=epsilonInflation, bisectType=bisectType, numSolutions="all", useLp=useLp)
+	timeTaken = time.time() - start
+	print ("timeTaken", timeTaken)
+	return statRow(problemName, bisectType, kAlpha, epsilonInflation, allHypers, statVars, timeTaken, useLp)
+
+def runInverterExperiment(modelType, inputVoltage, bisectType, kAlpha, epsilonInflation, useLp):
 	print ("inverter modelType", modelType, "inputVoltage", inputVoltage)
 	problemName = "inverter_"+modelType+"_input_voltage_"+str(inputVoltage)
-	timeData = [problemName]
-
-	for n in range(numTrials):
-		statVars = {}
-		start = time.time()
-		allHypers = inverter(modelType=modelType, inputVoltage=inputVoltage, bisectType=bisectType, statVars=statVars, numSolutions="all" , useLp=useLp)
-		end = time.time()
-		numSolutions = len(allHypers)
-		timeTaken = end - start
-		print ("run ", n, "timeTaken", timeTaken)
-
-		if n == 0:
-			timeData.append(bisectType)
-			timeData.append(numSolutions)
-			timeData.append(statVars["numBisection"])
-			timeData.append(statVars["numLp"])
-			timeData.append(statVars["numK"])
-			timeData.append(statVars["numSingleKill"])
-			timeData.append(statVars["numDoubleKill"])
-			timeData.append(statVars["totalLPTime"])
-			timeData.append(statVars["totalKTime"])
-			timeData.append(statVars["avgLPTime"])
-			timeData.append(statVars["avgKTime"])
-
-		timeData.append(timeTaken)
-	
-	if not(useLp):
-		timeData.append("False")
-	else:
-		timeData.append("True")
-	csvTimeData.append(timeData)
-					
-	timeFile = open(timingFilename, 'a')
-	with timeFile:
-		writer = csv.writer(timeFile)
-		writer.writerows(csvTimeData)
-
+	statVars = {}
+	start = time.time()
+	allHypers = inverter(modelType=modelType, inputVoltage=inputVoltage, statVars=statVars, kAlpha=kAlpha, epsilonInflation=epsilonInflation, bisectType=bisectType, numSolutions="all", useLp=useLp)
+	timeTaken = time.time() - start
+	print ("timeTaken", timeTaken)
+	return statRow(problemName, bisectType, kAlpha, epsilonInflation, allHypers, statVars, timeTaken, useLp)
+
+def runInverterLoopExperiment(modelType, numInverters, bisectType, kAlpha, epsilonInflation, useLp):
+	print ("inverterLoop modelType", modelType, "numInverters", numInverters)
+	problemName = "inverterLoop_"+modelType+"_numInverters_"+str(numInverters)
+	statVars = {}
+	start = time.time()
+	allHypers = inverterLoop(modelType=modelType, numInverters=numInverters, statVars=statVars, kAlpha=kAlpha, epsilonInflation=epsilonInflation, bisectType=bisectType, numSolutions="all", useLp=useLp)
+	timeTaken = time.time() - start
+	print ("timeTaken", timeTaken)
+	return statRow(problemName, bisectType, kAlpha, epsilonInflation, allHypers, statVars, timeTaken, useLp)
+
+# Rough estimate of the time in seconds taken by the rambus oscillator from the
+# timings in data/solver_time_dateFinal.csv. Every two stages multiply the time
+# by about 75 and the problems with gcc = 0.5 take about twice as long
+def rambusExpectedTime(modelType, numStages, gcc):
+	baseTimes = {"tanh": 0.6, "lcMosfet": 2.0, "scMosfet": 5.0}
+	expectedTime = baseTimes.get(modelType, 5.0)*75.0**((numStages - 2)/2.0)
+	if gcc < 1.0:
+		expectedTime *= 2.0
+	return expectedTime
+
+# Return the jobs of the grid of experiments
+def experimentJobs(bisectTypes, kAlphas, epsilonInflations):
+	jobs = []
+	for bisectType in bisectTypes:
+		for kAlpha in kAlphas:
+			for epsilonInflation in epsilonInflations:
+				configName = "_"+bisectType+"_kAlpha_"+str(kAlpha)+"_eps_"+str(epsilonInflation)
+
+				# rambus experiments
+				for modelType in ["tanh","lcMosfet","scMosfet"]:
+					for numStages in [2, 4, 6]:
+						for gcc in [4.0, 0.5]:
+							name = "rambus_"+modelType+"_stgs_"+str(numStages)+"_gcc_"+str(gcc)+configName
+							jobs.append(Job(name, runRambusExperiment, (modelType, numStages, gcc, bisectType, kAlpha, epsilonInflation, True),
+											rambusExpectedTime(modelType, numStages, gcc)))
+
+				# schmitt trigger experiments
+				for modelType, inputVoltages in [("lcMosfet", [0.0, 0.9, 1.8]), ("scMosfet", [0.0, 0.5, 1.0])]:
+					for inputVoltage in inputVoltages:
+						name = "schmitt_"+modelType+"_input_voltage_"+str(inputVoltage)+configName
+						jobs.append(Job(name, runSchmittExperiment, (modelType, inputVoltage, bisectType, kAlpha, epsilonInflation, False), 2.0))
+
+				# inverter experiments
+				for modelType, inputVoltages in [("tanh", [-1.0, 1.0]), ("lcMosfet", [0.0, 1.8]), ("scMosfet", [0.0, 1.0])]:
+					for inputVoltage in inputVoltages:
+						name = "inverter_"+modelType+"_input_voltage_"+str(inputVoltage)+configName
+						jobs.append(Job(name, runInverterExperiment, (modelType, inputVoltage, bisectType, kAlpha, epsilonInflation, False), 0.1))
+
+				# inverter loop experiments
+				for modelType in ["tanh","lcMosfet","scMosfet"]:
+					for numInverters in [1, 2, 3, 4]:
+						name = "inverterLoop_"+modelType+"_numInverters_"+str(numInverters)+configName
+						jobs.append(Job(name, runInverterLoopExperiment, (modelType, numInverters, bisectType, kAlpha, epsilonInflation, False), 1.0))
+	return jobs
 
 
 if __name__ == '__main__':
-	timeout = 36000 # in seconds (10 hours)
-	timingFilename = "../data/solver_time_main.csv"
-	#timingFilename = "../data/solver_time_mainLpDATE.csv"
-	#timingFilename = "../data/solver_time_bisectTypeDATE.csv"
-	#timingFilename = "../data/solver_time_kAlphaDATE.csv"
-	#timingFilename = "../data/solver_time_epsilonVarDATE.csv"
-	#timingFilename = "../data/solver_time_dateFinal.csv"
-
-	# Run rambus experiments
-	modelTypesL = ["tanh","lcMosfet","scMosfet"]
-	numStagesL = [2, 4, 6]
-	gccL = [4.0, 0.5]
-	for modelType in modelTypesL:
-		for numStages in numStagesL:
-			for gcc in gccL:	
-				p = multiprocessing.Process(target=runRambusExperiment, name="RunRambusExperiment", args=(timingFilename, modelType, numStages, gcc))
-				
-				p.start()
-
-				# Wait a maximum of timeout seconds for process
-				# Usage: join([timeout in seconds])
-				p.join(timeout)
-
-				# If thread is active
-				if p.is_alive():
-					print "After 10 hours... let's kill it..."
-
-					# Terminate process
-					p.terminate()
-					p.join()
-
-	# Run schmitt trigger experiments
-	modelTypesL = ["lcMosfet","scMosfet"]
-	inputVoltages = []
-	for modelType in modelTypesL:
-		if modelType == "lcMosfet":
-			inputVoltages = [0.0, 0.9, 1.8]
-			bisectType = "bisectMax"
-		elif modelType == "scMosfet":
-			inputVoltages = [0.0, 0.5, 1.0]
-			bisectType = "bisectMax"
-		for inputVoltage in inputVoltages:
-			p = multiprocessing.Process(target=runSchmittExperiment, name="RunSchmittExperiment", args=(timingFilename, modelType, inputVoltage, bisectType))
-			p.start()
-
-			# Wait a maximum of timeout seconds for process
-			# Usage: join([timeout in seconds])
-			p.join(timeout)
-
-			# If thread is active
-			if p.is_alive():
-				print "After 10 hours... let's kill it..."
-
-				# Terminate process
-				p.terminate()
-				p.join()
-
-	# Run inverter experiments
-	modelTypesL = ["tanh","lcMosfet","scMosfet"]
-	inputVoltages = []
-	for modelType in modelTypesL:
-		if modelType == "tanh":
-			inputVoltages = [-1.0, 1.0]
-			bisectType = "bisectMax"
-		elif modelType == "lcMosfet":
-			inputVoltages = [0.0, 1.8]
-			bisectType = "bisectMax"
-		elif modelType == "scMosfet":
-			inputVoltages = [0.0, 1.0]
-			bisectType = "bisectMax"
-		for inputVoltage in inputVoltages:
-			p = multiprocessing.Process(target=runInverterExperiment, name="RunInverterExperiment", args=(timingFilename, modelType, inputVoltage, bisectType))
-			p.start()
-
-
-			# Wait a maximum of timeout seconds for process
-			# Usage: join([timeout in seconds])
-			p.join(timeout)
-
-			# If thread is active
-			if p.is_alive():
-				print "After 10 hours... let's kill it..."
-
-				# Terminate process
-				p.terminate()
-				p.join()
-
-	# Run inverter loop experiments
-	modelTypesL = ["tanh","lcMosfet","scMosfet"]
-	numInvertersL = [1, 2, 3, 4]
-	for modelType in modelTypesL:
-		if modelType == "tanh":
-			bisectType = "bisectMax"
-		elif modelType == "lcMosfet":
-			bisectType = "bisectMax"
-		elif modelType == "scMosfet":
-			bisectType = "bisectMax"
-		for numInverters in numInvertersL:
-			p = multiprocessing.Process(target=runInverterLoopExperiment, name="RunInverterLoopExperiment", args=(timingFilename, modelType, numInverters, bisectType))
-			p.start()
-
-
-			# Wait a maximum of timeout seconds for process
-			# Usage: join([timeout in seconds])
-			p.join(timeout)
-
-			# If thread is active
-			if p.is_alive():
-				print "After 10 hours... let's kill it..."
-
-				# Terminate process
-				p.terminate()
-				p.join()
-
-
-	
-
+	parser = argparse.ArgumentParser(description="Run the solver experiments in parallel")
+	parser.add_argument("--output", default="../data/solver_time_main.csv", help="csv file the rows are appended to")
+	parser.add_argument("--cores", type=int, default=None, help="number of experiments run at the same time (default: number of cpus)")
+	parser.add_argument("--timeout", type=float, default=36000, help="time in seconds after which an experiment is killed (default: 10 hours)")
+	parser.add_argument("--memory", type=float, default=None, help="memory limit of every experiment in GB")
+	args = parser.parse_args()
+
+	#bisectTypes = ["bisectMax", "bisectNewton"]
+	bisectTypes = ["bisectMax"]
+	#kAlphas = [0.2, 0.4, 0.6, 0.8, 1.0]
+	kAlphas = [1.0]
+	#epsilonInflations = [0.0001, 0.001, 0.01, 0.1]
+	epsilonInflations = [0.001]
 
+	memoryLimit = None
+	if args.memory is not None:
+		memoryLimit = int(args.memory*1024**3)
+	runJobs(experimentJobs(bisectTypes, kAlphas, epsilonInflations), args.output, columns, numCores=args.cores, timeout=args.timeout, memoryLimit=memoryLimit)
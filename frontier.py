@@ -0,0 +1,149 @@
+# Frontiers holding the hyperrectangles the solver still has to process.
+# The order in which they are popped decides the search order: StackFrontier
+# pops the last hyperrectangle pushed (depth first, the order the solver always
+# used), QueueFrontier the first one (breadth first) and PriorityFrontier the one
+# with the lowest score. The scores below favour hyperrectangles that are likely
+# to hold a solution or to be decided cheaply, which finds the first solutions
+# sooner when only numSolutions of them are wanted. The frontiers can also hold
+# the slots of hyperrectangles kept in a boxPool.BoxPool instead of the
+# hyperrectangles themselves
+
+import collections
+import heapq
+import numpy as np
+import intervalUtils
+
+# Search orders that can be given to makeFrontier. "lifo" and "fifo" are
+# StackFrontier and QueueFrontier, the others are PriorityFrontier with
+# the score function of the same name in SCORE_FUNCTIONS
+SEARCH_ORDERS = ["lifo", "fifo", "volume", "residual", "newton"]
+
+
+class StackFrontier:
+	def __init__(self):
+		self.hypers = []
+
+	def __len__(self):
+		return len(self.hypers)
+
+	def push(self, hyper):
+		self.hypers.append(hyper)
+
+	def extend(self, hypers):
+		self.hypers.extend(hypers)
+
+	def pop(self):
+		return self.hypers.pop(-1)
+
+	# Push hypers so that they are popped in the order they are given
+	def restore(self, hypers):
+		self.hypers.extend(hypers[::-1])
+
+	# Return the hyperrectangles in the frontier in the order they are popped
+	def items(self):
+		return self.hypers[::-1]
+
+
+class QueueFrontier:
+	def __init__(self):
+		self.hypers = collections.deque()
+
+	def __len__(self):
+		return len(self.hypers)
+
+	def push(self, hyper):
+		self.hypers.append(hyper)
+
+	def extend(self, hypers):
+		self.hypers.extend(hypers)
+
+	def pop(self):
+		return self.hypers.popleft()
+
+	def restore(self, hypers):
+		self.hypers.extend(hypers)
+
+	def items(self):
+		return list(self.hypers)
+
+
+class PriorityFrontier:
+	# @param scoreFun function taking the model and a hyperrectangle and
+	#	returning its score. The hyperrectangle with the lowest score is
+	#	popped first and ties are popped depth first, the last one pushed first
+	# @param model the model passed to scoreFun
+	# @param pool BoxPool holding the hyperrectangles if the frontier holds their
+	#	slots, None if it holds the hyperrectangles
+	def __init__(self, scoreFun, model, pool=None):
+		self.scoreFun = scoreFun
+		self.model = model
+		self.pool = pool
+		self.heap = []
+		self.numPushed = 0
+
+	def __len__(self):
+		return len(self.heap)
+
+	def push(self, hyper):
+		if self.pool is None:
+			score = self.scoreFun(self.model, hyper)
+		else:
+			score = self.scoreFun(self.model, self.pool.box(hyper))
+		heapq.heappush(self.heap, (score, -self.numPushed, hyper))
+		self.numPushed += 1
+
+	def extend(self, hypers):
+		for hyper in hypers:
+			self.push(hyper)
+
+	def pop(self):
+		return heapq.heappop(self.heap)[2]
+
+	# hyperrectangles pushed later are popped first among
+	# those with the same score
+	def restore(self, hypers):
+		self.extend(hypers[::-1])
+
+	def items(self):
+		return [entry[2] for entry in sorted(self.heap, key=lambda entry: entry[:2])]
+
+
+# Smaller hyperrectangles are closer to being decided
+def volumeScore(model, hyper):
+	return intervalUtils.volume(hyper)
+
+# Norm of the function at the midpoint of hyper. Hyperrectangles
+# around a solution have a small residual at their midpoint
+def residualScore(model, hyper):
+	mid = (hyper[:,0] + hyper[:,1])/2.0
+	return np.linalg.norm(model.f(mid))
+
+# Distance from hyper to the solution found by Newton's method from the midpoint
+# of hyper. Hyperrectangles containing that solution score 0 and those for which
+# Newton's method does not converge are popped last
+def newtonScore(model, hyper):
+	mid = (hyper[:,0] + hyper[:,1])/2.0
+	converged, soln = intervalUtils.newton(model, mid)
+	if not(converged):
+		return float("inf")
+	outside = np.maximum(hyper[:,0] - soln, 0.0) + np.maximum(soln - hyper[:,1], 0.0)
+	return np.linalg.norm(outside)
+
+SCORE_FUNCTIONS = {"volume": volumeScore, "residual": residualScore, "newton": newtonScore}
+
+# Return an empty frontier for the given search order
+# @param searchOrder one of SEARCH_ORDERS or a score function taking the
+#	model and a hyperrectangle, in which case a PriorityFrontier is used
+# @param model indicates the problem we are trying to solve
+# @param pool BoxPool holding the hyperrectangles if the frontier is going to
+#	hold their slots
+def makeFrontier(searchOrder, model, pool=None):
+	if callable(searchOrder):
+		return PriorityFrontier(searchOrder, model, pool)
+	if searchOrder == "lifo":
+		return StackFrontier()
+	if searchOrder == "fifo":
+		return QueueFrontier()
+	if searchOrder in SCORE_FUNCTIONS:
+		return PriorityFrontier(SCORE_FUNCTIONS[searchOrder], model, pool)
+	raise Exception("frontier.py makeFrontier: unknown search order " + str(searchOrder))
@@ -112,6 +112,29 @@ def trianglePoints(function, functionDer, inputLow, inputHigh, a, b=None):
 # and a secant line between the interval bounds depending on the convexity of the
 # function. Otherwise it just returns constraints indicating the interval bounds
 def triangleBounds(function, functionDer, inputVar, outputVar, inputLow, inputHigh, secDer, a, b=None):
+	dLow, cLow, dHigh, cHigh, dThird, cThird = triangleLines(function, functionDer, inputLow, inputHigh, a, b)
+
+	overallConstraint = ""
+	overallConstraint += "1 " + inputVar + " >= " + str(inputLow) + "\n"
+	overallConstraint += "1 " + inputVar + " <= " + str(inputHigh) + "\n"
+	if secDer == None:
+		return overallConstraint
+
+	if secDer == "pos":
+		return overallConstraint + "1 "+ outputVar + " + " +str(-dThird) + " " + inputVar + " <= "+str(cThird)+"\n" +\
+				"1 "+outputVar + " + " +str(-dLow) + " " + inputVar + " >= "+str(cLow)+"\n" +\
+				"1 "+outputVar + " + " +str(-dHigh) + " " + inputVar + " >= "+str(cHigh) + "\n"
+
+	
+	if secDer == "neg":
+		return overallConstraint + "1 "+ outputVar + " + " +str(-dThird) + " " + inputVar + " >= "+str(cThird)+"\n" +\
+				"1 "+outputVar + " + " +str(-dLow) + " " + inputVar + " <= "+str(cLow)+"\n" +\
+				"1 "+outputVar + " + " +str(-dHigh) + " " + inputVar + " <= "+str(cHigh) + "\n"
+
+
+# Return the slopes and intercepts of the tangents at inputLow and inputHigh
+# and of the secant between inputLow and inputHigh used by triangleBounds
+def triangleLines(function, functionDer, inputLow, inputHigh, a, b=None):
 	if b is None:
 		funLow = function(np.array([inputLow]), a)[0]
 		dLow = functionDer(np.array([inputLow]), a)[0]
@@ -131,23 +154,7 @@ def triangleBounds(function, functionDer, inputVar, outputVar, inputLow, inputHi
 		diff = 1e-10
 	dThird = (funHigh - funLow)/diff
 	cThird = funLow - dThird*inputLow
-
-	overallConstraint = ""
-	overallConstraint += "1 " + inputVar + " >= " + str(inputLow) + "\n"
-	overallConstraint += "1 " + inputVar + " <= " + str(inputHigh) + "\n"
-	if secDer == None:
-		return overallConstraint
-
-	if secDer == "pos":
-		return overallConstraint + "1 "+ outputVar + " + " +str(-dThird) + " " + inputVar + " <= "+str(cThird)+"\n" +\
-				"1 "+outputVar + " + " +str(-dLow) + " " + inputVar + " >= "+str(cLow)+"\n" +\
-				"1 "+outputVar + " + " +str(-dHigh) + " " + inputVar + " >= "+str(cHigh) + "\n"
-
-	
-	if secDer == "neg":
-		return overallConstraint + "1 "+ outputVar + " + " +str(-dThird) + " " + inputVar + " >= "+str(cThird)+"\n" +\
-				"1 "+outputVar + " + " +str(-dLow) + " " + inputVar + " <= "+str(cLow)+"\n" +\
-				"1 "+outputVar + " + " +str(-dHigh) + " " + inputVar + " <= "+str(cHigh) + "\n"
+	return dLow, cLow, dHigh, cHigh, dThird, cThird
 
 
 # This function finds the convex hull of a list of 2d points and creates
@@ -198,3 +205,96 @@ def convexHullConstraints2D(points, inputVar, outputVar):
 	#print ("overallConstraint")
 	#print (overallConstraint)
 	return overallConstraint
+
+
+# The functions below write the same linear constraints as tanhLinearConstraints,
+# triangleBounds and convexHullConstraints2D as rows of A x <= rhs instead of strings.
+# inputInd and outputInd are the columns of the input and output variables.
+# The rows are written starting at row and the row after the last row
+# written is returned. A and rhs must have room for MAX_TANH_CONSTRAINT_ROWS
+# rows after row
+
+# maximum number of rows written by tanhLinearConstraintRows: 4 bounds and
+# the edges of the convex hull of 6 triangle points
+MAX_TANH_CONSTRAINT_ROWS = 10
+
+# Write the constraint inCoef*input + outCoef*output <= bound if sign is "<="
+# and inCoef*input + outCoef*output >= bound if sign is ">="
+def writeConstraintRow(A, rhs, row, inputInd, inCoef, outputInd, outCoef, sign, bound):
+	A[row] = 0.0
+	if sign == ">=":
+		inCoef, outCoef, bound = -inCoef, -outCoef, -bound
+	A[row, inputInd] = inCoef
+	A[row, outputInd] += outCoef
+	rhs[row] = bound
+	return row + 1
+
+def tanhLinearConstraintRows(a, b, inputInd, outputInd, inputLow, inputHigh, A, rhs, row):
+	separX = b/(-a*1.0)
+	if a < 0:
+		if inputLow <= separX and inputHigh <= separX:
+			return triangleBoundRows(tanhFun, tanhFunder, inputInd, outputInd, inputLow, inputHigh, "neg", A, rhs, row, a, b)
+		if inputLow >= separX and inputHigh >= separX:
+			return triangleBoundRows(tanhFun, tanhFunder, inputInd, outputInd, inputLow, inputHigh, "pos", A, rhs, row, a, b)
+	elif a >= 0:
+		if inputLow <= separX and inputHigh <= separX:
+			return triangleBoundRows(tanhFun, tanhFunder, inputInd, outputInd, inputLow, inputHigh, "pos", A, rhs, row, a, b)
+		if inputLow >= separX and inputHigh >= separX:
+			return triangleBoundRows(tanhFun, tanhFunder, inputInd, outputInd, inputLow, inputHigh, "neg", A, rhs, row, a, b)
+
+	row = writeConstraintRow(A, rhs, row, inputInd, 1.0, outputInd, 0.0, ">=", inputLow)
+	row = writeConstraintRow(A, rhs, row, inputInd, 1.0, outputInd, 0.0, "<=", inputHigh)
+	row = writeConstraintRow(A, rhs, row, inputInd, 0.0, outputInd, 1.0, "<=", 1.0)
+	row = writeConstraintRow(A, rhs, row, inputInd, 0.0, outputInd, 1.0, ">=", -1.0)
+	allTrianglePoints = []
+	allTrianglePoints += trianglePoints(tanhFun, tanhFunder, inputLow, 0.0, a, b)
+	allTrianglePoints += trianglePoints(tanhFun, tanhFunder, 0.0, inputHigh, a, b)
+	allTrianglePoints = np.array(allTrianglePoints)
+	try:
+		row = convexHullConstraintRows(allTrianglePoints, inputInd, outputInd, A, rhs, row)
+	except:
+		pass
+	return row
+
+def triangleBoundRows(function, functionDer, inputInd, outputInd, inputLow, inputHigh, secDer, A, rhs, row, a, b=None):
+	dLow, cLow, dHigh, cHigh, dThird, cThird = triangleLines(function, functionDer, inputLow, inputHigh, a, b)
+
+	row = writeConstraintRow(A, rhs, row, inputInd, 1.0, outputInd, 0.0, ">=", inputLow)
+	row = writeConstraintRow(A, rhs, row, inputInd, 1.0, outputInd, 0.0, "<=", inputHigh)
+	if secDer == None:
+		return row
+
+	secantSign, tangentSign = "<=", ">="
+	if secDer == "neg":
+		secantSign, tangentSign = ">=", "<="
+	row = writeConstraintRow(A, rhs, row, inputInd, -dThird, outputInd, 1.0, secantSign, cThird)
+	row = writeConstraintRow(A, rhs, row, inputInd, -dLow, outputInd, 1.0, tangentSign, cLow)
+	row = writeConstraintRow(A, rhs, row, inputInd, -dHigh, outputInd, 1.0, tangentSign, cHigh)
+	return row
+
+def convexHullConstraintRows(points, inputInd, outputInd, A, rhs, row):
+	hull = ConvexHull(points)
+	convexHullMiddle = np.zeros((2))
+	numPoints = 0
+	for simplex in hull.simplices:
+		for ind in simplex:
+			convexHullMiddle += [points[ind,0],points[ind,1]]
+			numPoints += 1
+	convexHullMiddle = convexHullMiddle/(numPoints*1.0)
+	for simplex in hull.simplices:
+		pt1x = points[simplex[0],0]
+		pt1y = points[simplex[0],1]
+
+		pt2x = points[simplex[1],0]
+		pt2y = points[simplex[1],1]
+
+		grad = (pt2y - pt1y)/(pt2x - pt1x)
+		c = pt1y - grad*pt1x
+
+		yMiddle = grad*convexHullMiddle[0] + c
+
+		sign = "<="
+		if convexHullMiddle[1] > yMiddle:
+			sign = ">="
+		row = writeConstraintRow(A, rhs, row, inputInd, -grad, outputInd, 1.0, sign, c)
+	return row
@@ -0,0 +1,96 @@
+# Store for hyperrectangles containing unique solutions that answers
+# containment and overlap queries without scanning every hyperrectangle.
+# The hyperrectangles are kept in a (k,n,2) array sorted by the lower
+# bound of the first dimension. Together with the largest width of a stored
+# hyperrectangle in that dimension, this bounds the range of hyperrectangles
+# that can contain or overlap a query. Only that range is compared, with
+# one broadcast comparison
+
+import numpy as np
+
+
+class HyperStore:
+	# @param numV number of dimensions of the hyperrectangles
+	# @param hypers optional list of hyperrectangles to start with
+	def __init__(self, numV, hypers=None):
+		self.numV = numV
+		self.hypers = np.zeros((16, numV, 2))
+		# position of each stored hyperrectangle in the order of insertion
+		self.indices = np.zeros((16), dtype=int)
+		self.size = 0
+		self.maxWidth = 0.0
+		if hypers is not None:
+			for hyper in hypers:
+				self.add(hyper)
+
+	def __len__(self):
+		return self.size
+
+	# Add hyper to the store. The index returned by the queries
+	# for hyper is the number of hyperrectangles added before it
+	def add(self, hyper):
+		if self.size == self.hypers.shape[0]:
+			self.hypers = np.concatenate((self.hypers, np.zeros(self.hypers.shape)))
+			self.indices = np.concatenate((self.indices, np.zeros(self.indices.shape, dtype=int)))
+		pos = np.searchsorted(self.hypers[:self.size,0,0], hyper[0,0], side="right")
+		self.hypers[pos+1:self.size+1] = self.hypers[pos:self.size]
+		self.indices[pos+1:self.size+1] = self.indices[pos:self.size]
+		self.hypers[pos] = hyper
+		self.indices[pos] = self.size
+		self.size += 1
+		self.maxWidth = max(self.maxWidth, hyper[0,1] - hyper[0,0])
+
+	# Return the range of sorted positions of the hyperrectangles whose lower bound
+	# in the first dimension lies in [lowVal, highVal]
+	def candidateRange(self, lowVal, highVal):
+		lowerBounds = self.hypers[:self.size,0,0]
+		startPos = np.searchsorted(lowerBounds, lowVal, side="left")
+		endPos = np.searchsorted(lowerBounds, highVal, side="right")
+		return startPos, endPos
+
+	# Check if hyper is contained in any of the stored hyperrectangles
+	def contains(self, hyper):
+		if self.size == 0:
+			return False
+		# A hyperrectangle containing hyper has a lower bound in the first dimension
+		# at most hyper[0,0] and at least hyper[0,1] - self.maxWidth
+		startPos, endPos = self.candidateRange(hyper[0,1] - self.maxWidth, hyper[0,0])
+		if startPos >= endPos:
+			return False
+		candidates = self.hypers[startPos:endPos]
+		containMask = np.logical_and(np.all(candidates[:,:,0] <= hyper[:,0], axis=1), np.all(candidates[:,:,1] >= hyper[:,1], axis=1))
+		return bool(np.any(containMask))
+
+	# Batched version of contains for a (m,n,2) array of hyperrectangles.
+	# Returns a (m,) boolean array. The candidate ranges of all the queries
+	# are compared at once unless their union holds too many hyperrectangles
+	def containsBatch(self, hypers):
+		numHypers = hypers.shape[0]
+		if self.size == 0 or numHypers == 0:
+			return np.zeros((numHypers), dtype=bool)
+		lowerBounds = self.hypers[:self.size,0,0]
+		startPos = np.searchsorted(lowerBounds, hypers[:,0,1] - self.maxWidth, side="left")
+		endPos = np.searchsorted(lowerBounds, hypers[:,0,0], side="right")
+		lowPos, highPos = np.min(startPos), np.max(endPos)
+		if lowPos >= highPos:
+			return np.zeros((numHypers), dtype=bool)
+		if (highPos - lowPos)*numHypers > 1000000:
+			return np.array([self.contains(hyper) for hyper in hypers], dtype=bool)
+		candidates = self.hypers[lowPos:highPos]
+		containMask = np.logical_and(np.all(candidates[np.newaxis,:,:,0] <= hypers[:,np.newaxis,:,0], axis=2),
+									np.all(candidates[np.newaxis,:,:,1] >= hypers[:,np.newaxis,:,1], axis=2))
+		return np.any(containMask, axis=1)
+
+	# Return the indices (in order of insertion) of the stored hyperrectangles
+	# that overlap with hyper
+	def overlapping(self, hyper):
+		if self.size == 0:
+			return []
+		# A hyperrectangle overlapping with hyper has a lower bound in the first dimension
+		# at most hyper[0,1] and at least hyper[0,0] - self.maxWidth
+		startPos, endPos = self.candidateRange(hyper[0,0] - self.maxWidth, hyper[0,1])
+		if startPos >= endPos:
+			return []
+		candidates = self.hypers[startPos:endPos]
+		overlapMask = np.logical_and(np.all(candidates[:,:,0] <= hyper[:,1], axis=1), np.all(candidates[:,:,1] >= hyper[:,0], axis=1))
+		return sorted(self.indices[startPos:endPos][overlapMask].tolist())
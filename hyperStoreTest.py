@@ -0,0 +1,48 @@
+import numpy as np
+import random
+from hyperStore import HyperStore
+
+# Random hyperrectangle inside [0, 1]^numV with widths up to maxWidth
+def randomHyper(numV, maxWidth):
+	hyper = np.zeros((numV, 2))
+	for i in range(numV):
+		width = random.uniform(0.0, maxWidth)
+		low = random.uniform(0.0, 1.0 - width)
+		hyper[i,:] = [low, low + width]
+	return hyper
+
+# Linear scan versions of HyperStore.contains and HyperStore.overlapping
+def containsScan(hypers, hyper):
+	return any(np.all(h[:,0] <= hyper[:,0]) and np.all(h[:,1] >= hyper[:,1]) for h in hypers)
+
+def overlappingScan(hypers, hyper):
+	return [i for i in range(len(hypers)) if np.all(hypers[i][:,0] <= hyper[:,1]) and np.all(hypers[i][:,1] >= hyper[:,0])]
+
+# Compare contains, containsBatch and overlapping of HyperStore with a linear
+# scan over the stored hyperrectangles for random stores and queries
+def testHyperStore(numTrials=200, seed=0):
+	random.seed(seed)
+	for trial in range(numTrials):
+		numV = random.randint(1, 4)
+		hypers = [randomHyper(numV, random.choice([0.01, 0.1, 0.5])) for k in range(random.randint(0, 60))]
+		store = HyperStore(numV, hypers)
+		queries = [randomHyper(numV, random.choice([0.001, 0.05, 0.3])) for k in range(20)]
+		# sub-hyperrectangles of stored ones are contained
+		for h in hypers[:5]:
+			query = np.copy(h)
+			query[:,0] += (h[:,1] - h[:,0])*0.25
+			query[:,1] -= (h[:,1] - h[:,0])*0.25
+			queries.append(query)
+		for query in queries:
+			if store.contains(query) != containsScan(hypers, query):
+				raise Exception("hyperStoreTest.py testHyperStore: contains differs from the linear scan for " + str(query))
+			if store.overlapping(query) != overlappingScan(hypers, query):
+				raise Exception("hyperStoreTest.py testHyperStore: overlapping differs from the linear scan for " + str(query))
+		batchResult = store.containsBatch(np.array(queries))
+		if list(batchResult) != [containsScan(hypers, query) for query in queries]:
+			raise Exception("hyperStoreTest.py testHyperStore: containsBatch differs from the linear scan")
+	print ("testHyperStore passed", numTrials, "trials")
+
+
+if __name__ == "__main__":
+	testHyperStore()
@@ -7,9 +7,16 @@ import numpy as np
 import random
 import math
 from intervalBasics import *
+from cacheUtils import LRUCache, cacheKey, DEFAULT_CACHE_BYTES
 
 
-def multiplyRegMatWithInMat(regMat, inMat):
+'''
+Interval matrix multiplications with the rounding error bounded
+by the ulps of the midpoint and radius products. The functions with an
+out parameter write the result to out if it is given, which must not
+overlap with the arguments, and to a new array otherwise
+'''
+def multiplyRegMatWithInMat(regMat, inMat, out=None):
 	regMatAbs = np.absolute(regMat)
 	inMatMid = (inMat[:,:,0] + inMat[:,:,1])/2.0
 	inMatRad = (inMat[:,:,1] - inMat[:,:,0])/2.0
@@ -22,12 +29,14 @@ def multiplyRegMatWithInMat(regMat, inMat):
 	upperLimit = upperLimitMidWithUlp - upperLimitMid + upperLimitRadWithUlp - newMatRad
 	upperLimit = ((regMat.shape[1] + 1)/2.0)*upperLimit
 	newMatRad += upperLimit
-	resultMat = np.zeros((regMat.shape[0], regMat.shape[1], 2))
+	resultMat = out
+	if resultMat is None:
+		resultMat = np.zeros((regMat.shape[0], regMat.shape[1], 2))
 	resultMat[:,:,0] = newMatMid - newMatRad
 	resultMat[:,:,1] = newMatMid + newMatRad
 	return resultMat
 
-def multiplyRegMatWithInVec(regMat, inVec):
+def multiplyRegMatWithInVec(regMat, inVec, out=None):
 	regMatAbs = np.absolute(regMat)
 	inVecMid = (inVec[:,0] + inVec[:,1])/2.0
 	inVecRad = (inVec[:,1] - inVec[:,0])/2.0
@@ -40,7 +49,9 @@ def multiplyRegMatWithInVec(regMat, inVec):
 	upperLimit = upperLimitMidWithUlp - upperLimitMid + upperLimitRadWithUlp - newVecRad
 	upperLimit = ((regMat.shape[1] + 1)/2.0)*upperLimit
 	newVecRad += upperLimit
-	resultVec = np.zeros((regMat.shape[0], 2))
+	resultVec = out
+	if resultVec is None:
+		resultVec = np.zeros((regMat.shape[0], 2))
 	resultVec[:,0] = newVecMid - newVecRad
 	resultVec[:,1] = newVecMid + newVecRad
 	return resultVec
@@ -68,7 +79,7 @@ def multiplyInMatWithInVec(inMat, inVec):
 	resultVec[:,1] = newVecMid + newVecRad
 	return resultVec
 
-def multiplyInMatWithInVecZeroMid(inMat, inVec):
+def multiplyInMatWithInVecZeroMid(inMat, inVec, out=None):
 	inMatMid = (inMat[:,:,0] + inMat[:,:,1])/2.0
 	inMatMidAbs = np.absolute(inMatMid)
 	inMatRad = (inMat[:,:,1] - inMat[:,:,0])/2.0
@@ -83,34 +94,159 @@ def multiplyInMatWithInVecZeroMid(inMat, inVec):
 	upperLimit = upperLimitRadWithUlp - newVecRad
 	upperLimit = ((inMat.shape[1] + 1)/2.0)*upperLimit
 	newVecRad += upperLimit
-	resultVec = np.zeros((inMat.shape[0], 2))
+	resultVec = out
+	if resultVec is None:
+		resultVec = np.zeros((inMat.shape[0], 2))
 	resultVec[:,0] = newVecMid - newVecRad
 	resultVec[:,1] = newVecMid + newVecRad
 	return resultVec
 
 
-def subtractInMatFromRegMat(regMat, inMat):
-	resultMat = np.zeros((regMat.shape[0], regMat.shape[1], 2))
-	resultMat[:,:,1] = regMat - inMat[:,:,0]
-	resultMat[:,:,0] = regMat - inMat[:,:,1]
-	resultMat[:,:,0] = np.nextafter(resultMat[:,:,0], np.float("-inf"))
-	resultMat[:,:,1] = np.nextafter(resultMat[:,:,1], np.float("inf"))
+'''
+Batched versions of the interval matrix multiplications above.
+The leading axis of every argument indexes the boxes, so
+regMats is (m,n,n), inMats is (m,n,n,2) and inVecs is (m,n,2).
+Like the functions above, they write the result to out if it
+is given
+'''
+def multiplyRegMatWithInMatBatch(regMats, inMats, out=None):
+	regMatsAbs = np.absolute(regMats)
+	inMatsMid = (inMats[:,:,:,0] + inMats[:,:,:,1])/2.0
+	inMatsRad = (inMats[:,:,:,1] - inMats[:,:,:,0])/2.0
+	newMatsMid = np.matmul(regMats, inMatsMid)
+	newMatsRad = np.matmul(regMatsAbs, inMatsRad)
+	inMatsMidAbs = np.absolute(inMatsMid)
+	upperLimitMid = np.matmul(regMatsAbs, inMatsMidAbs)
+	upperLimitMidWithUlp = np.nextafter(upperLimitMid, np.float("inf"))
+	upperLimitRadWithUlp = np.nextafter(newMatsRad, np.float("inf"))
+	upperLimit = upperLimitMidWithUlp - upperLimitMid + upperLimitRadWithUlp - newMatsRad
+	upperLimit = ((regMats.shape[2] + 1)/2.0)*upperLimit
+	newMatsRad += upperLimit
+	resultMats = out
+	if resultMats is None:
+		resultMats = np.zeros((regMats.shape[0], regMats.shape[1], inMats.shape[2], 2))
+	resultMats[:,:,:,0] = newMatsMid - newMatsRad
+	resultMats[:,:,:,1] = newMatsMid + newMatsRad
+	return resultMats
+
+def multiplyRegMatWithInVecBatch(regMats, inVecs, out=None):
+	regMatsAbs = np.absolute(regMats)
+	inVecsMid = (inVecs[:,:,0] + inVecs[:,:,1])/2.0
+	inVecsRad = (inVecs[:,:,1] - inVecs[:,:,0])/2.0
+	newVecsMid = np.matmul(regMats, inVecsMid[:,:,np.newaxis])[:,:,0]
+	newVecsRad = np.matmul(regMatsAbs, inVecsRad[:,:,np.newaxis])[:,:,0]
+	inVecsMidAbs = np.absolute(inVecsMid)
+	upperLimitMid = np.matmul(regMatsAbs, inVecsMidAbs[:,:,np.newaxis])[:,:,0]
+	upperLimitMidWithUlp = np.nextafter(upperLimitMid, np.float("inf"))
+	upperLimitRadWithUlp = np.nextafter(newVecsRad, np.float("inf"))
+	upperLimit = upperLimitMidWithUlp - upperLimitMid + upperLimitRadWithUlp - newVecsRad
+	upperLimit = ((regMats.shape[2] + 1)/2.0)*upperLimit
+	newVecsRad += upperLimit
+	resultVecs = out
+	if resultVecs is None:
+		resultVecs = np.zeros((regMats.shape[0], regMats.shape[1], 2))
+	resultVecs[:,:,0] = newVecsMid - newVecsRad
+	resultVecs[:,:,1] = newVecsMid + newVecsRad
+	return resultVecs
+
+def multiplyInMatWithInVecZeroMidBatch(inMats, inVecs, out=None):
+	inMatsMid = (inMats[:,:,:,0] + inMats[:,:,:,1])/2.0
+	inMatsMidAbs = np.absolute(inMatsMid)
+	inMatsRad = (inMats[:,:,:,1] - inMats[:,:,:,0])/2.0
+	inVecsRad = (inVecs[:,:,1] - inVecs[:,:,0])/2.0
+
+	newVecsMid = np.zeros((inVecs.shape[0], inVecs.shape[1]))
+	newVecsRad = np.matmul(inMatsMidAbs, inVecsRad[:,:,np.newaxis])[:,:,0] + np.matmul(inMatsRad, inVecsRad[:,:,np.newaxis])[:,:,0]
+
+	upperLimitRadWithUlp = np.nextafter(newVecsRad, np.float("inf"))
+	upperLimit = upperLimitRadWithUlp - newVecsRad
+	upperLimit = ((inMats.shape[2] + 1)/2.0)*upperLimit
+	newVecsRad += upperLimit
+	resultVecs = out
+	if resultVecs is None:
+		resultVecs = np.zeros((inMats.shape[0], inMats.shape[1], 2))
+	resultVecs[:,:,0] = newVecsMid - newVecsRad
+	resultVecs[:,:,1] = newVecsMid + newVecsRad
+	return resultVecs
+
+'''
+Interval dot products of the interval rows inRows with the interval
+vectors inVecs. Both are (...,n,2) and the result is (...,2). The
+rounding error is bounded as in multiplyInMatWithInVec
+'''
+def dotInRowsWithInVecs(inRows, inVecs):
+	inRowsMid = (inRows[...,0] + inRows[...,1])/2.0
+	inRowsMidAbs = np.absolute(inRowsMid)
+	inRowsRad = (inRows[...,1] - inRows[...,0])/2.0
+	inVecsMid = (inVecs[...,0] + inVecs[...,1])/2.0
+	inVecsMidAbs = np.absolute(inVecsMid)
+	inVecsRad = (inVecs[...,1] - inVecs[...,0])/2.0
+
+	newMid = np.sum(inRowsMid*inVecsMid, axis=-1)
+	newRad = np.sum(inRowsMidAbs*inVecsRad + inVecsMidAbs*inRowsRad + inRowsRad*inVecsRad, axis=-1)
+
+	upperLimitMid = np.sum(inRowsMidAbs*inVecsMidAbs, axis=-1)
+	upperLimitMidWithUlp = np.nextafter(upperLimitMid, np.inf)
+	upperLimitRadWithUlp = np.nextafter(newRad, np.inf)
+	upperLimit = upperLimitMidWithUlp - upperLimitMid + upperLimitRadWithUlp - newRad
+	upperLimit = ((inRows.shape[-2] + 1)/2.0)*upperLimit
+	newRad += upperLimit
+	result = np.zeros(newMid.shape + (2,))
+	result[...,0] = newMid - newRad
+	result[...,1] = newMid + newRad
+	return result
+
+'''
+Divide the interval vector num by the interval vector den elementwise.
+Both are (...,2). Components where den contains 0 are [-inf, inf]
+'''
+def divideInVecByInVec(num, den):
+	containsZero = np.logical_not(np.logical_or(den[...,0] > 0, den[...,1] < 0))
+	safeDen = np.copy(den)
+	safeDen[containsZero] = 1.0
+	quotients = np.stack([num[...,0]/safeDen[...,0], num[...,0]/safeDen[...,1],
+						num[...,1]/safeDen[...,0], num[...,1]/safeDen[...,1]], axis=-1)
+	resultVec = np.zeros(num.shape)
+	resultVec[...,0] = np.nextafter(np.min(quotients, axis=-1), -np.inf)
+	resultVec[...,1] = np.nextafter(np.max(quotients, axis=-1), np.inf)
+	resultVec[containsZero] = [-np.inf, np.inf]
+	return resultVec
+
+
+'''
+The subtraction and addition functions below work elementwise
+and therefore also accept a leading axis indexing the boxes.
+The result is written to out if it is given, which must not
+overlap with the arguments
+'''
+def subtractInMatFromRegMat(regMat, inMat, out=None):
+	resultMat = out
+	if resultMat is None:
+		resultMat = np.zeros(inMat.shape)
+	np.subtract(regMat, inMat[...,0], out=resultMat[...,1])
+	np.subtract(regMat, inMat[...,1], out=resultMat[...,0])
+	np.nextafter(resultMat[...,0], -np.inf, out=resultMat[...,0])
+	np.nextafter(resultMat[...,1], np.inf, out=resultMat[...,1])
 	return resultMat
 
-def subtractInVecFromInVec(vec1, vec2):
-	resultVec = np.zeros((vec1.shape[0], 2))
-	resultVec[:,0] = vec1[:,0] - vec2[:,1]
-	resultVec[:,1] = vec1[:,1] - vec2[:,0]
-	resultVec[:,0] = np.nextafter(resultVec[:,0], np.float("-inf"))
-	resultVec[:,1] = np.nextafter(resultVec[:,1], np.float("inf"))
+def subtractInVecFromInVec(vec1, vec2, out=None):
+	resultVec = out
+	if resultVec is None:
+		resultVec = np.zeros(vec1.shape)
+	np.subtract(vec1[...,0], vec2[...,1], out=resultVec[...,0])
+	np.subtract(vec1[...,1], vec2[...,0], out=resultVec[...,1])
+	np.nextafter(resultVec[...,0], -np.inf, out=resultVec[...,0])
+	np.nextafter(resultVec[...,1], np.inf, out=resultVec[...,1])
 	return resultVec
 
-def addInVecToInVec(vec1, vec2):
-	resultVec = np.zeros((vec1.shape[0], 2))
-	resultVec[:,0] = vec1[:,0] + vec2[:,0]
-	resultVec[:,1] = vec1[:,1] + vec2[:,1]
-	resultVec[:,0] = np.nextafter(resultVec[:,0], np.float("-inf"))
-	resultVec[:,1] = np.nextafter(resultVec[:,1], np.float("inf"))
+def addInVecToInVec(vec1, vec2, out=None):
+	resultVec = out
+	if resultVec is None:
+		resultVec = np.zeros(vec1.shape)
+	np.add(vec1[...,0], vec2[...,0], out=resultVec[...,0])
+	np.add(vec1[...,1], vec2[...,1], out=resultVec[...,1])
+	np.nextafter(resultVec[...,0], -np.inf, out=resultVec[...,0])
+	np.nextafter(resultVec[...,1], np.inf, out=resultVec[...,1])
 	return resultVec
 
 
@@ -132,9 +268,9 @@ subtracting ulp from each element to create a lower bound and
 adding ulp to each element to create an upper bound
 '''
 def turnRegVecToIntervalVec(vec):
-	intervalVec = np.zeros((len(vec), 2))
-	intervalVec[:,0] = np.nextafter(vec, np.float("-inf"))
-	intervalVec[:,1] = np.nextafter(vec, np.float("inf"))
+	intervalVec = np.zeros(np.shape(vec) + (2,))
+	intervalVec[...,0] = np.nextafter(vec, np.float("-inf"))
+	intervalVec[...,1] = np.nextafter(vec, np.float("inf"))
 
 	return intervalVec
 
@@ -190,6 +326,33 @@ def newton(model, soln, overallHyper=None, normThresh=1e-8, maxIter=100):
 
 
 
+'''
+Buffers for the intermediate results of krawczykHelp on hyperrectangles
+with numV variables, so that a Krawczyk update does not allocate them
+again. Use krawczykWorkspace to get the one for numV
+'''
+class KrawczykWorkspace:
+	def __init__(self, numV):
+		self.identity = np.identity(numV)
+		self.xi_minus_samplePoint = np.zeros((numV,2))
+		self.C_fSamplePoint = np.zeros((numV,2))
+		self.C_jacInterval = np.zeros((numV,numV,2))
+		self.I_minus_C_jacInterval = np.zeros((numV,numV,2))
+		self.lastTerm = np.zeros((numV,2))
+		self.samplePoint_minus_C_fSamplePoint = np.zeros((numV,2))
+		self.kInterval = np.zeros((numV,2))
+
+krawczykWorkspaces = {}
+
+'''Return the KrawczykWorkspace for hyperrectangles with numV variables'''
+def krawczykWorkspace(numV):
+	workspace = krawczykWorkspaces.get(numV)
+	if workspace is None:
+		workspace = KrawczykWorkspace(numV)
+		krawczykWorkspaces[numV] = workspace
+	return workspace
+
+
 '''
 Do a krawczyk update on hyperrectangle defined by startBounds
 @param startBounds hyperrectangle
@@ -197,6 +360,10 @@ Do a krawczyk update on hyperrectangle defined by startBounds
 @param samplePoint mid point in startBounds
 @param fSamplePoint function evaluation at samplePoint
 @param jacSamplePoint jacobian at samplePoint
+@param C preconditioner, an approximate inverse of jacSamplePoint. 
+		If None, the inverse of jacSamplePoint is used
+@param out (n,2) array the refined hyperrectangle is written to. It can
+		be startBounds itself. If None, a new array is returned
 @return (True, refinedHyper) if hyperrectangle contains a unique solution.
 		refinedHyper also contains the solution and might be smaller
 		than hyperRectangle
@@ -206,69 +373,263 @@ Do a krawczyk update on hyperrectangle defined by startBounds
 		hyperRectangle
 @return (False, None) if hyperrectangle contains no solution
 '''
-def krawczykHelp(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint):
+def krawczykHelp(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint, C=None, out=None):
 	numV = startBounds.shape[0]
+	workspace = krawczykWorkspace(numV)
+	xi_minus_samplePoint = subtractInVecFromInVec(startBounds, samplePoint, out=workspace.xi_minus_samplePoint)
+
+	if C is None:
+		C = preconditioner(jacSamplePoint)
+	
+	C_fSamplePoint = multiplyRegMatWithInVec(C, fSamplePoint, out=workspace.C_fSamplePoint)
+	C_jacInterval = multiplyRegMatWithInMat(C, jacInterval, out=workspace.C_jacInterval)
+	I_minus_C_jacInterval = subtractInMatFromRegMat(workspace.identity, C_jacInterval, out=workspace.I_minus_C_jacInterval)
+	lastTerm = multiplyInMatWithInVecZeroMid(I_minus_C_jacInterval, xi_minus_samplePoint, out=workspace.lastTerm)
+	kInterval = addInVecToInVec(subtractInVecFromInVec(samplePoint, C_fSamplePoint, out=workspace.samplePoint_minus_C_fSamplePoint), lastTerm, out=workspace.kInterval)
+
+	if out is None:
+		out = np.zeros((numV,2))
+	# if kInterval is in the interior of startBounds, found a unique solution
+	if np.all(kInterval[:,0] > startBounds[:,0]) and np.all(kInterval[:,1] < startBounds[:,1]):
+		out[:] = kInterval
+		return [True, out]
+	
+	np.maximum(kInterval[:,0], startBounds[:,0], out=out[:,0])
+	np.minimum(kInterval[:,1], startBounds[:,1], out=out[:,1])
+	if not(np.all(out[:,0] <= out[:,1])):
+		# no solution
+		return [False, None]
+
+	return [False, out]
+
+
+
+'''
+Batched version of krawczykHelp. Do a krawczyk update on m hyperrectangles
+at once
+@param startBounds (m,n,2) array of hyperrectangles
+@param jacInterval (m,n,n,2) interval jacobians over startBounds
+@param samplePoint (m,n,2) mid points in startBounds
+@param fSamplePoint (m,n,2) function evaluations at samplePoint
+@param jacSamplePoint (m,n,n) jacobians at samplePoint
+@return (uniqueMask, noSolutionMask, refinedHypers) where uniqueMask[i] is True
+		if startBounds[i] contains a unique solution, noSolutionMask[i] is True
+		if startBounds[i] contains no solution and refinedHypers[i] is the
+		refined hyperrectangle (kInterval if uniqueMask[i] is True and the 
+		intersection of kInterval and startBounds[i] otherwise). refinedHypers[i]
+		is meaningless if noSolutionMask[i] is True
+@param out (m,n,2) array refinedHypers is written to. It can be startBounds
+		itself. If None, a new array is returned
+'''
+def krawczykHelpBatch(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint, out=None):
+	numV = startBounds.shape[1]
 	I = np.identity(numV)
 	xi_minus_samplePoint = subtractInVecFromInVec(startBounds, samplePoint)
+
+	C = preconditionerBatch(jacSamplePoint)
+
+	C_fSamplePoint = multiplyRegMatWithInVecBatch(C, fSamplePoint)
+	C_jacInterval = multiplyRegMatWithInMatBatch(C, jacInterval)
+	I_minus_C_jacInterval = subtractInMatFromRegMat(I, C_jacInterval)
+	lastTerm = multiplyInMatWithInVecZeroMidBatch(I_minus_C_jacInterval, xi_minus_samplePoint)
+	kInterval = addInVecToInVec(subtractInVecFromInVec(samplePoint, C_fSamplePoint), lastTerm)
+
+	# if kInterval is in the interior of startBounds, found a unique solution
+	uniqueMask = np.logical_and(np.all(kInterval[:,:,0] > startBounds[:,:,0], axis=1), np.all(kInterval[:,:,1] < startBounds[:,:,1], axis=1))
 	
+	refinedHypers = out
+	if refinedHypers is None:
+		refinedHypers = np.zeros(startBounds.shape)
+	np.maximum(kInterval[:,:,0], startBounds[:,:,0], out=refinedHypers[:,:,0])
+	np.minimum(kInterval[:,:,1], startBounds[:,:,1], out=refinedHypers[:,:,1])
+	noSolutionMask = np.logical_and(np.logical_not(uniqueMask), np.any(np.logical_not(refinedHypers[:,:,0] <= refinedHypers[:,:,1]), axis=1))
+	refinedHypers[uniqueMask] = kInterval[uniqueMask]
 
-	'''print ("startBounds")
-	printHyper(startBounds)
-	print ("samplePoint", samplePoint)
-	print ("fSamplePoint", fSamplePoint)
-	print ("jacInterval", jacInterval)
-	print ("jacSamplePoint", jacSamplePoint)'''
+	return uniqueMask, noSolutionMask, refinedHypers
 
 
+'''
+Invert the jacobian jacSamplePoint to get the preconditioner used
+by krawczykHelp and gaussSeidelHelp. The pseudo inverse is used
+if jacSamplePoint is singular
+'''
+def preconditioner(jacSamplePoint):
 	try:
 		C = np.linalg.inv(jacSamplePoint)
 	except:
 		# In case jacSamplePoint is singular
 		C = np.linalg.pinv(jacSamplePoint)
-	
-	C_fSamplePoint = multiplyRegMatWithInVec(C, fSamplePoint)
-	#print ("C_fSamplePoint after")
-	#print (C_fSamplePoint)
+	return C
 
-	
-	C_jacInterval = multiplyRegMatWithInMat(C, jacInterval)
-	#print ("C_jacInterval after")
-	#print (C_jacInterval)
+'''
+Invert a batch of jacobians (m,n,n) to get the preconditioners
+used by krawczykHelpBatch and gaussSeidelHelpBatch. The
+pseudo inverse is used for the singular jacobians
+'''
+def preconditionerBatch(jacSamplePoint):
+	try:
+		C = np.linalg.inv(jacSamplePoint)
+	except np.linalg.LinAlgError:
+		# In case some jacSamplePoint is singular invert them one
+		# at a time as in krawczykHelp
+		C = np.zeros(jacSamplePoint.shape)
+		for i in range(jacSamplePoint.shape[0]):
+			try:
+				C[i] = np.linalg.inv(jacSamplePoint[i])
+			except:
+				C[i] = np.linalg.pinv(jacSamplePoint[i])
+	return C
 
-	
-	I_minus_C_jacInterval = subtractInMatFromRegMat(I, C_jacInterval)
-	#print ("I_minus_C_jacInterval after")
-	#print (I_minus_C_jacInterval)
-	
-	lastTerm = multiplyInMatWithInVecZeroMid(I_minus_C_jacInterval, xi_minus_samplePoint)
-	#print ("lastTerm after")
-	#print (lastTerm)
-	
-	kInterval = addInVecToInVec(subtractInVecFromInVec(samplePoint, C_fSamplePoint), lastTerm)
-	#print ("kInterval after")
-	#print (kInterval)
-	
-	#print ("startBounds")
-	#printHyper(startBounds)
-	#print ("kInterval")
-	#printHyper(kInterval)
-	# if kInterval is in the interior of startBounds, found a unique solution
-	if np.all(kInterval[:,0] > startBounds[:,0]) and np.all(kInterval[:,1] < startBounds[:,1]):
-		return [True, kInterval]
-	
-	intersect = np.zeros((numV,2))
+
+'''
+Do an interval Gauss-Seidel (Hansen-Sengupta) update on hyperrectangle
+defined by startBounds. The arguments and return values are the same as
+krawczykHelp. The linear system C*jacInterval*(x - samplePoint) = -C*fSamplePoint,
+preconditioned with the inverse C of jacSamplePoint, is solved for one variable 
+at a time and each contracted variable is used right away for the next ones
+'''
+def gaussSeidelHelp(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint, C=None, out=None):
+	if C is not None:
+		C = C[np.newaxis]
+	if out is not None:
+		out = out[np.newaxis]
+	uniqueMask, noSolutionMask, refinedHypers = gaussSeidelHelpBatch(startBounds[np.newaxis], jacInterval[np.newaxis],
+													samplePoint[np.newaxis], fSamplePoint[np.newaxis], jacSamplePoint[np.newaxis], C, out)
+	if uniqueMask[0]:
+		return [True, refinedHypers[0]]
+	if noSolutionMask[0]:
+		return [False, None]
+	return [False, refinedHypers[0]]
+
+
+'''
+Batched version of gaussSeidelHelp. The arguments and return values are
+the same as krawczykHelpBatch with the optional (m,n,n) preconditioners C
+as in krawczykHelp. If the image of the Gauss-Seidel sweep is in
+the interior of startBounds[i], startBounds[i] contains a unique solution
+'''
+def gaussSeidelHelpBatch(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint, C=None, out=None):
+	numHypers, numV = startBounds.shape[0], startBounds.shape[1]
+	if C is None:
+		C = preconditionerBatch(jacSamplePoint)
+	C_fSamplePoint = multiplyRegMatWithInVecBatch(C, fSamplePoint)
+	C_jacInterval = multiplyRegMatWithInMatBatch(C, jacInterval)
+
+	diagonal = np.copy(C_jacInterval[:,np.arange(numV),np.arange(numV)])
+	offDiagonal = C_jacInterval
+	offDiagonal[:,np.arange(numV),np.arange(numV)] = 0.0
+
+	xi_minus_samplePoint = subtractInVecFromInVec(startBounds, samplePoint)
+	# component i of startBounds is only read before component i of
+	# refinedHypers is written, so out can be startBounds itself
+	refinedHypers = out
+	if refinedHypers is None:
+		refinedHypers = np.zeros(startBounds.shape)
+	refinedHypers[:] = startBounds
+	uniqueMask = np.ones((numHypers), dtype=bool)
+	noSolutionMask = np.zeros((numHypers), dtype=bool)
 	for i in range(numV):
-		#print ("i", i)
-		#print ("startBounds", startBounds[i][0], startBounds[i][1])
-		#print ("kInterval", kInterval[i][0], kInterval[i][1])
-		intersectVar = interval_intersect(kInterval[i], startBounds[i])
-		if intersectVar is not None:
-			intersect[i] = intersectVar
-		else:
-			# no solution
-			return [False, None]
+		sumTerm = addInVecToInVec(C_fSamplePoint[:,i], dotInRowsWithInVecs(offDiagonal[:,i], xi_minus_samplePoint))
+		quotient = divideInVecByInVec(-sumTerm[:,::-1], diagonal[:,i])
+		gsInterval = addInVecToInVec(samplePoint[:,i], quotient)
+		# an overflow can leave nans, which bound nothing
+		gsInterval[np.isnan(gsInterval[:,0]),0] = -np.inf
+		gsInterval[np.isnan(gsInterval[:,1]),1] = np.inf
+
+		uniqueMask = np.logical_and(uniqueMask, np.logical_and(gsInterval[:,0] > startBounds[:,i,0], gsInterval[:,1] < startBounds[:,i,1]))
+		refinedHypers[:,i,0] = np.maximum(gsInterval[:,0], startBounds[:,i,0])
+		refinedHypers[:,i,1] = np.minimum(gsInterval[:,1], startBounds[:,i,1])
+		emptyMask = np.logical_not(refinedHypers[:,i,0] <= refinedHypers[:,i,1])
+		noSolutionMask = np.logical_or(noSolutionMask, emptyMask)
+
+		# the hyperrectangles with no solution keep their old
+		# component so that the sweep stays finite for them
+		contracted = np.logical_not(emptyMask)
+		xi_minus_samplePoint[contracted,i] = subtractInVecFromInVec(refinedHypers[contracted,i], samplePoint[contracted,i])
+
+	uniqueMask = np.logical_and(uniqueMask, np.logical_not(noSolutionMask))
+	return uniqueMask, noSolutionMask, refinedHypers
+
+
+'''
+Contraction operators that can be used by checkExistenceOfSolution
+and checkExistenceOfSolutionBatch with their single and batched updates
+'''
+CONTRACTORS = {"krawczyk": (krawczykHelp, krawczykHelpBatch),
+				"gauss_seidel": (gaussSeidelHelp, gaussSeidelHelpBatch)}
+
 
-	return [False, intersect]
+'''
+Preconditioner of the Krawczyk and Gauss-Seidel updates of one hyperrectangle.
+The operators are rigorous with any preconditioner, a good one only makes them
+contract more. So C is kept for the jacobian at a new sample point as long as
+the residual ||I - C*jacSamplePoint|| (infinity norm) is at most residualThreshold,
+and the jacobian is inverted again otherwise
+@param C initial preconditioner, None if there is none yet
+@param cache PreconditionerCache counting the reuses and inversions, can be None
+'''
+class Preconditioner:
+	def __init__(self, C=None, cache=None):
+		self.C = C
+		self.cache = cache
+
+	'''Return the preconditioner to use for jacSamplePoint'''
+	def inverse(self, jacSamplePoint):
+		residualThreshold = None
+		if self.cache is not None:
+			residualThreshold = self.cache.residualThreshold
+		if self.C is not None and residualThreshold is not None and self.C.shape == jacSamplePoint.shape:
+			residual = np.identity(jacSamplePoint.shape[0]) - np.dot(self.C, jacSamplePoint)
+			if np.max(np.sum(np.absolute(residual), axis=1)) <= residualThreshold:
+				self.cache.numReuses += 1
+				return self.C
+		self.C = preconditioner(jacSamplePoint)
+		if self.cache is not None:
+			self.cache.numInversions += 1
+		return self.C
+
+
+'''
+Preconditioners of the hyperrectangles that the solver still has to process,
+keyed by the hyperrectangle. A hyperrectangle refined or bisected from another
+one starts with the preconditioner of its parent, whose midpoint jacobian is
+usually close to its own
+@param residualThreshold largest residual for which a preconditioner is reused
+		(see Preconditioner). If None, the jacobian is inverted for every update
+@param maxBytes size limit of the stored preconditioners in bytes
+'''
+class PreconditionerCache:
+	def __init__(self, residualThreshold=0.1, maxBytes=DEFAULT_CACHE_BYTES):
+		self.residualThreshold = residualThreshold
+		self.entries = LRUCache(maxBytes)
+		self.numReuses = 0
+		self.numInversions = 0
+
+	'''Return a Preconditioner for hyper starting from the one stored for it'''
+	def get(self, hyper):
+		if self.residualThreshold is None:
+			return Preconditioner(None, self)
+		return Preconditioner(self.entries.get(cacheKey(hyper)), self)
+
+	'''Return a Preconditioner starting from the preconditioner of a parent'''
+	def inherit(self, parent):
+		return Preconditioner(parent.C, self)
+
+	'''Store the preconditioner of a parent for each of the hyperrectangles in hypers'''
+	def put(self, hypers, parent):
+		if self.residualThreshold is None or parent.C is None:
+			return
+		for hyper in hypers:
+			if hyper is not None:
+				self.entries.put(cacheKey(hyper), parent.C)
+
+'''
+Add the reuses and inversions of preconditionerCache since 
+countsBefore = (numReuses, numInversions) to statVars
+'''
+def addPreconditionerCounts(statVars, preconditionerCache, countsBefore=(0, 0)):
+	statVars['numPrecondReuses'] += preconditionerCache.numReuses - countsBefore[0]
+	statVars['numPrecondInversions'] += preconditionerCache.numInversions - countsBefore[1]
 
 
 
@@ -283,7 +644,8 @@ def printHyper(hyper):
 '''
 Check whether hyperrectangle hyperRectangle contains
 a unique solution, no solution or maybe more than one solution
-to function identified by the model with Krawczyk operator. 
+to function identified by the model with Krawczyk operator
+(or the Gauss-Seidel operator, see contractor). 
 Use rounded interval arithmetic for every operation in the 
 Krawczyk update
 @param model defines the problem
@@ -294,6 +656,14 @@ Krawczyk update
 @param epsilonInflation the amount by which either side of the hyper-rectangle
 		is inflated before applying the Krawczyk method. This allows for quicker
 		convergence to a unique solution if one exists
+@param contractor the contraction operator, a key of CONTRACTORS. "krawczyk" 
+		uses the Krawczyk operator and "gauss_seidel" the interval Gauss-Seidel
+		(Hansen-Sengupta) operator
+@param preconditioner Preconditioner of hyperRectangle, which is updated with the 
+		preconditioner of the last update. If None, the jacobian at the sample point
+		is inverted for every update
+@param out (n,2) array the hyperrectangle is refined in and refinedHyper is
+		written to. It must not overlap with hyperRectangle. If None, a new array is used
 @return (True, refinedHyper) if hyperrectangle contains a unique solution.
 		refinedHyper also contains the solution and might be smaller
 		than hyperRectangle
@@ -303,11 +673,18 @@ Krawczyk update
 		hyperRectangle
 @return (False, None) if hyperrectangle contains no solution
 '''
-def checkExistenceOfSolution(model,hyperRectangle, alpha = 1.0, epsilonInflation=0.001):
+def checkExistenceOfSolution(model,hyperRectangle, alpha = 1.0, epsilonInflation=0.001, contractor="krawczyk", preconditioner=None, out=None):
+	if contractor not in CONTRACTORS:
+		raise Exception("intervalUtils.py checkExistenceOfSolution: unknown contractor " + str(contractor))
+	contractorHelp = CONTRACTORS[contractor][0]
 	epsilonBounds = 1e-12
 	numV = len(hyperRectangle[0])
 
-	startBounds = np.copy(hyperRectangle)
+	# every update refines startBounds in place
+	startBounds = out
+	if startBounds is None:
+		startBounds = np.zeros(hyperRectangle.shape)
+	startBounds[:] = hyperRectangle
 
 
 	# Start the Krawczyk update
@@ -328,7 +705,10 @@ def checkExistenceOfSolution(model,hyperRectangle, alpha = 1.0, epsilonInflation
 		jacSamplePoint = model.jacobian(samplePointSing)
 		jacInterval = model.jacobian(startBounds)
 	
-		kHelpResult = krawczykHelp(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint)
+		C = None
+		if preconditioner is not None:
+			C = preconditioner.inverse(jacSamplePoint)
+		kHelpResult = contractorHelp(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint, C, out=startBounds)
 		
 		if kHelpResult[0] or kHelpResult[1] is None:
 			return kHelpResult
@@ -355,6 +735,108 @@ def checkExistenceOfSolution(model,hyperRectangle, alpha = 1.0, epsilonInflation
 
 
 
+'''
+Evaluate the function defined by model at a batch of points or
+hyperrectangles. Uses model.fBatch if the model defines it and
+otherwise calls model.f once per point
+@param model defines the problem
+@param points (m,n) array of points or (m,n,2) array of hyperrectangles
+@return (m,n) or (m,n,2) array of function evaluations
+'''
+def fBatch(model, points):
+	if hasattr(model, 'fBatch'):
+		return model.fBatch(points)
+	return np.array([model.f(point) for point in points])
+
+'''
+Evaluate the jacobian defined by model at a batch of points or
+hyperrectangles. Uses model.jacobianBatch if the model defines it 
+and otherwise calls model.jacobian once per point
+@param model defines the problem
+@param points (m,n) array of points or (m,n,2) array of hyperrectangles
+@return (m,n,n) or (m,n,n,2) array of jacobians
+'''
+def jacobianBatch(model, points):
+	if hasattr(model, 'jacobianBatch'):
+		return model.jacobianBatch(points)
+	return np.array([model.jacobian(point) for point in points])
+
+
+'''
+Batched version of checkExistenceOfSolution. Check whether each of the
+hyperrectangles in hyperRectangles contains a unique solution, no solution 
+or maybe more than one solution with the Krawczyk operator (or the
+Gauss-Seidel operator, see contractor). The Krawczyk updates of all the hyperrectangles that still need refining are done together
+@param model defines the problem
+@param hyperRectangles (m,n,2) array of hyperrectangles
+@param alpha indicates how many times the Krawczyk operator is 
+		used to refine hyperRectangle before the function returns
+		If the reduction in volume is below alpha, then we are done
+@param epsilonInflation the amount by which either side of the hyper-rectangle
+		is inflated before applying the Krawczyk method. This allows for quicker
+		convergence to a unique solution if one exists
+@param contractor the contraction operator, a key of CONTRACTORS
+@return a list with one entry for each hyperrectangle which is the same as
+		the result of checkExistenceOfSolution for that hyperrectangle
+'''
+def checkExistenceOfSolutionBatch(model, hyperRectangles, alpha = 1.0, epsilonInflation=0.001, contractor="krawczyk"):
+	if contractor not in CONTRACTORS:
+		raise Exception("intervalUtils.py checkExistenceOfSolutionBatch: unknown contractor " + str(contractor))
+	contractorHelpBatch = CONTRACTORS[contractor][1]
+	epsilonBounds = 1e-12
+	hyperRectangles = np.asarray(hyperRectangles)
+	numHypers = hyperRectangles.shape[0]
+	results = [None]*numHypers
+	if numHypers == 0:
+		return results
+
+	startBounds = np.copy(hyperRectangles)
+	# indices of the hyperrectangles still being refined
+	active = np.arange(numHypers)
+
+	# Start the Krawczyk update
+	while len(active) > 0:
+		oldVolume = np.prod(startBounds[:,:,1] - startBounds[:,:,0], axis=1)
+		dist = startBounds[:,:,1] - startBounds[:,:,0]
+		startBounds[:,:,0] = startBounds[:,:,0] - (epsilonInflation*dist + epsilonBounds)
+		startBounds[:,:,1] = startBounds[:,:,1] + (epsilonInflation*dist + epsilonBounds)
+
+		samplePointSing = (startBounds[:,:,0] + startBounds[:,:,1])/2.0
+		samplePoint = turnRegVecToIntervalVec(samplePointSing)
+		fSamplePoint = fBatch(model, samplePoint)
+		jacSamplePoint = jacobianBatch(model, samplePointSing)
+		jacInterval = jacobianBatch(model, startBounds)
+
+		uniqueMask, noSolutionMask, refinedHypers = contractorHelpBatch(startBounds, jacInterval, samplePoint, fSamplePoint, jacSamplePoint)
+
+		newVolume = np.prod(refinedHypers[:,:,1] - refinedHypers[:,:,0], axis=1)
+		volReduc = (oldVolume - newVolume)/(oldVolume*1.0)
+
+		# If the reduction of volume is less than equal to alpha
+		# then do no more Krawczyk updates. We are done
+		doneMask = np.logical_or(np.isnan(volReduc), volReduc <= alpha)
+		continueMask = np.zeros(len(active), dtype=bool)
+		for i in range(len(active)):
+			hyperIndex = active[i]
+			if uniqueMask[i]:
+				results[hyperIndex] = [True, refinedHypers[i]]
+			elif noSolutionMask[i]:
+				results[hyperIndex] = [False, None]
+			elif doneMask[i]:
+				intersect = refinedHypers[i]
+				intersect[:,0] = np.maximum(hyperRectangles[hyperIndex,:,0], intersect[:,0])
+				intersect[:,1] = np.minimum(hyperRectangles[hyperIndex,:,1], intersect[:,1])
+				results[hyperIndex] = [False, intersect]
+			else:
+				continueMask[i] = True
+
+		active = active[continueMask]
+		startBounds = refinedHypers[continueMask]
+
+	return results
+
+
+
 # First do an interval arithmetic test
 # Calculate the interval evaluation of the function
 # for hyperrectangle. If any component of the result
@@ -371,3 +853,14 @@ def intervalEval(model, startBounds):
 			return False
 	return True
 
+# Batched version of intervalEval
+# @param model defines the problem
+# @param hyperRectangles (m,n,2) array of hyperrectangles
+# @return (m,) boolean array which is False for the hyperrectangles
+#	that do not contain any solution
+def intervalEvalBatch(model, hyperRectangles):
+	if hasattr(model, 'f'):
+		funVal = fBatch(model, hyperRectangles)
+		funValMult = np.multiply(funVal[:,:,0], funVal[:,:,1])
+		return np.logical_not(np.any(funValMult > 0.0, axis=1))
+	return np.ones(len(hyperRectangles), dtype=bool)
@@ -1,10 +1,133 @@
 # @author: Mark Greenstreet, Itrat Akhter
 # Class to help construct, manipulate and solve linear programs
 
+# The linear programs can be solved by different backends (see setLpBackend):
+# "cvxopt" uses the interior point method of cvxopt, "highs" uses the HiGHS
+# solvers through scipy.optimize.linprog and "numpy" uses SimplexLP,
+# a dense two phase simplex written with numpy only.
+# Whatever the backend, a solution is returned as a dict with
+#	'status': "optimal", "primal infeasible", "dual infeasible" or "unknown"
+#	'x': numpy array with the value of each variable (None if there is none)
+#	'iterations': number of iterations used by the backend
+
+import os
+import copy
+import threading
+import multiprocessing
+import multiprocessing.pool
 import numpy as np
 from cvxopt import matrix,solvers
 from scipy.spatial import ConvexHull
 from intervalBasics import *
+from scipy.linalg import lu_factor, lu_solve
+try:
+	from scipy.optimize import linprog
+except ImportError:
+	linprog = None
+
+LP_BACKENDS = ["cvxopt", "highs", "numpy"]
+
+# backend used when none is given to solveLp or FixedConstraintLP
+lpBackend = "cvxopt"
+
+# Select the backend used for all linear programs that are solved
+# without an explicit backend
+# @param backend one of LP_BACKENDS
+def setLpBackend(backend):
+	global lpBackend
+	if backend not in LP_BACKENDS:
+		raise Exception("lpUtilsMark.py setLpBackend: unknown backend " + str(backend))
+	if backend == "highs" and linprog is None:
+		raise Exception("lpUtilsMark.py setLpBackend: the highs backend needs scipy.optimize.linprog")
+	lpBackend = backend
+
+def getLpBackend():
+	return lpBackend
+
+# Return the current settings as (backend, numWorkers, poolType). Worker
+# processes started with spawn do not inherit them and get them through
+# applyLpSettings
+def getLpSettings():
+	return (lpBackend, lpPoolSize, lpPoolType)
+
+# Select the backend and the pool for one solver run
+# @param backend one of LP_BACKENDS or None to keep the current backend
+# @param numWorkers number of workers of the pool or None to keep the current pool
+# @param poolType one of LP_POOL_TYPES
+# @return the previous settings to be given to restoreLpSettings after the run
+def applyLpSettings(backend, numWorkers, poolType="thread"):
+	previous = (lpBackend, lpPoolSize, lpPoolType, numWorkers is not None)
+	if backend is not None:
+		setLpBackend(backend)
+	if numWorkers is not None:
+		try:
+			setLpPool(numWorkers, poolType)
+		except Exception:
+			setLpBackend(previous[0])
+			raise
+	return previous
+
+# Undo applyLpSettings. A pool created for the run is closed
+# @param previous the settings returned by applyLpSettings
+def restoreLpSettings(previous):
+	global lpBackend
+	backend, numWorkers, poolType, poolChanged = previous
+	lpBackend = backend
+	if poolChanged:
+		closeLpPool()
+		setLpPool(numWorkers, poolType)
+
+# Turn a cvxopt solution into a backend independent solution
+def cvxoptSolution(sol):
+	x = None
+	if sol['x'] is not None:
+		x = np.array(sol['x']).flatten()
+	return {'status': sol['status'], 'x': x, 'iterations': sol['iterations']}
+
+# Solve min c^T x subject to G x <= h and A x = b with scipy's HiGHS solvers.
+# The variables are free. The presolve of HiGHS can report feasible lps with
+# nearly fixed variables (hyperrectangles that are very thin in some dimension)
+# as infeasible, so infeasible lps are solved again without presolve
+def highsSolve(c, G, h, A=None, b=None):
+	if len(G) == 0:
+		G, h = None, None
+	if A is not None and len(A) == 0:
+		A, b = None, None
+	res = linprog(c, A_ub=G, b_ub=h, A_eq=A, b_eq=b, bounds=(None, None), method="highs")
+	if res.status == 2:
+		res = linprog(c, A_ub=G, b_ub=h, A_eq=A, b_eq=b, bounds=(None, None), method="highs", options={"presolve": False})
+	statuses = {0: "optimal", 2: "primal infeasible", 3: "dual infeasible"}
+	status = statuses.get(res.status, "unknown")
+	x = None
+	if status == "optimal":
+		x = np.array(res.x)
+	return {'status': status, 'x': x, 'iterations': res.nit}
+
+# Solve min c^T x subject to G x <= h and A x = b with the given backend
+# (the one selected by setLpBackend if None). c, G, h, A and b can be
+# lists, numpy arrays or cvxopt matrices.
+# Returns the solution described at the top of this file
+# or None if the backend could not solve the lp
+def solveLp(c, G, h, A=None, b=None, backend=None):
+	if backend is None:
+		backend = lpBackend
+	c = np.array(c, dtype=float).flatten()
+	G = np.array(G, dtype=float).reshape((-1, len(c)))
+	h = np.array(h, dtype=float).flatten()
+	if A is not None:
+		A = np.array(A, dtype=float).reshape((-1, len(c)))
+		b = np.array(b, dtype=float).flatten()
+	if backend == "cvxopt":
+		solvers.options["show_progress"] = False
+		try:
+			if A is None or len(A) == 0:
+				return cvxoptSolution(solvers.lp(matrix(c), matrix(G), matrix(h)))
+			return cvxoptSolution(solvers.lp(matrix(c), matrix(G), matrix(h), matrix(A), matrix(b)))
+		except ValueError:
+			return None
+	if backend == "highs":
+		return highsSolve(c, G, h, A, b)
+	return SimplexLP(G, h, A, b).solve(c)
 
 
 class LP:
@@ -118,7 +241,7 @@ class LP:
 				otherLp.add_cost(maxCost)
 				maxSol = otherLp.solve()
 				if maxSol is not None and maxSol["status"] == "optimal":
-					maxB = np.dot(np.array(maxCost), np.array(maxSol['x']))[0]
+					maxB = np.dot(np.array(maxCost), maxSol['x'])
 					possibleValidConstraints.append([minCost, -maxB])
 					possibleBs.append(-maxB)
 				
@@ -167,7 +290,8 @@ class LP:
 		self.c = c
 
 	# @author: Itrat Akhter
-	# return cvxopt solution after solving lp
+	# return solution (see solveLp) after solving lp
+	# with the backend selected by setLpBackend
 	def solve(self):
 		if self.num_constraints() == 0:
 			return None
@@ -182,16 +306,7 @@ class LP:
 			cocantenatedb.append(eqb)
 			cocantenatedb.append(-eqb)
 
-		AMatrix = matrix(np.array(cocantenatedA))
-		bMatrix = matrix(cocantenatedb)
-		cMatrix = matrix(self.c)
-		solvers.options["show_progress"] = False
-
-		try:
-			sol = solvers.lp(cMatrix, AMatrix, bMatrix)
-			return sol
-		except ValueError:
-			return None
+		return solveLp(self.c, cocantenatedA, cocantenatedb)
 
 	# @author: Itrat Akhter
 	# Calculate the slack for each inequality constraint
@@ -203,8 +318,8 @@ class LP:
 		if sol["status"] == "primal infeasible":
 			raise Exception('LP:slack - LP infeasible')
 
-		calculatedB = np.dot(np.array(self.A), np.array(sol['x']))
-		slack = np.array(self.b) - np.transpose(calculatedB)
+		calculatedB = np.dot(np.array(self.A), sol['x'])
+		slack = np.array(self.b) - calculatedB
 		return slack
 
 
@@ -230,3 +345,436 @@ class LP:
 			Aeq.append(r)
 		return LP(self.c, A, self.b, Aeq, self.beq)
 
+
+
+# @author: Itrat Akhter
+# Linear program that is solved for many cost vectors with the same
+# constraints, for example to find the lower and upper bound of each variable.
+# The constraints are converted for the backend once instead of on every solve.
+# With the numpy backend the simplex tableau is kept between solves so that
+# each solve starts from the optimal basis of the previous one.
+# With the cvxopt backend, equality constraints are given to cvxopt as
+# equalities instead of as pairs of inequalities which makes the interior
+# point method converge in fewer iterations and tells infeasible problems
+# apart more reliably. cvxopt needs the equality constraints to be linearly
+# independent, so equality constraints that depend on earlier ones are kept
+# as pairs of inequalities
+class FixedConstraintLP:
+	# @param lp LP whose constraints are used
+	# @param backend one of LP_BACKENDS. If None, the backend selected by setLpBackend
+	def __init__(self, lp, backend=None):
+		if lp.num_constraints() == 0:
+			self.setConstraints(np.zeros((0, 0)), np.zeros(0), np.zeros((0, 0)), np.zeros(0), backend)
+			return
+		numVars = len(lp.A[0]) if len(lp.A) > 0 else len(lp.Aeq[0])
+		self.setConstraints(np.array(lp.A, dtype=float).reshape((-1, numVars)), np.array(lp.b, dtype=float),
+							np.array(lp.Aeq, dtype=float).reshape((-1, numVars)), np.array(lp.beq, dtype=float), backend)
+
+	# Build the lp from the constraints G*x <= h and Aeq*x == beq given as arrays
+	# without going through LP and its lists. The arrays are copied, so the caller
+	# can reuse them for the next lp
+	# @param G (m,n) array, h (m) array, Aeq (k,n) array and beq (k) array
+	# @param backend one of LP_BACKENDS. If None, the backend selected by setLpBackend
+	@classmethod
+	def fromArrays(cls, G, h, Aeq, beq, backend=None):
+		# the constraints of an empty lp are replaced by the arrays
+		fixedLp = cls(LP(), backend)
+		fixedLp.setConstraints(np.array(G, dtype=float), np.array(h, dtype=float),
+							np.array(Aeq, dtype=float), np.array(beq, dtype=float), backend)
+		return fixedLp
+
+	def setConstraints(self, G, h, Aeq, beq, backend):
+		if backend is None:
+			backend = lpBackend
+		self.backend = backend
+		self.numConstraints = len(G) + len(Aeq)
+		if self.numConstraints == 0:
+			return
+
+		if backend == "numpy":
+			self.simplex = SimplexLP(G, h, Aeq, beq)
+			return
+		if backend == "highs":
+			self.G, self.h, self.Aeq, self.beq = G, h, Aeq, beq
+			return
+
+		# usually all the equality constraints are independent and a
+		# single rank computation is enough
+		if len(Aeq) == 0 or np.linalg.matrix_rank(Aeq) == len(Aeq):
+			independent = list(range(len(Aeq)))
+		else:
+			independent = []
+			for i in range(len(Aeq)):
+				if np.linalg.matrix_rank(Aeq[independent + [i]]) > len(independent):
+					independent.append(i)
+		dependent = [i for i in range(len(Aeq)) if i not in independent]
+		for i in dependent:
+			G = np.concatenate((G, np.array([Aeq[i], -Aeq[i]])))
+			h = np.concatenate((h, np.array([beq[i], -beq[i]])))
+
+		self.GMatrix = matrix(G)
+		self.hMatrix = matrix(h)
+		if len(independent) > 0:
+			self.AMatrix = matrix(Aeq[independent])
+			self.bMatrix = matrix(beq[independent])
+		else:
+			self.AMatrix, self.bMatrix = None, None
+
+	# return solution (see solveLp) after solving the lp with cost c
+	def solve(self, c):
+		if self.numConstraints == 0:
+			return None
+		c = np.array(c, dtype=float)
+		if self.backend == "numpy":
+			return self.simplex.solve(c)
+		if self.backend == "highs":
+			return highsSolve(c, self.G, self.h, self.Aeq, self.beq)
+		solvers.options["show_progress"] = False
+		try:
+			return cvxoptSolution(solvers.lp(matrix(c), self.GMatrix, self.hMatrix, self.AMatrix, self.bMatrix))
+		except ValueError:
+			return None
+
+
+# The lps solved by minMaxSolutions for the different variables have the same
+# constraints and are independent, so they can be solved by a pool of workers
+# (see setLpPool). Thread pools only speed up backends that release the GIL while
+# solving. Process pools work with every backend but send the constraints to the
+# workers for every hyperrectangle
+
+LP_POOL_TYPES = ["thread", "process"]
+
+# number of workers and type of the pool used by minMaxSolutions
+lpPoolSize = 1
+lpPoolType = "thread"
+
+# pool used by minMaxSolutions and the id of the process that created it.
+# Forked processes do not inherit the workers of a pool, so each process
+# creates its own
+lpPool = None
+lpPoolPid = None
+
+# event through which minMaxSolutions stops the lps left in lpPool once one of
+# them is infeasible. For process pools it belongs to lpPoolManager since the
+# events of multiprocessing cannot be passed to the workers of a pool
+lpPoolStopEvent = None
+lpPoolManager = None
+
+# Select the number of workers and the type of pool used to solve the lps of
+# minMaxSolutions. With one worker the lps are solved one after the other
+# @param numWorkers number of lps solved at the same time
+# @param poolType one of LP_POOL_TYPES
+def setLpPool(numWorkers, poolType="thread"):
+	global lpPoolSize, lpPoolType
+	if poolType not in LP_POOL_TYPES:
+		raise Exception("lpUtilsMark.py setLpPool: unknown pool type " + str(poolType))
+	if numWorkers < 1:
+		raise Exception("lpUtilsMark.py setLpPool: numWorkers must be at least 1")
+	if numWorkers == lpPoolSize and poolType == lpPoolType:
+		return
+	closeLpPool()
+	lpPoolSize, lpPoolType = numWorkers, poolType
+
+def closeLpPool():
+	global lpPool, lpPoolPid, lpPoolStopEvent, lpPoolManager
+	if lpPool is not None and lpPoolPid == os.getpid():
+		lpPool.terminate()
+		if lpPoolManager is not None:
+			lpPoolManager.shutdown()
+	lpPool, lpPoolPid = None, None
+	lpPoolStopEvent, lpPoolManager = None, None
+
+# Return the pool selected by setLpPool or None if the lps are
+# solved one after the other
+def getLpPool():
+	global lpPool, lpPoolPid, lpPoolStopEvent, lpPoolManager
+	if lpPoolSize <= 1:
+		return None
+	if lpPool is None or lpPoolPid != os.getpid():
+		if lpPoolType == "process":
+			# daemonic processes like the workers of the parallel
+			# solver loops cannot start processes of their own
+			if multiprocessing.current_process().daemon:
+				return None
+			lpPool = multiprocessing.Pool(lpPoolSize)
+			lpPoolManager = multiprocessing.Manager()
+			lpPoolStopEvent = lpPoolManager.Event()
+		else:
+			lpPool = multiprocessing.pool.ThreadPool(lpPoolSize)
+			lpPoolManager = None
+			lpPoolStopEvent = threading.Event()
+		lpPoolPid = os.getpid()
+	return lpPool
+
+# Solve the lps of tasks, a list of (index, sign) where sign is 1.0 to minimize
+# and -1.0 to maximize variable index subject to the constraints of fixedLp.
+# Stops at the first primal infeasible lp or once stopEvent is set.
+# Returns a list of (index, sign, solution)
+def solveMinMaxTasks(args):
+	fixedLp, numVars, tasks, stopEvent, copyLp = args
+	# the simplex of the numpy backend keeps its basis between solves
+	# so every thread needs its own copy
+	if copyLp:
+		fixedLp = copy.deepcopy(fixedLp)
+	results = []
+	for index, sign in tasks:
+		if stopEvent.is_set():
+			break
+		cost = np.zeros((numVars))
+		cost[index] = sign
+		sol = fixedLp.solve(cost)
+		results.append((index, sign, sol))
+		if sol is not None and sol["status"] == "primal infeasible":
+			stopEvent.set()
+			break
+	return results
+
+# Minimize and maximize each variable in indices subject to the constraints
+# of fixedLp (a FixedConstraintLP with numVars variables), with the pool selected
+# by setLpPool. Returns a list of (index, minSol, maxSol) in the order of indices.
+# If an lp is primal infeasible, all of them are since they have the same
+# constraints. The remaining lps are skipped and the list ends with
+# (index, infeasibleSol, infeasibleSol) for the variable of the infeasible lp
+def minMaxSolutions(fixedLp, numVars, indices):
+	pool = getLpPool()
+	if pool is None or len(indices) < 2:
+		solutions = []
+		for index in indices:
+			cost = np.zeros((numVars))
+			cost[index] = 1.0
+			minSol = fixedLp.solve(cost)
+			if minSol is not None and minSol["status"] == "primal infeasible":
+				solutions.append((index, minSol, minSol))
+				break
+			cost[index] = -1.0
+			solutions.append((index, minSol, fixedLp.solve(cost)))
+		return solutions
+
+	# the min and max lp of a variable go to the same worker so that
+	# the max lp is skipped if the min lp is infeasible
+	numChunks = min(lpPoolSize, len(indices))
+	chunks = [[] for i in range(numChunks)]
+	for k in range(len(indices)):
+		chunks[k % numChunks] += [(indices[k], 1.0), (indices[k], -1.0)]
+	stopEvent = lpPoolStopEvent
+	stopEvent.clear()
+	copyLp = lpPoolType == "thread" and fixedLp.backend == "numpy"
+	minSols, maxSols = {}, {}
+	infeasible = None
+	# the results of all the chunks are collected even after an infeasible lp,
+	# so that no work of this call is left in the pool for the next one. The
+	# stop event makes the chunks still running skip their remaining lps
+	for results in pool.imap_unordered(solveMinMaxTasks, [(fixedLp, numVars, chunk, stopEvent, copyLp) for chunk in chunks]):
+		for index, sign, sol in results:
+			if sol is not None and sol["status"] == "primal infeasible":
+				stopEvent.set()
+				if infeasible is None:
+					infeasible = (index, sol, sol)
+			elif sign > 0:
+				minSols[index] = sol
+			else:
+				maxSols[index] = sol
+	if infeasible is not None:
+		return [infeasible]
+	return [(index, minSols[index], maxSols[index]) for index in indices]
+
+
+# @author: Itrat Akhter
+# Dense two phase simplex for min c^T x subject to G x <= h and A x = b
+# with free variables x, using numpy only. Each free variable is split into
+# the difference of two nonnegative variables and each inequality gets a
+# slack variable. Phase one finds a feasible basis for the constraints once.
+# Every call to solve then runs phase two for its cost vector starting from
+# the basis the previous call ended with. Pivots are chosen by the most
+# negative reduced cost and Bland's rule is used after a run of degenerate
+# pivots so that the method does not cycle.
+# A bound that is too tight kills a hyperrectangle that may contain a solution,
+# so the tableau is recomputed from the constraints at the start of every solve
+# and every optimal basis is checked against the constraints before it is
+# returned. A basis that fails the check is reported with status "unknown"
+class SimplexLP:
+	# @param G, h inequality constraints G x <= h
+	# @param A, b equality constraints A x = b (can be None)
+	# @param maxIterations maximum number of pivots in one phase
+	# @param tol tolerance for the reduced costs and pivot elements
+	# @param feasibilityTol largest violation of the constraints for which the lp
+	#	is still considered feasible. An infeasible lp kills a hyperrectangle, so this
+	#	matches the default primal feasibility tolerance of HiGHS rather than tol
+	def __init__(self, G, h, A=None, b=None, maxIterations=5000, tol=1e-9, feasibilityTol=1e-7):
+		G = np.array(G, dtype=float)
+		h = np.array(h, dtype=float).flatten()
+		numVars = G.shape[1]
+		if A is None:
+			A = np.zeros((0, numVars))
+			b = np.zeros((0))
+		A = np.array(A, dtype=float).reshape((-1, numVars))
+		b = np.array(b, dtype=float).flatten()
+		numIneq, numEq = len(G), len(A)
+		numRows = numIneq + numEq
+
+		self.numVars = numVars
+		self.maxIterations = maxIterations
+		self.tol = tol
+		self.feasibilityTol = feasibilityTol
+		# columns: positive parts, negative parts and slacks
+		self.numCols = 2*numVars + numIneq
+		rows = np.zeros((numRows, self.numCols))
+		rows[:numIneq, :numVars] = G
+		rows[:numIneq, numVars:2*numVars] = -G
+		rows[:numIneq, 2*numVars:] = np.eye(numIneq)
+		rows[numIneq:, :numVars] = A
+		rows[numIneq:, numVars:2*numVars] = -A
+		rhs = np.concatenate((h, b))
+		negRows = rhs < 0
+		rows[negRows] *= -1
+		rhs[negRows] *= -1
+		self.rows = rows
+		self.rhs = rhs
+
+		# the slack of an inequality whose right hand side is nonnegative
+		# starts in the basis, the other rows need an artificial variable
+		artificialRows = [i for i in range(numRows) if i >= numIneq or negRows[i]]
+		numArtificial = len(artificialRows)
+		self.tableau = np.zeros((numRows, self.numCols + numArtificial + 1))
+		self.tableau[:, :self.numCols] = rows
+		self.tableau[:, -1] = rhs
+		self.basis = np.array([2*numVars + i for i in range(numRows)], dtype=int)
+		for k in range(numArtificial):
+			self.tableau[artificialRows[k], self.numCols + k] = 1.0
+			self.basis[artificialRows[k]] = self.numCols + k
+
+		self.feasible = True
+		self.phaseOneIterations = 0
+		if numArtificial > 0:
+			cost = np.zeros((self.numCols + numArtificial))
+			cost[self.numCols:] = 1.0
+			status, self.phaseOneIterations = self.optimize(cost)
+			infeasibility = np.sum(self.tableau[self.basis >= self.numCols, -1])
+			if status != "optimal" or infeasibility > feasibilityTol*max(1.0, np.max(rhs)):
+				self.feasible = False
+				return
+			# pivot the artificial variables left in the basis out of it and drop
+			# the rows for which that is not possible, these rows are redundant
+			keepRows = []
+			for i in range(numRows):
+				if self.basis[i] >= self.numCols:
+					rowVals = np.absolute(self.tableau[i, :self.numCols])
+					if np.max(rowVals) <= tol:
+						continue
+					self.pivot(i, np.argmax(rowVals))
+				keepRows.append(i)
+			columns = list(range(self.numCols)) + [self.tableau.shape[1] - 1]
+			self.tableau = self.tableau[keepRows][:, columns]
+			self.basis = self.basis[keepRows]
+			self.rows = self.rows[keepRows]
+			self.rhs = self.rhs[keepRows]
+
+	def pivot(self, row, col):
+		self.tableau[row] /= self.tableau[row, col]
+		colVals = np.copy(self.tableau[:, col])
+		colVals[row] = 0.0
+		self.tableau -= np.outer(colVals, self.tableau[row])
+		self.basis[row] = col
+
+	# Return the LU factorization of the columns of the constraints in the
+	# basis or None if they are singular
+	def basisFactor(self):
+		basisLu = lu_factor(self.rows[:, self.basis], check_finite=False)
+		if np.min(np.absolute(np.diag(basisLu[0]))) <= self.tol:
+			return None
+		return basisLu
+
+	# Recompute the tableau for the current basis from the constraints to get
+	# rid of the rounding errors that build up with every pivot. Values of basic
+	# variables that are negative by less than feasibilityTol are set to 0.
+	# Returns False if the basis matrix is singular
+	def refactor(self):
+		basisLu = self.basisFactor()
+		if basisLu is None:
+			return False
+		self.tableau[:, :-1] = lu_solve(basisLu, self.rows, check_finite=False)
+		self.tableau[:, -1] = np.maximum(lu_solve(basisLu, self.rhs, check_finite=False), 0.0)
+		return True
+
+	# Run the simplex method for cost from the current basis
+	# Returns the status and the number of pivots
+	def optimize(self, cost):
+		numCols = len(cost)
+		numVars = self.numVars
+		degenerateSteps = 0
+		for iteration in range(self.maxIterations):
+			# in phase two, start again from the constraints every now and then
+			if numCols == self.numCols and iteration > 0 and iteration % 50 == 0:
+				self.refactor()
+			reduced = cost - np.dot(cost[self.basis], self.tableau[:, :numCols])
+			# the positive and negative part of a variable are never in the basis
+			# together since their columns are linearly dependent. Rounding errors
+			# could make one look like a candidate when the other one is basic
+			isBasic = np.zeros((numCols), dtype=bool)
+			isBasic[self.basis] = True
+			twinBasic = np.zeros((numCols), dtype=bool)
+			twinBasic[:numVars] = isBasic[numVars:2*numVars]
+			twinBasic[numVars:2*numVars] = isBasic[:numVars]
+			candidates = np.nonzero(np.logical_and(reduced < -self.tol, np.logical_not(twinBasic)))[0]
+			if len(candidates) == 0:
+				return "optimal", iteration
+			useBland = degenerateSteps > 20
+			if useBland:
+				entering = candidates[0]
+			else:
+				entering = candidates[np.argmin(reduced[candidates])]
+			col = self.tableau[:, entering]
+			positive = np.nonzero(col > self.tol)[0]
+			if len(positive) == 0:
+				return "dual infeasible", iteration
+			ratios = np.maximum(self.tableau[positive, -1], 0.0)/col[positive]
+			minRatio = np.min(ratios)
+			ties = positive[ratios <= minRatio + self.tol]
+			# among the rows with the smallest ratio, pivot on the largest
+			# element unless Bland's rule is needed
+			if useBland:
+				leaving = ties[np.argmin(self.basis[ties])]
+			else:
+				leaving = ties[np.argmax(col[ties])]
+			if minRatio <= self.tol:
+				degenerateSteps += 1
+			else:
+				degenerateSteps = 0
+			self.pivot(leaving, entering)
+		return "unknown", self.maxIterations
+
+	# Check that the current basis is optimal for cost using the constraints
+	# instead of the tableau. Returns the values of all the columns if it is
+	# and None otherwise
+	def checkedValues(self, cost):
+		basisLu = self.basisFactor()
+		if basisLu is None:
+			return None
+		basicValues = lu_solve(basisLu, self.rhs, check_finite=False)
+		duals = lu_solve(basisLu, cost[self.basis], trans=1, check_finite=False)
+		reduced = cost - np.dot(np.transpose(self.rows), duals)
+		scale = max(1.0, np.max(np.absolute(cost)))
+		if np.min(basicValues) < -self.feasibilityTol*max(1.0, np.max(self.rhs)) or np.min(reduced) < -self.feasibilityTol*scale:
+			return None
+		values = np.zeros((self.numCols))
+		values[self.basis] = np.maximum(basicValues, 0.0)
+		return values
+
+	# return solution (see solveLp) after solving the lp with cost c
+	def solve(self, c):
+		if not(self.feasible):
+			return {'status': "primal infeasible", 'x': None, 'iterations': self.phaseOneIterations}
+		c = np.array(c, dtype=float).flatten()
+		cost = np.zeros((self.numCols))
+		cost[:self.numVars] = c
+		cost[self.numVars:2*self.numVars] = -c
+		status, iterations, x = "unknown", 0, None
+		if self.refactor():
+			status, iterations = self.optimize(cost)
+		if status == "optimal":
+			values = self.checkedValues(cost)
+			if values is None:
+				status = "unknown"
+			else:
+				x = values[:self.numVars] - values[self.numVars:2*self.numVars]
+		return {'status': status, 'x': x, 'iterations': iterations}
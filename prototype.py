@@ -13,6 +13,21 @@ import dcUtils
 import random
 import math
 import circuit
+import lpUtilsMark
+import checkpointUtils
+from hyperStore import HyperStore
+from boxPool import BoxPool
+from frontier import makeFrontier
+from traceUtils import NullTrace, isTraceEnabled
+from cacheUtils import cacheCounts, addCacheCounts
+import multiprocessing
+import collections
+import traceback
+import os
+try:
+	import queue
+except ImportError:
+	import Queue as queue
 
 
 # A mechanism to bisect a hyperrectangle
@@ -29,6 +44,20 @@ def bisectMax(hyper, options=None):
 	rHyper[bisectIndex][0] = midVal
 	return [lHyper, rHyper]
 
+# Batched version of bisectMax. Bisect each hyperrectangle in
+# the (m,n,2) array hypers at its longest dimension
+# @return (lHypers, rHypers) (m,n,2) arrays of the two halves
+def bisectMaxBatch(hypers):
+	numHypers = hypers.shape[0]
+	bisectIndices = np.argmax(hypers[:,:,1] - hypers[:,:,0], axis=1)
+	rows = np.arange(numHypers)
+	midVals = (hypers[rows,bisectIndices,0] + hypers[rows,bisectIndices,1])/2.0
+	lHypers = np.copy(hypers)
+	rHypers = np.copy(hypers)
+	lHypers[rows,bisectIndices,1] = midVals
+	rHypers[rows,bisectIndices,0] = midVals
+	return lHypers, rHypers
+
 # Bisect guided by the Newton's method
 # Try to find a Newton's solution in hyper.
 # If it exists bisect so that one half contains
@@ -90,6 +119,15 @@ def findBisectingIndexProportion(model, hyper):
 	return bisectIndex, cutoffVal
 
 
+# Return the statistics of a new solver run, with all the counts and times
+# at 0 and an empty trace. The solver loops, their workers and the problem
+# functions below all start from it
+def newStatVars():
+	return {'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
+			'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
+			'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0,
+			'numCacheHits':0, 'numCacheMisses':0, 'numCacheEvictions':0,
+			'numPrecondReuses':0, 'numPrecondInversions':0}
 
 
 # solver's main loop that uses LP
@@ -109,14 +147,31 @@ def findBisectingIndexProportion(model, hyper):
 # @param hyperRectangle the initial hyperrectangle over which the search for solutions
 #	is done by solverLoop. If this argument is None then the hyperrectangle defined
 #	by the bounds of the model is used
-def solverLoop(uniqueHypers, model, statVars=None, volRedThreshold=1.0, bisectFun=bisectNewton, numSolutions="all", kAlpha=1.0, epsilonInflation=0.01, hyperRectangle = None):
+# @param useSymmetry if True, only search the part of hyperRectangle where the first
+#	variable is the largest and add the rotations of the solutions found at the end.
+#	Can only be used with models that have rotationSymmetric set to True
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerResidual largest residual ||I - C*J|| for which the preconditioner C
+#	of a hyperrectangle is reused for the jacobian J at the midpoint of a hyperrectangle refined
+#	or bisected from it (see intervalUtils.Preconditioner). If None, J is inverted for every
+#	Krawczyk update. Reusing C saves the inversions but a stale C contracts less, so it
+#	only pays off for large circuits where the inversion dominates the Krawczyk update
+# @param searchOrder order in which the hyperrectangles that still need to be processed
+#	are popped, one of frontier.SEARCH_ORDERS or a score function (see frontier.makeFrontier).
+#	The default "lifo" is a depth first search
+# @param checkpointFile name of the .npz file the frontier, the solutions found so far and
+#	the statistics in statVars are written to every checkpointInterval seconds and once the
+#	search ends (see checkpointUtils). If None, no checkpoint is written
+# @param checkpointInterval number of seconds between two checkpoints
+# @param resume if True and checkpointFile exists, continue the search saved in it instead
+#	of starting over from hyperRectangle. The solutions saved are added to uniqueHypers
+#	and the statistics saved replace those in statVars
+def solverLoop(uniqueHypers, model, statVars=None, volRedThreshold=1.0, bisectFun=bisectNewton, numSolutions="all", kAlpha=1.0, epsilonInflation=0.01, hyperRectangle = None, useSymmetry=False, contractor="krawczyk", preconditionerResidual=None, searchOrder="lifo", checkpointFile=None, checkpointInterval=600.0, resume=False):
 	if not(hasattr(model, 'linearConstraints')):
 		raise Exception("model has no instance of linearConstraints. Define a method called linearConstraints in the model class to use linear programming feature. Or use the solver without the linear programming feature\n")
 	if statVars is None:
-		statVars = {}
-		statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+		statVars = newStatVars()
 	lenV = len(model.bounds)
 	
 	if hyperRectangle is None:
@@ -125,139 +180,242 @@ def solverLoop(uniqueHypers, model, statVars=None, volRedThreshold=1.0, bisectFu
 		for i in range(lenV):
 			hyperRectangle[i,0] = model.bounds[i][0]
 			hyperRectangle[i,1] = model.bounds[i][1]
+	if useSymmetry:
+		checkRotationSymmetry(model, hyperRectangle)
 
-	
-	statVars['stringHyperList'].append(("i", intervalUtils.volume(hyperRectangle)))
-	
-	start = time.time()
-	intervalCheck = intervalUtils.intervalEval(model, hyperRectangle)
-	end = time.time()
-	statVars['stringHyperList'].append(('ia', intervalCheck))
-	statVars['totalIaTime'] += end - start
-	statVars['numIa'] += 1
-	if not(intervalCheck):
-		return
-	start = time.time()
-	feas = intervalUtils.checkExistenceOfSolution(model, hyperRectangle, kAlpha, epsilonInflation=epsilonInflation)
-	end = time.time()
-	statVars['totalKTime'] += end - start
-	statVars['numK'] += 1
-	statVars['stringHyperList'].append(("g", feas))
-	
+	#preconditioners of the hyperrectangles still to be processed
+	#inherited from the hyperrectangles they were refined or bisected from
+	preconditionerCache = intervalUtils.PreconditionerCache(preconditionerResidual)
 
-	#stack containing hyperrectangles about which any decision
+	#frontier containing hyperrectangles about which any decision
 	#has not been made - about whether they contain unique solution
-	#or no solution
-	stackList = []
-	if feas[1] is not None:
-		stackList.append(feas[1])
+	#or no solution. searchOrder decides which one is popped next
+	frontier = makeFrontier(searchOrder, model)
+
+	# the volumes in the trace are only computed if it is kept
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+	signature = checkpointUtils.problemSignature(model, True, kAlpha, epsilonInflation)
+	if resume and checkpointFile is not None and os.path.exists(checkpointFile):
+		frontier.restore(resumeFromCheckpoint(checkpointFile, uniqueHypers, statVars, lenV, signature))
+	else:
+		if traceEnabled:
+			statVars['stringHyperList'].append(("i", intervalUtils.volume(hyperRectangle)))
+		
+		start = time.time()
+		intervalCheck = intervalUtils.intervalEval(model, hyperRectangle)
+		end = time.time()
+		statVars['stringHyperList'].append(('ia', intervalCheck))
+		statVars['totalIaTime'] += end - start
+		statVars['numIa'] += 1
+		if not(intervalCheck):
+			return
+		rootPreconditioner = preconditionerCache.get(hyperRectangle)
+		start = time.time()
+		feas = intervalUtils.checkExistenceOfSolution(model, hyperRectangle, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=rootPreconditioner)
+		end = time.time()
+		statVars['totalKTime'] += end - start
+		statVars['numK'] += 1
+		statVars['stringHyperList'].append(("g", feas))
+		preconditionerCache.put([feas[1]], rootPreconditioner)
+		if feas[1] is not None:
+			frontier.push(feas[1])
+
+	#hyperrectangles containing unique solutions indexed for containment
+	#and overlap queries
+	hyperStore = HyperStore(lenV, uniqueHypers)
+
+	checkpointer = checkpointUtils.Checkpointer(checkpointFile, checkpointInterval, signature)
+
+	while len(frontier) > 0:
+		#stop once the solutions wanted have been found
+		if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+			break
+
+		if checkpointer.due():
+			saveSolverCheckpoint(checkpointer, frontier, uniqueHypers, statVars, preconditionerCache, lenV)
 
-	while len(stackList) > 0:
 		#pop the hyperrectangle
-		#print ("len(stackList)", len(stackList))
-		hyperPopped = stackList.pop(-1)
+		#print ("len(frontier)", len(frontier))
+		hyperPopped = frontier.pop()
 		#print ("solver loop hyperPopped")
 		#intervalUtils.printHyper(hyperPopped)
 		
 		#if the popped hyperrectangle is contained in a hyperrectangle
 		#that is already known to contain a unique solution, then do not
 		#consider this hyperrectangle for the next steps
-		hyperAlreadyConsidered = False
-		for hyper in uniqueHypers:
-			if np.greater_equal(hyperPopped[:,0], hyper[:,0]).all() and np.less_equal(hyperPopped[:,1], hyper[:,1]).all():
-				hyperAlreadyConsidered = True
-				break
-		if hyperAlreadyConsidered:
+		if hyperStore.contains(hyperPopped):
+			continue
+
+		#if the first variable cannot be the largest in the popped
+		#hyperrectangle, its solutions are found as rotations of others
+		if useSymmetry and not(inFundamentalDomain(hyperPopped)):
 			continue
 
 		#Apply the Krawczyk + Lp loop
-		feasibility = ifFeasibleHyper(hyperPopped, statVars, volRedThreshold, model, kAlpha, epsilonInflation)
+		feasibility = ifFeasibleHyper(hyperPopped, statVars, volRedThreshold, model, kAlpha, epsilonInflation, contractor, preconditionerCache)
 		
 		#print ("feasibility", feasibility)
 		if feasibility[0]:
 			#If the Krawczyk + Lp loop indicate uniqueness, then add the hyperrectangle
 			#to our list
 			if numSolutions == "all" or len(uniqueHypers) < numSolutions:
-				addToSolutions(model, uniqueHypers, feasibility[1], kAlpha, epsilonInflation)
+				addToSolutions(model, uniqueHypers, feasibility[1], kAlpha, epsilonInflation, hyperStore, contractor)
 
 		elif feasibility[0] == False and feasibility[1] is not None:
 			#If the Krawczyk + Lp loop cannot make a decision about
-			#the hyperrectangle, the do the bisect and kill loop - keep
-			#bisecting as long atleast one half either contains a unique
-			#solution or no solution. Otherwise, add the two halves to
-			#the stackList to be processed again.
-			hypForBisection = feasibility[1]
-			while hypForBisection is not None:
-				#print ("hypForBisection")
-				#intervalUtils.printHyper(hypForBisection)
-				lHyp, rHyp = bisectFun(hypForBisection)
-				statVars['numBisection'] += 1
-				statVars['stringHyperList'].append(("b", [intervalUtils.volume(lHyp), intervalUtils.volume(rHyp)]))
-				#print ("lHyp")
-				#intervalUtils.printHyper(lHyp)
-				start = time.time()
-				intervalCheck = intervalUtils.intervalEval(model, lHyp)
-				end = time.time()
-				statVars['stringHyperList'].append(('ia', intervalCheck))
-				statVars['totalIaTime'] += end - start
-				statVars['numIa'] += 1
-				if not(intervalCheck):
-					lFeas = [False, None]
-				else:
-					start = time.time()
-					lFeas = intervalUtils.checkExistenceOfSolution(model, lHyp, kAlpha, epsilonInflation=epsilonInflation)
-					end = time.time()
-					statVars['totalKTime'] += end - start
-					statVars['numK'] += 1
-					statVars['stringHyperList'].append(("g", lFeas))
-				#print ("rHyp")
-				#intervalUtils.printHyper(rHyp)
-				start = time.time()
-				intervalCheck = intervalUtils.intervalEval(model, rHyp)
-				end = time.time()
-				statVars['stringHyperList'].append(('ia', intervalCheck))
-				statVars['totalIaTime'] += end - start
-				statVars['numIa'] += 1
-				if not(intervalCheck):
-					rFeas = [False, None]
-				else:
-					start = time.time()
-					rFeas = intervalUtils.checkExistenceOfSolution(model, rHyp, kAlpha, epsilonInflation=epsilonInflation)
-					end = time.time()
-					statVars['totalKTime'] += end - start
-					statVars['numK'] += 1
-					statVars['stringHyperList'].append(("g", lFeas))
-
-				statVars['numK'] += 1
+			#the hyperrectangle, the do the bisect and kill loop
+			solHypers, undecidedHypers = bisectAndKill(feasibility[1], model, statVars, bisectFun, kAlpha, epsilonInflation, useSymmetry, contractor, preconditionerCache)
+			for solHyper in solHypers:
+				if numSolutions == "all" or len(uniqueHypers) < numSolutions:
+					addToSolutions(model, uniqueHypers, solHyper, kAlpha, epsilonInflation, hyperStore, contractor)
+			frontier.extend(undecidedHypers)
+
+	saveSolverCheckpoint(checkpointer, frontier, uniqueHypers, statVars, preconditionerCache, lenV)
+	intervalUtils.addPreconditionerCounts(statVars, preconditionerCache)
+	if useSymmetry:
+		addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor)
+
+
+# The bisect and kill loop used by solverLoop - keep bisecting as long
+# atleast one half either contains a unique solution or no solution.
+# Otherwise, the two halves are returned to be processed again.
+# @param hypForBisection the hyperrectangle about which the Krawczyk + Lp
+#	loop could not make a decision
+# @param model indicates the problem we are trying to solve rambus/schmitt/metitarski
+# @param statVars holds statistical information about the operations performed by the solver.
+# @param bisectFun is a function that takes in a hyperrectangle and employes some mechanism
+#	to bisect it
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @return (solHypers, undecidedHypers) where solHypers is the list of hyperrectangles
+#	found to contain unique solutions and undecidedHypers is the list of hyperrectangles
+#	that need to be processed again
+# @param useSymmetry if True, halves that are outside the part of the search space
+#	where the first variable is the largest are treated as containing no solution
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerCache intervalUtils.PreconditionerCache holding the preconditioners
+#	inherited by the hyperrectangles. If None, the jacobian is inverted for every Krawczyk update
+def bisectAndKill(hypForBisection, model, statVars, bisectFun, kAlpha, epsilonInflation, useSymmetry=False, contractor="krawczyk", preconditionerCache=None):
+	if preconditionerCache is None:
+		preconditionerCache = intervalUtils.PreconditionerCache(None)
+	preconditioner = preconditionerCache.get(hypForBisection)
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+	solHypers = []
+	undecidedHypers = []
+	while hypForBisection is not None:
+		#print ("hypForBisection")
+		#intervalUtils.printHyper(hypForBisection)
+		lHyp, rHyp = bisectFun(hypForBisection, model)
+		statVars['numBisection'] += 1
+		if traceEnabled:
+			statVars['stringHyperList'].append(("b", [intervalUtils.volume(lHyp), intervalUtils.volume(rHyp)]))
+		#print ("lHyp")
+		#intervalUtils.printHyper(lHyp)
+		# the solutions in a half outside the part of the search space where
+		# the first variable is the largest are found as rotations of others
+		intervalCheck = not(useSymmetry) or inFundamentalDomain(lHyp)
+		if intervalCheck:
+			start = time.time()
+			intervalCheck = intervalUtils.intervalEval(model, lHyp)
+			end = time.time()
+			statVars['stringHyperList'].append(('ia', intervalCheck))
+			statVars['totalIaTime'] += end - start
+			statVars['numIa'] += 1
+		lPreconditioner = preconditionerCache.inherit(preconditioner)
+		if not(intervalCheck):
+			lFeas = [False, None]
+		else:
+			start = time.time()
+			lFeas = intervalUtils.checkExistenceOfSolution(model, lHyp, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=lPreconditioner)
+			end = time.time()
+			statVars['totalKTime'] += end - start
+			statVars['numK'] += 1
+			if traceEnabled:
+				statVars['stringHyperList'].append(("g", intervalUtils.volume(lFeas[1])))
+		#print ("rHyp")
+		#intervalUtils.printHyper(rHyp)
+		intervalCheck = not(useSymmetry) or inFundamentalDomain(rHyp)
+		if intervalCheck:
+			start = time.time()
+			intervalCheck = intervalUtils.intervalEval(model, rHyp)
+			end = time.time()
+			statVars['stringHyperList'].append(('ia', intervalCheck))
+			statVars['totalIaTime'] += end - start
+			statVars['numIa'] += 1
+		rPreconditioner = preconditionerCache.inherit(preconditioner)
+		if not(intervalCheck):
+			rFeas = [False, None]
+		else:
+			start = time.time()
+			rFeas = intervalUtils.checkExistenceOfSolution(model, rHyp, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=rPreconditioner)
+			end = time.time()
+			statVars['totalKTime'] += end - start
+			statVars['numK'] += 1
+			if traceEnabled:
 				statVars['stringHyperList'].append(("g", intervalUtils.volume(rFeas[1])))
-				if lFeas[0] or rFeas[0] or (lFeas[0] == False and lFeas[1] is None) or (rFeas[0] == False and rFeas[1] is None):
-					if lFeas[0] and rFeas[0]:
-						statVars['numDoubleKill'] += 1
-					elif lFeas[0] == False and lFeas[1] is None and rFeas[0] == False and rFeas[1] is None:
-						statVars['numDoubleKill'] += 1
-					else:
-						statVars['numSingleKill'] += 1
-					
-					if lFeas[0]:
-						if numSolutions == "all" or len(uniqueHypers) < numSolutions:
-							addToSolutions(model, uniqueHypers, lFeas[1], kAlpha, epsilonInflation)
-					if rFeas[0]:
-						if numSolutions == "all" or len(uniqueHypers) < numSolutions:
-							addToSolutions(model, uniqueHypers, rFeas[1], kAlpha, epsilonInflation)
-
-					if lFeas[0] == False and lFeas[1] is not None:
-						hypForBisection = lFeas[1]
-					elif rFeas[0] == False and rFeas[1] is not None:
-						hypForBisection = rFeas[1]
-					else:
-						hypForBisection = None
-
-				
-				else:
-					stackList.append(lFeas[1])
-					stackList.append(rFeas[1])
-					hypForBisection = None
 
+		if lFeas[0] or rFeas[0] or (lFeas[0] == False and lFeas[1] is None) or (rFeas[0] == False and rFeas[1] is None):
+			if lFeas[0] and rFeas[0]:
+				statVars['numDoubleKill'] += 1
+			elif lFeas[0] == False and lFeas[1] is None and rFeas[0] == False and rFeas[1] is None:
+				statVars['numDoubleKill'] += 1
+			else:
+				statVars['numSingleKill'] += 1
+			
+			if lFeas[0]:
+				solHypers.append(lFeas[1])
+			if rFeas[0]:
+				solHypers.append(rFeas[1])
+
+			if lFeas[0] == False and lFeas[1] is not None:
+				hypForBisection = lFeas[1]
+				preconditioner = lPreconditioner
+			elif rFeas[0] == False and rFeas[1] is not None:
+				hypForBisection = rFeas[1]
+				preconditioner = rPreconditioner
+			else:
+				hypForBisection = None
+
+		
+		else:
+			undecidedHypers.append(lFeas[1])
+			undecidedHypers.append(rFeas[1])
+			preconditionerCache.put([lFeas[1]], lPreconditioner)
+			preconditionerCache.put([rFeas[1]], rPreconditioner)
+			hypForBisection = None
+
+	return solHypers, undecidedHypers
+
+
+# Continue the search saved in checkpointFile by solverLoop or solverLoopNoLp.
+# The solutions saved are added to uniqueHypers and the statistics saved
+# replace those in statVars
+# @param signature checkpointUtils.problemSignature of the problem being solved.
+#	The checkpoint must have been saved for the same problem
+# @return the hyperrectangles that were still in the frontier, in the order
+#	they were going to be popped
+def resumeFromCheckpoint(checkpointFile, uniqueHypers, statVars, numV, signature):
+	frontierHypers, solHypers, stats, savedSignature = checkpointUtils.loadCheckpoint(checkpointFile, numV)
+	if savedSignature != signature:
+		raise Exception("prototype.py resumeFromCheckpoint: " + checkpointFile + " was saved for the problem " + str(savedSignature) + " and not for " + signature)
+	uniqueHypers.extend(solHypers)
+	statVars.update(stats)
+	return frontierHypers
+
+# Write the state of solverLoop or solverLoopNoLp with checkpointer. The counts of
+# preconditionerCache are added to the statistics saved but not to statVars.
+# If pool is given, the frontier holds the slots of the hyperrectangles in pool
+def saveSolverCheckpoint(checkpointer, frontier, uniqueHypers, statVars, preconditionerCache, numV, pool=None):
+	if checkpointer.filename is None:
+		return
+	stats = dict(statVars)
+	intervalUtils.addPreconditionerCounts(stats, preconditionerCache)
+	frontierHypers = frontier.items()
+	if pool is not None:
+		frontierHypers = [pool.box(slot) for slot in frontierHypers]
+	checkpointer.save(frontierHypers, uniqueHypers, stats, numV)
 
 
 # solver's main loop that doesn't use LP
@@ -275,12 +433,26 @@ def solverLoop(uniqueHypers, model, statVars=None, volRedThreshold=1.0, bisectFu
 # @param hyperRectangle the initial hyperrectangle over which the search for solutions
 #	is done by solverLoop. If this argument is None then the hyperrectangle defined
 #	by the bounds of the model is used
-def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numSolutions="all", kAlpha=1.0, epsilonInflation=0.001, hyperRectangle = None):
+# @param useSymmetry if True, only search the part of hyperRectangle where the first
+#	variable is the largest and add the rotations of the solutions found at the end.
+#	Can only be used with models that have rotationSymmetric set to True
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerResidual largest residual ||I - C*J|| for which a Krawczyk preconditioner
+#	is reused, see solverLoop. If None, J is inverted for every Krawczyk update
+# @param searchOrder order in which the hyperrectangles that still need to be processed
+#	are popped, one of frontier.SEARCH_ORDERS or a score function (see frontier.makeFrontier).
+#	The default "lifo" is a depth first search
+# @param checkpointFile name of the .npz file the frontier, the solutions found so far and
+#	the statistics in statVars are written to every checkpointInterval seconds and once the
+#	search ends (see checkpointUtils). If None, no checkpoint is written
+# @param checkpointInterval number of seconds between two checkpoints
+# @param resume if True and checkpointFile exists, continue the search saved in it instead
+#	of starting over from hyperRectangle. The solutions saved are added to uniqueHypers
+#	and the statistics saved replace those in statVars
+def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numSolutions="all", kAlpha=1.0, epsilonInflation=0.001, hyperRectangle = None, useSymmetry=False, contractor="krawczyk", preconditionerResidual=None, searchOrder="lifo", checkpointFile=None, checkpointInterval=600.0, resume=False):
 	if statVars is None:
-		statVars = {}
-		statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+		statVars = newStatVars()
 	lenV = len(model.bounds)
 	
 	if hyperRectangle is None:
@@ -289,19 +461,52 @@ def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numS
 		for i in range(lenV):
 			hyperRectangle[i,0] = model.bounds[i][0]
 			hyperRectangle[i,1] = model.bounds[i][1]
+	if useSymmetry:
+		checkRotationSymmetry(model, hyperRectangle)
 
-	#totalHyperDistance = np.amax(hyperRectangle[:,1] - hyperRectangle[:,0])
-	statVars['stringHyperList'].append(("i", hyperRectangle))
-	
-	#stack containing hyperrectangles about which any decision
+	#the hyperrectangles being processed are kept in pool and the
+	#frontier holds their slots. The slot of a hyperrectangle that has
+	#been processed is reused for the next ones
+	pool = BoxPool(lenV)
+
+	#frontier containing hyperrectangles about which any decision
 	#has not been made - about whether they contain unique solution
-	#or no solution
-	stackList = [hyperRectangle]
+	#or no solution. searchOrder decides which one is popped next
+	frontier = makeFrontier(searchOrder, model, pool)
+
+	signature = checkpointUtils.problemSignature(model, False, kAlpha, epsilonInflation)
+	if resume and checkpointFile is not None and os.path.exists(checkpointFile):
+		frontier.restore([pool.alloc(hyper) for hyper in resumeFromCheckpoint(checkpointFile, uniqueHypers, statVars, lenV, signature)])
+	else:
+		#totalHyperDistance = np.amax(hyperRectangle[:,1] - hyperRectangle[:,0])
+		statVars['stringHyperList'].append(("i", hyperRectangle))
+		frontier.push(pool.alloc(hyperRectangle))
+	#the entries of a list trace are kept, so the hyperrectangles
+	#in them are copied out of pool
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+
+	#hyperrectangles containing unique solutions indexed for containment
+	#and overlap queries
+	hyperStore = HyperStore(lenV, uniqueHypers)
+
+	#preconditioners of the hyperrectangles in frontier inherited
+	#from the hyperrectangles they were bisected from
+	preconditionerCache = intervalUtils.PreconditionerCache(preconditionerResidual)
+
+	checkpointer = checkpointUtils.Checkpointer(checkpointFile, checkpointInterval, signature)
+
+	while len(frontier) > 0:
+		#stop once the solutions wanted have been found
+		if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+			break
+
+		if checkpointer.due():
+			saveSolverCheckpoint(checkpointer, frontier, uniqueHypers, statVars, preconditionerCache, lenV, pool)
 
-	while len(stackList) > 0:
 		#pop the hyperrectangle
-		#print ("len(stackList)", len(stackList))
-		hyperPopped = stackList.pop(-1)
+		#print ("len(frontier)", len(frontier))
+		slotPopped = frontier.pop()
+		hyperPopped = pool.box(slotPopped)
 		#print ("solver loop hyperPopped")
 		#intervalUtils.printHyper(hyperPopped)
 
@@ -310,19 +515,21 @@ def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numS
 		#countLarge = np.where((hyperPopped[:,1] - hyperPopped[:,0]) >= 0.5*totalHyperDistance)
 		if hyperPoppedMaxDist > 0.25*totalHyperDistance:
 			lHyp, rHyp = bisectFun(hyperPopped, model)
-			stackList.append(lHyp)
-			stackList.append(rHyp)
+			frontier.push(lHyp)
+			frontier.push(rHyp)
 			continue'''
 		
 		#if the popped hyperrectangle is contained in a hyperrectangle
 		#that is already known to contain a unique solution, then do not
 		#consider this hyperrectangle for the next steps
-		hyperAlreadyConsidered = False
-		for hyper in uniqueHypers:
-			if np.greater_equal(hyperPopped[:,0], hyper[:,0]).all() and np.less_equal(hyperPopped[:,1], hyper[:,1]).all():
-				hyperAlreadyConsidered = True
-				break
-		if hyperAlreadyConsidered:
+		if hyperStore.contains(hyperPopped):
+			pool.free(slotPopped)
+			continue
+
+		#if the first variable cannot be the largest in the popped
+		#hyperrectangle, its solutions are found as rotations of others
+		if useSymmetry and not(inFundamentalDomain(hyperPopped)):
+			pool.free(slotPopped)
 			continue
 
 		start = time.time()
@@ -332,13 +539,23 @@ def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numS
 		statVars['totalIaTime'] += end - start
 		statVars['numIa'] += 1
 		if not(intervalCheck):
+			pool.free(slotPopped)
 			continue
+		preconditioner = preconditionerCache.get(hyperPopped)
+		#the Krawczyk loop refines the popped hyperrectangle in a slot of its own.
+		#Allocating the slot can grow the pool, so hyperPopped is looked up again
+		refinedSlot = pool.alloc()
+		hyperPopped = pool.box(slotPopped)
 		start = time.time()
-		feasibility = intervalUtils.checkExistenceOfSolution(model, hyperPopped, kAlpha, epsilonInflation=epsilonInflation)
+		feasibility = intervalUtils.checkExistenceOfSolution(model, hyperPopped, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=preconditioner, out=pool.box(refinedSlot))
 		end = time.time()
+		pool.free(slotPopped)
 		statVars['totalKTime'] += end - start
 		statVars['numK'] += 1
-		statVars['stringHyperList'].append(("g", feasibility))
+		if traceEnabled and feasibility[1] is not None:
+			statVars['stringHyperList'].append(("g", [feasibility[0], np.copy(feasibility[1])]))
+		else:
+			statVars['stringHyperList'].append(("g", feasibility))
 		
 		#print ("feasibility", feasibility)
 		if feasibility[0]:
@@ -350,19 +567,609 @@ def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numS
 				#intervalUtils.printHyper(hyperPopped)
 				#print ("feas")
 				#intervalUtils.printHyper(feasibility[1])
-				addToSolutions(model, uniqueHypers, feasibility[1], kAlpha, epsilonInflation)
+				addToSolutions(model, uniqueHypers, np.copy(feasibility[1]), kAlpha, epsilonInflation, hyperStore, contractor)
+			pool.free(refinedSlot)
 
 		elif feasibility[0] == False and feasibility[1] is not None:
 			#If the Krawczyk loop cannot make a decision about
 			#the hyperrectangle, bisect and add the two halves to
-			#the stackList to be processed again.
-			hypForBisection = feasibility[1]
-			lHyp, rHyp = bisectFun(hypForBisection, model)
+			#the frontier to be processed again. The left half
+			#stays in the slot of the refined hyperrectangle
+			if bisectFun is bisectMax:
+				lSlot, rSlot = pool.bisectMax(refinedSlot)
+			else:
+				lHyp, rHyp = bisectFun(feasibility[1], model)
+				lSlot = refinedSlot
+				pool.box(lSlot)[:] = lHyp
+				rSlot = pool.alloc(rHyp)
+			lHyp, rHyp = pool.box(lSlot), pool.box(rSlot)
+			statVars['numBisection'] += 1
+			if traceEnabled:
+				statVars['stringHyperList'].append(("b", [np.copy(lHyp), np.copy(rHyp)]))
+			preconditionerCache.put([lHyp, rHyp], preconditioner)
+			frontier.push(lSlot)
+			frontier.push(rSlot)
+
+		else:
+			pool.free(refinedSlot)
+
+	saveSolverCheckpoint(checkpointer, frontier, uniqueHypers, statVars, preconditionerCache, lenV, pool)
+	intervalUtils.addPreconditionerCounts(statVars, preconditionerCache)
+	if useSymmetry:
+		addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor)
+
+
+# solver's main loop that doesn't use LP and processes the hyperrectangles in batches.
+# The frontier is kept as one (m,n,2) array. Up to batchSize hyperrectangles are
+# popped at once and the containment, interval evaluation, Krawczyk and bisection
+# steps are done for the whole batch with intervalUtils.intervalEvalBatch,
+# intervalUtils.checkExistenceOfSolutionBatch and bisectMaxBatch. Models without
+# fBatch and jacobianBatch are evaluated one hyperrectangle at a time by
+# intervalUtils.fBatch and intervalUtils.jacobianBatch, and bisection functions
+# other than bisectMax are called for one hyperrectangle at a time. The search is depth
+# first, but a batch is processed before the solutions found in it are used to discard
+# other hyperrectangles of the batch, so a few more Krawczyk calls can be made than
+# by solverLoopNoLp
+# @param uniqueHypers is a list of hyperrectangle containing unique solutions
+#	found by solverLoop
+# @param model indicates the problem we are trying to solve rambus/schmitt/metitarski
+# @param statVars holds statistical information about the operations performed by the solver.
+#	For example, number of bisections, number of Lp's performed. The time statistics
+#	are the times taken by the batches
+# @param bisectFun is a function that takes in a hyperrectangle and employes some mechanism
+#	to bisect it
+# @param numSolutions indicates the number of solutions wanted by the user
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param hyperRectangle the initial hyperrectangle over which the search for solutions
+#	is done by solverLoop. If this argument is None then the hyperrectangle defined
+#	by the bounds of the model is used
+# @param useSymmetry if True, only search the part of hyperRectangle where the first
+#	variable is the largest and add the rotations of the solutions found at the end.
+#	Can only be used with models that have rotationSymmetric set to True
+# @param contractor the contraction operator used by checkExistenceOfSolutionBatch,
+#	one of intervalUtils.CONTRACTORS
+# @param batchSize maximum number of hyperrectangles popped at once
+def solverLoopBatched(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numSolutions="all", kAlpha=1.0, epsilonInflation=0.001, hyperRectangle = None, useSymmetry=False, contractor="krawczyk", batchSize=64):
+	if statVars is None:
+		statVars = newStatVars()
+	if batchSize < 1:
+		raise Exception("prototype.py solverLoopBatched: batchSize must be at least 1")
+	lenV = len(model.bounds)
+	
+	if hyperRectangle is None:
+		hyperRectangle = np.zeros((lenV,2))
+
+		for i in range(lenV):
+			hyperRectangle[i,0] = model.bounds[i][0]
+			hyperRectangle[i,1] = model.bounds[i][1]
+	if useSymmetry:
+		checkRotationSymmetry(model, hyperRectangle)
+
+	statVars['stringHyperList'].append(("i", hyperRectangle))
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+
+	#frontier containing hyperrectangles about which any decision
+	#has not been made. The last numFrontier rows are popped first
+	frontierHypers = np.zeros((max(2*batchSize, 16), lenV, 2))
+	frontierHypers[0] = hyperRectangle
+	numFrontier = 1
+
+	#hyperrectangles containing unique solutions indexed for containment
+	#and overlap queries
+	hyperStore = HyperStore(lenV, uniqueHypers)
+
+	while numFrontier > 0:
+		#stop once the solutions wanted have been found
+		if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+			break
+
+		#pop the batch, the last hyperrectangle pushed first
+		numPopped = min(batchSize, numFrontier)
+		hypersPopped = frontierHypers[numFrontier-numPopped:numFrontier][::-1].copy()
+		numFrontier -= numPopped
+
+		#discard the hyperrectangles that are contained in a hyperrectangle
+		#already known to contain a unique solution and, with useSymmetry, those
+		#where the first variable cannot be the largest
+		keepMask = np.logical_not(hyperStore.containsBatch(hypersPopped))
+		if useSymmetry:
+			keepMask = np.logical_and(keepMask, np.all(hypersPopped[:,1:,0] <= hypersPopped[:,0:1,1], axis=1))
+		hypersPopped = hypersPopped[keepMask]
+		if len(hypersPopped) == 0:
+			continue
+
+		start = time.time()
+		intervalChecks = intervalUtils.intervalEvalBatch(model, hypersPopped)
+		end = time.time()
+		if traceEnabled:
+			statVars['stringHyperList'].extend([('ia', bool(intervalCheck)) for intervalCheck in intervalChecks])
+		statVars['totalIaTime'] += end - start
+		statVars['numIa'] += len(hypersPopped)
+		hypersPopped = hypersPopped[intervalChecks]
+		if len(hypersPopped) == 0:
+			continue
+
+		start = time.time()
+		feasibilities = intervalUtils.checkExistenceOfSolutionBatch(model, hypersPopped, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor)
+		end = time.time()
+		statVars['totalKTime'] += end - start
+		statVars['numK'] += len(hypersPopped)
+		if traceEnabled:
+			statVars['stringHyperList'].extend([("g", feasibility) for feasibility in feasibilities])
+
+		hypsForBisection = []
+		for feasibility in feasibilities:
+			if feasibility[0]:
+				#If the Krawczyk loop indicate uniqueness, then add the hyperrectangle
+				#to our list
+				if numSolutions == "all" or len(uniqueHypers) < numSolutions:
+					addToSolutions(model, uniqueHypers, feasibility[1], kAlpha, epsilonInflation, hyperStore, contractor)
+			elif feasibility[1] is not None:
+				hypsForBisection.append(feasibility[1])
+		if len(hypsForBisection) == 0:
+			continue
+
+		#bisect the hyperrectangles the Krawczyk loop could not make a decision
+		#about and add the halves to the frontier to be processed again
+		hypsForBisection = np.array(hypsForBisection)
+		if bisectFun is bisectMax:
+			lHypers, rHypers = bisectMaxBatch(hypsForBisection)
+		else:
+			halves = [bisectFun(hypForBisection, model) for hypForBisection in hypsForBisection]
+			lHypers = np.array([half[0] for half in halves])
+			rHypers = np.array([half[1] for half in halves])
+		numBisected = len(hypsForBisection)
+		statVars['numBisection'] += numBisected
+		if traceEnabled:
+			statVars['stringHyperList'].extend([("b", [lHypers[i], rHypers[i]]) for i in range(numBisected)])
+
+		#push the halves so that the halves of the first hyperrectangle popped
+		#are popped first, the right half before the left one as in solverLoopNoLp
+		if numFrontier + 2*numBisected > frontierHypers.shape[0]:
+			newFrontierHypers = np.zeros((2*(numFrontier + 2*numBisected), lenV, 2))
+			newFrontierHypers[:numFrontier] = frontierHypers[:numFrontier]
+			frontierHypers = newFrontierHypers
+		children = frontierHypers[numFrontier:numFrontier + 2*numBisected]
+		children[0::2] = lHypers[::-1]
+		children[1::2] = rHypers[::-1]
+		numFrontier += 2*numBisected
+
+	if useSymmetry:
+		addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor)
+
+
+# Model and solver options used by the worker processes of solverLoopNoLpParallel.
+# They are set once per worker by initNoLpWorker so that the model does not
+# have to be sent along with every hyperrectangle
+workerNoLpState = {}
+
+# Initialize a worker process of solverLoopNoLpParallel
+def initNoLpWorker(model, bisectFun, kAlpha, epsilonInflation, boxesPerTask, traceEnabled, useSymmetry, contractor, preconditionerResidual):
+	workerNoLpState['model'] = model
+	workerNoLpState['bisectFun'] = bisectFun
+	workerNoLpState['kAlpha'] = kAlpha
+	workerNoLpState['epsilonInflation'] = epsilonInflation
+	workerNoLpState['boxesPerTask'] = boxesPerTask
+	workerNoLpState['traceEnabled'] = traceEnabled
+	workerNoLpState['useSymmetry'] = useSymmetry
+	workerNoLpState['contractor'] = contractor
+	workerNoLpState['preconditionerResidual'] = preconditionerResidual
+
+# Worker side of solverLoopNoLpParallel. Do the same interval evaluation,
+# Krawczyk and bisection steps as solverLoopNoLp on a local stack starting
+# from hyperRectangle but stop after boxesPerTask hyperrectangles have been
+# popped so that the rest of the work can be shared with other workers
+# @param hyperRectangle the hyperrectangle to start from
+# @return (solHypers, stackList, statVars) where solHypers is the list of
+#	hyperrectangles found to contain unique solutions, stackList is the list
+#	of hyperrectangles that still need to be processed and statVars holds
+#	the statistics of the work done by this call
+def solveNoLpTask(hyperRectangle):
+	model = workerNoLpState['model']
+	bisectFun = workerNoLpState['bisectFun']
+	kAlpha = workerNoLpState['kAlpha']
+	epsilonInflation = workerNoLpState['epsilonInflation']
+	contractor = workerNoLpState['contractor']
+	statVars = newStatVars()
+	if not(workerNoLpState['traceEnabled']):
+		statVars['stringHyperList'] = NullTrace()
+	cacheCountsBefore = cacheCounts(model)
+	preconditionerCache = intervalUtils.PreconditionerCache(workerNoLpState['preconditionerResidual'])
+	solHypers = []
+	solStore = HyperStore(hyperRectangle.shape[0])
+	stackList = [hyperRectangle]
+	numPopped = 0
+	while len(stackList) > 0 and numPopped < workerNoLpState['boxesPerTask']:
+		hyperPopped = stackList.pop(-1)
+		numPopped += 1
+
+		# Only the solutions found by this task are known here. The parent
+		# removes duplicates found by different tasks through addToSolutions
+		if solStore.contains(hyperPopped):
+			continue
+		if workerNoLpState['useSymmetry'] and not(inFundamentalDomain(hyperPopped)):
+			continue
+
+		start = time.time()
+		intervalCheck = intervalUtils.intervalEval(model, hyperPopped)
+		end = time.time()
+		statVars['stringHyperList'].append(('ia', intervalCheck))
+		statVars['totalIaTime'] += end - start
+		statVars['numIa'] += 1
+		if not(intervalCheck):
+			continue
+		preconditioner = preconditionerCache.get(hyperPopped)
+		start = time.time()
+		feasibility = intervalUtils.checkExistenceOfSolution(model, hyperPopped, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=preconditioner)
+		end = time.time()
+		statVars['totalKTime'] += end - start
+		statVars['numK'] += 1
+		statVars['stringHyperList'].append(("g", feasibility))
+
+		if feasibility[0]:
+			solHypers.append(feasibility[1])
+			solStore.add(feasibility[1])
+
+		elif feasibility[0] == False and feasibility[1] is not None:
+			lHyp, rHyp = bisectFun(feasibility[1], model)
 			statVars['numBisection'] += 1
 			statVars['stringHyperList'].append(("b", [lHyp, rHyp]))
+			preconditionerCache.put([lHyp, rHyp], preconditioner)
 			stackList.append(lHyp)
 			stackList.append(rHyp)
 
+	addCacheCounts(statVars, model, cacheCountsBefore)
+	intervalUtils.addPreconditionerCounts(statVars, preconditionerCache)
+	return solHypers, stackList, statVars
+
+
+# solver's main loop that doesn't use LP where the hyperrectangles are processed
+# by a pool of worker processes. Each worker takes a hyperrectangle from the frontier
+# of the parent and does the interval evaluation, Krawczyk and bisection steps
+# of solverLoopNoLp on it for at most boxesPerTask hyperrectangles. The hyperrectangles
+# that still need to be processed are returned to the parent's frontier and the
+# solutions are merged into uniqueHypers through addToSolutions by the parent
+# The model is given to the workers when the pool is created, so with the
+# fork start method it is inherited and with spawn it is pickled once per
+# worker. The mosfet models can be pickled because StMosfet pickles as the
+# parameter overrides it was built with
+# @param uniqueHypers is a list of hyperrectangle containing unique solutions
+#	found by solverLoop
+# @param model indicates the problem we are trying to solve rambus/schmitt/metitarski
+# @param statVars holds statistical information about the operations performed by the solver.
+#	For example, number of bisections, number of Lp's performed. The statistics of all
+#	the workers are added up. The time statistics are therefore total times over all the
+#	workers and not wall clock times
+# @param bisectFun is a function that takes in a hyperrectangle and employes some mechanism
+#	to bisect it
+# @param numSolutions indicates the number of solutions wanted by the user
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param hyperRectangle the initial hyperrectangle over which the search for solutions
+#	is done by solverLoop. If this argument is None then the hyperrectangle defined
+#	by the bounds of the model is used
+# @param numProcesses number of worker processes. If None, the number of cpus is used
+# @param boxesPerTask maximum number of hyperrectangles a worker pops before it
+#	returns its remaining stack to the parent
+# @param useSymmetry if True, only search the part of hyperRectangle where the first
+#	variable is the largest and add the rotations of the solutions found at the end.
+#	Can only be used with models that have rotationSymmetric set to True
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerResidual largest residual ||I - C*J|| for which a Krawczyk preconditioner
+#	is reused, see solverLoop. If None, J is inverted for every Krawczyk update
+# @param searchOrder order in which the hyperrectangles that still need to be processed
+#	are popped, one of frontier.SEARCH_ORDERS or a score function (see frontier.makeFrontier).
+#	The default "lifo" is a depth first search. The workers always process the
+#	hyperrectangles of a task depth first
+def solverLoopNoLpParallel(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numSolutions="all", kAlpha=1.0, epsilonInflation=0.001, hyperRectangle = None, numProcesses=None, boxesPerTask=100, useSymmetry=False, contractor="krawczyk", preconditionerResidual=None, searchOrder="lifo"):
+	if statVars is None:
+		statVars = newStatVars()
+	lenV = len(model.bounds)
+	if numProcesses is None:
+		numProcesses = multiprocessing.cpu_count()
+
+	if hyperRectangle is None:
+		hyperRectangle = np.zeros((lenV,2))
+
+		for i in range(lenV):
+			hyperRectangle[i,0] = model.bounds[i][0]
+			hyperRectangle[i,1] = model.bounds[i][1]
+	if useSymmetry:
+		checkRotationSymmetry(model, hyperRectangle)
+
+	statVars['stringHyperList'].append(("i", hyperRectangle))
+
+	frontier = makeFrontier(searchOrder, model)
+	frontier.push(hyperRectangle)
+
+	#hyperrectangles containing unique solutions indexed for containment
+	#and overlap queries
+	hyperStore = HyperStore(lenV, uniqueHypers)
+
+	# Tasks that have been sent to the pool and whose results have not
+	# been merged yet
+	inFlight = []
+	# The workers only keep a trace if the parent does
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+	pool = multiprocessing.Pool(numProcesses, initNoLpWorker, (model, bisectFun, kAlpha, epsilonInflation, boxesPerTask, traceEnabled, useSymmetry, contractor, preconditionerResidual))
+	try:
+		while len(frontier) > 0 or len(inFlight) > 0:
+			# Keep every worker busy with a couple of tasks queued up
+			while len(frontier) > 0 and len(inFlight) < 2*numProcesses:
+				if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+					frontier = makeFrontier(searchOrder, model)
+					break
+				hyperPopped = frontier.pop()
+
+				#if the popped hyperrectangle is contained in a hyperrectangle
+				#that is already known to contain a unique solution, then do not
+				#consider this hyperrectangle for the next steps
+				if hyperStore.contains(hyperPopped):
+					continue
+				if useSymmetry and not(inFundamentalDomain(hyperPopped)):
+					continue
+
+				inFlight.append(pool.apply_async(solveNoLpTask, (hyperPopped,)))
+
+			if len(inFlight) == 0:
+				continue
+
+			# Wait for whichever task finishes first
+			readyTasks = [task for task in inFlight if task.ready()]
+			while len(readyTasks) == 0:
+				inFlight[0].wait(0.001)
+				readyTasks = [task for task in inFlight if task.ready()]
+			task = readyTasks[0]
+			inFlight.remove(task)
+			solHypers, taskStack, taskStatVars = task.get()
+
+			for solHyper in solHypers:
+				if numSolutions == "all" or len(uniqueHypers) < numSolutions:
+					addToSolutions(model, uniqueHypers, solHyper, kAlpha, epsilonInflation, hyperStore, contractor)
+			frontier.extend(taskStack)
+
+			for key in taskStatVars:
+				if key == 'stringHyperList':
+					statVars[key].extend(taskStatVars[key])
+				elif not(key.startswith('avg')):
+					statVars[key] += taskStatVars[key]
+	finally:
+		pool.terminate()
+		pool.join()
+
+	if useSymmetry:
+		addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor)
+
+
+# Worker process of solverLoopParallel. Each worker owns a local stack of
+# hyperrectangles and applies the Krawczyk + Lp loop (ifFeasibleHyper) and the
+# bisect and kill loop to them. A worker whose stack is empty increments hungry
+# and waits for hyperrectangles on stealQueue. A worker that sees a hungry peer
+# gives away the older half of its stack (the larger hyperrectangles) through
+# stealQueue. pending counts the hyperrectangles that are in some stack, in
+# stealQueue or are being processed, so that the workers know when to stop
+# @param workerId index of the worker
+# @param model indicates the problem we are trying to solve rambus/schmitt/metitarski
+# @param stealQueue multiprocessing.Queue of hyperrectangles given away by busy workers
+# @param resultQueue multiprocessing.Queue through which solutions and statistics are
+#	sent to the parent
+# @param hungry multiprocessing.Value holding the number of workers with an empty stack
+# @param pending multiprocessing.Value holding the number of hyperrectangles that have
+#	not been processed yet
+# @param stopEvent multiprocessing.Event set by the parent when enough solutions have
+#	been found
+# @param lpSettings the lp backend and pool settings of the parent as returned by
+#	lpUtilsMark.getLpSettings. They are applied explicitly because module state is
+#	not inherited by processes started with spawn
+def lpWorker(workerId, model, stealQueue, resultQueue, hungry, pending, stopEvent, volRedThreshold, bisectFun, kAlpha, epsilonInflation, traceEnabled, useSymmetry, contractor, preconditionerResidual, lpSettings):
+	# Hyperrectangles given away are only left in stealQueue when the
+	# search is stopped early, in which case they are not needed
+	stealQueue.cancel_join_thread()
+	statVars = newStatVars()
+	if not(traceEnabled):
+		statVars['stringHyperList'] = NullTrace()
+	cacheCountsBefore = cacheCounts(model)
+	try:
+		lpUtilsMark.applyLpSettings(*lpSettings)
+		preconditionerCache = intervalUtils.PreconditionerCache(preconditionerResidual)
+		solStore = HyperStore(len(model.bounds))
+		stackList = collections.deque()
+		while not(stopEvent.is_set()):
+			if len(stackList) == 0:
+				with hungry.get_lock():
+					hyperStolen = None
+					hungry.value += 1
+				while hyperStolen is None and pending.value > 0 and not(stopEvent.is_set()):
+					try:
+						hyperStolen = stealQueue.get(timeout=0.01)
+					except queue.Empty:
+						pass
+				with hungry.get_lock():
+					hungry.value -= 1
+				if hyperStolen is None:
+					break
+				stackList.append(hyperStolen)
+
+			# Give away the older half of the stack if some worker is waiting
+			if hungry.value > 0 and len(stackList) > 1:
+				for i in range(len(stackList)//2):
+					stealQueue.put(stackList.popleft())
+
+			hyperPopped = stackList.pop()
+			newHypers = []
+
+			#if the popped hyperrectangle is contained in a hyperrectangle
+			#that is already known to contain a unique solution, then do not
+			#consider this hyperrectangle for the next steps. Only the solutions
+			#found by this worker are known here. The parent removes duplicates
+			#found by different workers through addToSolutions
+			inDomain = not(useSymmetry) or inFundamentalDomain(hyperPopped)
+			if inDomain and not(solStore.contains(hyperPopped)):
+				feasibility = ifFeasibleHyper(hyperPopped, statVars, volRedThreshold, model, kAlpha, epsilonInflation, contractor, preconditionerCache)
+				if feasibility[0]:
+					newSolHypers = [feasibility[1]]
+				elif feasibility[0] == False and feasibility[1] is not None:
+					newSolHypers, newHypers = bisectAndKill(feasibility[1], model, statVars, bisectFun, kAlpha, epsilonInflation, useSymmetry, contractor, preconditionerCache)
+				else:
+					newSolHypers = []
+				for solHyper in newSolHypers:
+					solStore.add(solHyper)
+					resultQueue.put(("s", solHyper))
+				stackList.extend(newHypers)
+
+			# The children are counted before the popped hyperrectangle
+			# is removed so that pending does not reach 0 too early
+			with pending.get_lock():
+				pending.value += len(newHypers) - 1
+
+			# Send the trace to the parent in chunks so that it
+			# does not build up in the worker
+			if len(statVars['stringHyperList']) >= 1000:
+				resultQueue.put(("t", statVars['stringHyperList']))
+				statVars['stringHyperList'] = []
+
+		addCacheCounts(statVars, model, cacheCountsBefore)
+		intervalUtils.addPreconditionerCounts(statVars, preconditionerCache)
+		resultQueue.put(("v", statVars))
+	except Exception:
+		resultQueue.put(("e", "worker " + str(workerId) + "\n" + traceback.format_exc()))
+	finally:
+		lpUtilsMark.closeLpPool()
+
+
+# solver's main loop that uses LP where the hyperrectangles are processed by
+# numProcesses worker processes with work stealing (see lpWorker). The workers
+# send the hyperrectangles containing unique solutions to the parent, which
+# merges them into uniqueHypers through addToSolutions
+# @param uniqueHypers is a list of hyperrectangle containing unique solutions
+#	found by solverLoop
+# @param model indicates the problem we are trying to solve rambus/schmitt/metitarski
+# @param statVars holds statistical information about the operations performed by the solver.
+#	For example, number of bisections, number of Lp's performed. The statistics of all
+#	the workers are added up. The time statistics are therefore total times over all the
+#	workers and not wall clock times
+# @param volRedThreshold is indicates the stopping criterion for the loop of
+#	Krawczyk and LP (implemented by the function ifFeasibleHyper) is applied
+# @param bisectFun is a function that takes in a hyperrectangle and employes some mechanism
+#	to bisect it
+# @param numSolutions indicates the number of solutions wanted by the user
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param hyperRectangle the initial hyperrectangle over which the search for solutions
+#	is done by solverLoop. If this argument is None then the hyperrectangle defined
+#	by the bounds of the model is used
+# @param numProcesses number of worker processes. If None, the number of cpus is used
+# @param useSymmetry if True, only search the part of hyperRectangle where the first
+#	variable is the largest and add the rotations of the solutions found at the end.
+#	Can only be used with models that have rotationSymmetric set to True
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerResidual largest residual ||I - C*J|| for which a Krawczyk preconditioner
+#	is reused, see solverLoop. If None, J is inverted for every Krawczyk update
+def solverLoopParallel(uniqueHypers, model, statVars=None, volRedThreshold=1.0, bisectFun=bisectNewton, numSolutions="all", kAlpha=1.0, epsilonInflation=0.01, hyperRectangle = None, numProcesses=None, useSymmetry=False, contractor="krawczyk", preconditionerResidual=None):
+	if not(hasattr(model, 'linearConstraints')):
+		raise Exception("model has no instance of linearConstraints. Define a method called linearConstraints in the model class to use linear programming feature. Or use the solver without the linear programming feature\n")
+	if statVars is None:
+		statVars = newStatVars()
+	lenV = len(model.bounds)
+	if numProcesses is None:
+		numProcesses = multiprocessing.cpu_count()
+	
+	if hyperRectangle is None:
+		hyperRectangle = np.zeros((lenV,2))
+
+		for i in range(lenV):
+			hyperRectangle[i,0] = model.bounds[i][0]
+			hyperRectangle[i,1] = model.bounds[i][1]
+	if useSymmetry:
+		checkRotationSymmetry(model, hyperRectangle)
+
+	
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
+	if traceEnabled:
+		statVars['stringHyperList'].append(("i", intervalUtils.volume(hyperRectangle)))
+	
+	start = time.time()
+	intervalCheck = intervalUtils.intervalEval(model, hyperRectangle)
+	end = time.time()
+	statVars['stringHyperList'].append(('ia', intervalCheck))
+	statVars['totalIaTime'] += end - start
+	statVars['numIa'] += 1
+	if not(intervalCheck):
+		return
+	preconditionerCache = intervalUtils.PreconditionerCache(preconditionerResidual)
+	start = time.time()
+	feas = intervalUtils.checkExistenceOfSolution(model, hyperRectangle, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=preconditionerCache.get(hyperRectangle))
+	end = time.time()
+	statVars['totalKTime'] += end - start
+	statVars['numK'] += 1
+	statVars['stringHyperList'].append(("g", feas))
+	intervalUtils.addPreconditionerCounts(statVars, preconditionerCache)
+	if feas[1] is None:
+		return
+
+	#hyperrectangles containing unique solutions indexed for containment
+	#and overlap queries
+	hyperStore = HyperStore(lenV, uniqueHypers)
+	stealQueue = multiprocessing.Queue()
+	resultQueue = multiprocessing.Queue()
+	hungry = multiprocessing.Value('i', 0)
+	pending = multiprocessing.Value('i', 1)
+	stopEvent = multiprocessing.Event()
+	stealQueue.put(feas[1])
+
+	# The workers only keep a trace if the parent does and use the lp
+	# backend and pool settings of the parent
+	lpSettings = lpUtilsMark.getLpSettings()
+	workers = []
+	for workerId in range(numProcesses):
+		worker = multiprocessing.Process(target=lpWorker, args=(workerId, model, stealQueue, resultQueue, hungry, pending, stopEvent, volRedThreshold, bisectFun, kAlpha, epsilonInflation, traceEnabled, useSymmetry, contractor, preconditionerResidual, lpSettings))
+		worker.daemon = True
+		worker.start()
+		workers.append(worker)
+
+	try:
+		numFinished = 0
+		while numFinished < numProcesses:
+			try:
+				kind, value = resultQueue.get(timeout=1.0)
+			except queue.Empty:
+				for worker in workers:
+					if worker.exitcode is not None and worker.exitcode != 0:
+						raise Exception("prototype.py solverLoopParallel: worker exited with exitcode " + str(worker.exitcode))
+				continue
+			if kind == "e":
+				raise Exception("prototype.py solverLoopParallel: " + value)
+			elif kind == "s":
+				if numSolutions == "all" or len(uniqueHypers) < numSolutions:
+					addToSolutions(model, uniqueHypers, value, kAlpha, epsilonInflation, hyperStore, contractor)
+				if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+					stopEvent.set()
+			elif kind == "t":
+				statVars['stringHyperList'].extend(value)
+			elif kind == "v":
+				numFinished += 1
+				for key in value:
+					if key == 'stringHyperList':
+						statVars[key].extend(value[key])
+					elif not(key.startswith('avg')):
+						statVars[key] += value[key]
+	finally:
+		stopEvent.set()
+		for worker in workers:
+			worker.join(1.0)
+			if worker.is_alive():
+				worker.terminate()
+				worker.join()
+
+	if useSymmetry:
+		addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor)
+
 
 # Apply Krawczyk and linear programming to refine the hyperrectangle
 # @param hyperRectangle 
@@ -375,13 +1182,21 @@ def solverLoopNoLp(uniqueHypers, model, statVars=None, bisectFun=bisectMax, numS
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+# @param preconditionerCache intervalUtils.PreconditionerCache holding the preconditioners
+#	inherited by the hyperrectangles. If None, the jacobian is inverted for every Krawczyk update
 # @return (True, hyper) if hyperRectangle contains a unique
 # 	solution and hyper maybe smaller than hyperRectangle containing the solution
 # @return (False, None) if hyperRectangle contains no solution
 # @return (False, hyper) if hyperRectangle may contain more
 # 	than 1 solution and hyper maybe smaller than hyperRectangle containing the solutions
-def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,epsilonInflation):
+def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,epsilonInflation, contractor="krawczyk", preconditionerCache=None):
 	lenV = hyperRectangle.shape[0]
+	if preconditionerCache is None:
+		preconditionerCache = intervalUtils.PreconditionerCache(None)
+	preconditioner = preconditionerCache.get(hyperRectangle)
+	traceEnabled = isTraceEnabled(statVars['stringHyperList'])
 	iterNum = 0
 	while True:
 		newHyperRectangle = np.copy(hyperRectangle)
@@ -395,11 +1210,11 @@ def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,eps
 		statVars['numSuccessLpCalls'] += numSuccessLp
 		statVars['numUnsuccessLpCalls'] += numUnsuccessLp
 		statVars['numLp'] += 1
-		if feasible:
-			vol = intervalUtils.volume(newHyperRectangle)
-		else:
+		if traceEnabled:
 			vol = None
-		statVars['stringHyperList'].append(("l", vol))
+			if feasible:
+				vol = intervalUtils.volume(newHyperRectangle)
+			statVars['stringHyperList'].append(("l", vol))
 		#print ("newHyperRectangle", newHyperRectangle)
 		#intervalUtils.printHyper(newHyperRectangle)
 		if feasible == False:
@@ -421,7 +1236,7 @@ def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,eps
 		if not(intervalCheck):
 			return (False, None)
 		start = time.time()
-		kResult = intervalUtils.checkExistenceOfSolution(model, newHyperRectangle, kAlpha, epsilonInflation=epsilonInflation)
+		kResult = intervalUtils.checkExistenceOfSolution(model, newHyperRectangle, kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditioner=preconditioner)
 		end = time.time()
 		statVars['totalKTime'] += end - start
 		statVars['numK'] += 1
@@ -443,12 +1258,49 @@ def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,eps
 		# If the proportion of volume reduction is not atleast
 		# volRedThreshold then return
 		if math.isnan(propReduc) or propReduc <= volRedThreshold:
+			preconditionerCache.put([newHyperRectangle], preconditioner)
 			return (False, newHyperRectangle)
 		hyperRectangle = newHyperRectangle
 		iterNum+=1
 	
 
 
+# Raise an exception if the search for solutions of model over hyperRectangle
+# cannot be reduced by rotational symmetry. The model must be invariant under
+# cyclic rotation of its variables and so must hyperRectangle
+def checkRotationSymmetry(model, hyperRectangle):
+	if not(getattr(model, 'rotationSymmetric', False)):
+		raise Exception("model is not invariant under rotation of its variables. Set rotationSymmetric to True in the model class to use the symmetry reduction. Or use the solver without the symmetry reduction\n")
+	if not(np.array_equal(hyperRectangle, np.roll(hyperRectangle, 1, axis=0))):
+		raise Exception("prototype.py checkRotationSymmetry: hyperRectangle must be invariant under rotation to use the symmetry reduction\n")
+
+# Every solution of a model that is invariant under rotation is a rotation
+# of a solution where the first variable is the largest. Check if hyper
+# intersects the part of the search space where the first variable
+# is the largest
+def inFundamentalDomain(hyper):
+	return np.all(hyper[1:,0] <= hyper[0,1])
+
+# Add all the rotations of the hyperrectangles in uniqueHypers to uniqueHypers.
+# Rotations containing the same solution as an existing hyperrectangle are
+# removed by addToSolutions
+# @param model indicates the problem we are trying to solve
+# @param uniqueHypers is a list of hyperrectangle containing unique solutions
+# @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
+# @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
+# 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
+# @param hyperStore HyperStore holding the hyperrectangles in uniqueHypers
+# @param numSolutions indicates the number of solutions wanted by the user
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+def addRotatedSolutions(model, uniqueHypers, kAlpha, epsilonInflation, hyperStore, numSolutions, contractor="krawczyk"):
+	for solHyper in list(uniqueHypers):
+		for shift in range(1, solHyper.shape[0]):
+			if numSolutions != "all" and len(uniqueHypers) >= numSolutions:
+				return
+			addToSolutions(model, uniqueHypers, np.roll(solHyper, shift, axis=0), kAlpha, epsilonInflation, hyperStore, contractor)
+
+
 # A function that adds a new solution to the list of existing hyperrectangles
 # containing unique solutions if the new hyperrectangle does not contain
 # the same solution as the solution in any of the existing hyperrectangles
@@ -458,7 +1310,12 @@ def ifFeasibleHyper(hyperRectangle, statVars, volRedThreshold, model, kAlpha,eps
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
-def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
+# @param hyperStore optional HyperStore holding the hyperrectangles in allHypers.
+#	If given, only the hyperrectangles it reports as overlapping with solHyper
+#	are checked and solHyper is added to it along with allHypers
+# @param contractor the contraction operator used by checkExistenceOfSolution,
+#	one of intervalUtils.CONTRACTORS
+def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation, hyperStore=None, contractor="krawczyk"):
 	epsilon = 1e-12
 	lenV = len(model.bounds)
 	foundOverlap = False
@@ -468,7 +1325,12 @@ def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
 	if not(soln[0]):
 		raise Exception("prototype.py addToSolutions: Something went wrong. Should contain a unique solution" + str(solHyper))
 	
-	for hi in range(len(allHypers)):
+	if hyperStore is None:
+		candidateIndices = range(len(allHypers))
+	else:
+		candidateIndices = hyperStore.overlapping(solHyper)
+
+	for hi in candidateIndices:
 		oldHyper = allHypers[hi]
 
 		#Check if solHyper overlaps with oldHyper
@@ -483,13 +1345,15 @@ def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
 				minDiff = np.minimum(np.absolute(intersectHyper[:,1] - soln[1]), np.absolute(soln[1] - intersectHyper[:,0]))
 				hyperAroundNewton[:,0] = soln[1] - minDiff
 				hyperAroundNewton[:,1] = soln[1] + minDiff
-				feasibility = intervalUtils.checkExistenceOfSolution(model, hyperAroundNewton, alpha = kAlpha, epsilonInflation=epsilonInflation)
+				feasibility = intervalUtils.checkExistenceOfSolution(model, hyperAroundNewton, alpha = kAlpha, epsilonInflation=epsilonInflation, contractor=contractor)
 				if feasibility[0]:
 					foundOverlap = True
 					break
 
 	if not(foundOverlap):
 		allHypers.append(solHyper)
+		if hyperStore is not None:
+			hyperStore.add(solHyper)
 		return True
 	else:
 		return False
@@ -497,6 +1361,20 @@ def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
 
 
 
+# Return the schmitt trigger model used by schmittTrigger
+# @param modelType "lcMosfet" for the long channel mosfet model and
+#	"scMosfet" for the short channel mosfet model
+# @param inputVoltage the input voltage of the schmitt trigger
+def schmittModel(modelType, inputVoltage):
+	if modelType == "lcMosfet":
+		#modelParam = [Vtp, Vtn, Vdd, Kn, Kp, Sn]
+		modelParam = [-0.4, 0.4, 1.8, 270*1e-6, -90*1e-6, 8/3.0]
+	elif modelType == "scMosfet":
+		modelParam = [1.0] #Vdd
+	else:
+		raise Exception("prototype.py schmittModel: unknown model type " + str(modelType))
+	return SchmittMosfet(modelType = modelType, modelParam = modelParam, inputVoltage = inputVoltage)
+
 # Find the dc equilibrium points for the schmitt trigger for a specific
 # input voltage
 # @param modelType indicates the type of transistor model used for the schmitt
@@ -505,6 +1383,7 @@ def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
 # @param inputVoltage the value of the specific input voltage for which 
 # 	the dc equilibrium points are found
 # @param statVars dictionary to hold statistics like number of bisections, number of Krawczyk calls
+#	and the hits, misses and evictions of the caches of the model (see cacheUtils)
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
@@ -514,22 +1393,47 @@ def addToSolutions(model, allHypers, solHyper, kAlpha,epsilonInflation):
 #	bisectNewton method
 # @param numSolutions, number of dc equilibrium points we are looking for
 # @param useLp flag to decide whether to use linear programming in our method or not
+# @param numProcesses number of worker processes used by the solver. If numProcesses
+#	is 1 the serial solverLoop or solverLoopNoLp is used
+# @param traceSink object with append and extend methods that receives the trace of
+#	operations performed by the solver (statVars['stringHyperList']). If None, the trace
+#	is kept in a list. See traceUtils for sinks that drop the trace, keep only the last
+#	entries or write it to a file
+# @param lpBackend backend used to solve the linear programs when useLp is True, one of
+#	lpUtilsMark.LP_BACKENDS. If None, the backend selected by lpUtilsMark.setLpBackend is used.
+#	The given backend is only used for this call
+# @param numLpWorkers number of linear programs solved at the same time when useLp is True
+#	(see lpUtilsMark.setLpPool). If None, the pool selected by lpUtilsMark.setLpPool is used.
+#	Otherwise a pool is used for this call only and closed when it returns
+# @param lpPoolType "thread" or "process", the type of pool used when numLpWorkers is given
+# @param contractor the operator used to refine the hyperrectangles, one of
+#	intervalUtils.CONTRACTORS. "krawczyk" uses the Krawczyk operator and "gauss_seidel"
+#	the interval Gauss-Seidel (Hansen-Sengupta) operator
+# @param preconditionerResidual largest residual ||I - C*J|| for which a Krawczyk preconditioner
+#	is reused, see solverLoop. If None, J is inverted for every Krawczyk update
+# @param searchOrder order in which the solver pops the hyperrectangles that still need to be
+#	processed, one of frontier.SEARCH_ORDERS or a score function (see frontier.makeFrontier).
+#	A priority order such as "residual" finds the first solutions sooner when numSolutions is
+#	given. The work stealing solver used with useLp and numProcesses > 1 always searches depth first
+# @param checkpointFile name of the .npz file the serial solver loops periodically save their
+#	state to (see solverLoop). Ignored when numProcesses > 1
+# @param checkpointInterval number of seconds between two checkpoints
+# @param resume if True and checkpointFile exists, continue the search saved in it. A run
+#	killed before finishing can then be restarted with the same arguments
+# @param batchSize if given and useLp is False and numProcesses is 1, solverLoopBatched
+#	processes up to batchSize hyperrectangles at once instead of solverLoopNoLp processing
+#	them one at a time. Checkpoints, preconditionerResidual and searchOrder are not used then
 # @return a list of hyperrectangles containing unique dc equilibrium points
-def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInflation=0.001, bisectType="bisectMax", numSolutions = "all", useLp = False):
-	statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInflation=0.001, bisectType="bisectMax", numSolutions = "all", useLp = False, numProcesses = 1, traceSink = None, lpBackend = None, numLpWorkers = None, lpPoolType = "thread", contractor = "krawczyk", preconditionerResidual = None, searchOrder = "lifo", checkpointFile = None, checkpointInterval = 600.0, resume = False, batchSize = None):
+	statVars.update(newStatVars())
+	if traceSink is not None:
+		statVars['stringHyperList'] = traceSink
 
 	#load the schmitt trigger model
-	if modelType == "lcMosfet":
-		#modelParam = [Vtp, Vtn, Vdd, Kn, Kp, Sn]
-		modelParam = [-0.4, 0.4, 1.8, 270*1e-6, -90*1e-6, 8/3.0]
-		model = SchmittMosfet(modelType = modelType, modelParam = modelParam, inputVoltage = inputVoltage)
-	elif modelType == "scMosfet":
-		modelParam = [1.0] #Vdd
-		model = SchmittMosfet(modelType = modelType, modelParam = modelParam, inputVoltage = inputVoltage)
+	model = schmittModel(modelType, inputVoltage)
 
 	startExp = time.time()
+	cacheCountsBefore = cacheCounts(model)
 
 	allHypers = []
 	#print ("model val", model.f(np.array([1.7, 0.1, 0.1])))
@@ -538,11 +1442,23 @@ def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInfla
 		bisectFun = bisectMax
 	if bisectType == "bisectNewton":
 		bisectFun = bisectNewton
-	if useLp:
-		volRedThreshold = 1.0
-		solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
-	else:
-		solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
+	# the lp backend and pool are only changed for this run
+	previousLpSettings = lpUtilsMark.applyLpSettings(lpBackend, numLpWorkers, lpPoolType)
+	try:
+		if useLp:
+			volRedThreshold = 1.0
+			if numProcesses > 1:
+				solverLoopParallel(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, numProcesses=numProcesses, contractor=contractor, preconditionerResidual=preconditionerResidual)
+			else:
+				solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder, checkpointFile=checkpointFile, checkpointInterval=checkpointInterval, resume=resume)
+		elif numProcesses > 1:
+			solverLoopNoLpParallel(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, numProcesses=numProcesses, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder)
+		elif batchSize is not None:
+			solverLoopBatched(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, batchSize=batchSize)
+		else:
+			solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder, checkpointFile=checkpointFile, checkpointInterval=checkpointInterval, resume=resume)
+	finally:
+		lpUtilsMark.restoreLpSettings(previousLpSettings)
 
 	#print ("allHypers")
 	#print (allHypers)
@@ -551,6 +1467,7 @@ def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInfla
 	
 	#dcUtils.printSol(allHypers, model)
 	endExp = time.time()
+	addCacheCounts(statVars, model, cacheCountsBefore)
 	#print ("TOTAL TIME ", endExp - startExp)
 	if statVars['numLp'] != 0:
 		statVars['avgLPTime'] = (statVars['totalLPTime']*1.0)/statVars['numLp']
@@ -572,6 +1489,7 @@ def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInfla
 # @param inputVoltage the value of the specific input voltage for which 
 # 	the dc equilibrium points are found
 # @param statVars dictionary to hold statistics like number of bisections, number of Krawczyk calls
+#	and the hits, misses and evictions of the caches of the model (see cacheUtils)
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
@@ -583,9 +1501,7 @@ def schmittTrigger(modelType, inputVoltage, statVars, kAlpha = 1.0, epsilonInfla
 # @param useLp flag to decide whether to use linear programming in our method or not
 # @return a list of hyperrectangles containing unique dc equilibrium points
 def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.001, bisectType="bisectMax", numSolutions="all" , useLp=False):
-	statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+	statVars.update(newStatVars())
 	
 
 	#load the inverter model
@@ -601,6 +1517,7 @@ def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.0
 		model = InverterMosfet(modelType = modelType, modelParam = modelParam, inputVoltage = inputVoltage)
 
 	startExp = time.time()
+	cacheCountsBefore = cacheCounts(model)
 	
 	allHypers = []
 	if bisectType == "bisectMax":
@@ -611,7 +1528,7 @@ def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.0
 		volRedThreshold = 1.0
 		solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
 	else:
-		solverLoopNoLpBisectAndKill(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
+		solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
 	
 	'''print ("allHypers")
 	print (allHypers)
@@ -620,6 +1537,7 @@ def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.0
 	#print ("numSolutions", len(allHypers))'''
 	
 	endExp = time.time()
+	addCacheCounts(statVars, model, cacheCountsBefore)
 	#print ("TOTAL TIME ", endExp - startExp)
 
 	if statVars['numLp'] != 0:
@@ -641,6 +1559,7 @@ def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.0
 #	If modelType == "scMosfet", use the short channel mosfet model
 # @param numInverters the number of inverters in the inverter loop
 # @param statVars dictionary to hold statistics like number of bisections, number of Krawczyk calls
+#	and the hits, misses and evictions of the caches of the model (see cacheUtils)
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
@@ -652,9 +1571,7 @@ def inverter(modelType, inputVoltage, statVars, kAlpha=1.0, epsilonInflation=0.0
 # @param useLp flag to decide whether to use linear programming in our method or not
 # @return a list of hyperrectangles containing unique dc equilibrium points
 def inverterLoop(modelType, numInverters, statVars, kAlpha=1.0, epsilonInflation=0.001, bisectType="bisectMax", numSolutions="all" , useLp=False):
-	statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+	statVars.update(newStatVars())
 	
 
 	#load the inverter model
@@ -670,6 +1587,7 @@ def inverterLoop(modelType, numInverters, statVars, kAlpha=1.0, epsilonInflation
 		model = InverterLoopMosfet(modelType = modelType, modelParam = modelParam, numInverters = numInverters)
 
 	startExp = time.time()
+	cacheCountsBefore = cacheCounts(model)
 	
 	allHypers = []
 	if bisectType == "bisectMax":
@@ -680,13 +1598,14 @@ def inverterLoop(modelType, numInverters, statVars, kAlpha=1.0, epsilonInflation
 		volRedThreshold = 1.0
 		solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
 	else:
-		solverLoopNoLpBisectAndKill(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
+		solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation)
 	
 	#print ("allHypers")
 	#print (allHypers)
 	#print ("numSolutions", len(allHypers))
 	
 	endExp = time.time()
+	addCacheCounts(statVars, model, cacheCountsBefore)
 	#print ("TOTAL TIME ", endExp - startExp)
 
 	if statVars['numLp'] != 0:
@@ -711,6 +1630,7 @@ def inverterLoop(modelType, numInverters, statVars, kAlpha=1.0, epsilonInflation
 # @param numStages the number of stages in the rambus ring oscillator
 # @param g_cc strength of the cross coupled inverter (as compared to that of the forward)
 # @param statVars dictionary to hold statistics like number of bisections, number of Krawczyk calls
+#	and the hits, misses and evictions of the caches of the model (see cacheUtils)
 # @param kAlpha is the threshold which indicates the stopping criterion for the Krawczyk loop
 # @param epsilonInflation indicates the proportion of hyper-rectangle distance by which the 
 # 	hyper-rectangle needs to be inflated before the Krawczyk operator is applied
@@ -720,11 +1640,43 @@ def inverterLoop(modelType, numInverters, statVars, kAlpha=1.0, epsilonInflation
 #	bisectNewton method
 # @param numSolutions, number of dc equilibrium points we are looking for
 # @param useLp flag to decide whether to use linear programming in our method or not
+# @param numProcesses number of worker processes used by the solver. If numProcesses
+#	is 1 the serial solverLoop or solverLoopNoLp is used
+# @param traceSink object with append and extend methods that receives the trace of
+#	operations performed by the solver (statVars['stringHyperList']). If None, the trace
+#	is kept in a list. See traceUtils for sinks that drop the trace, keep only the last
+#	entries or write it to a file
+# @param useSymmetry if True, use the rotational symmetry of the rambus oscillator to only
+#	search the part of the search space where the first node voltage is the largest
+# @param lpBackend backend used to solve the linear programs when useLp is True, one of
+#	lpUtilsMark.LP_BACKENDS. If None, the backend selected by lpUtilsMark.setLpBackend is used.
+#	The given backend is only used for this call
+# @param numLpWorkers number of linear programs solved at the same time when useLp is True
+#	(see lpUtilsMark.setLpPool). If None, the pool selected by lpUtilsMark.setLpPool is used.
+#	Otherwise a pool is used for this call only and closed when it returns
+# @param lpPoolType "thread" or "process", the type of pool used when numLpWorkers is given
+# @param contractor the operator used to refine the hyperrectangles, one of
+#	intervalUtils.CONTRACTORS. "krawczyk" uses the Krawczyk operator and "gauss_seidel"
+#	the interval Gauss-Seidel (Hansen-Sengupta) operator
+# @param preconditionerResidual largest residual ||I - C*J|| for which a Krawczyk preconditioner
+#	is reused, see solverLoop. If None, J is inverted for every Krawczyk update
+# @param searchOrder order in which the solver pops the hyperrectangles that still need to be
+#	processed, one of frontier.SEARCH_ORDERS or a score function (see frontier.makeFrontier).
+#	A priority order such as "residual" finds the first solutions sooner when numSolutions is
+#	given. The work stealing solver used with useLp and numProcesses > 1 always searches depth first
+# @param checkpointFile name of the .npz file the serial solver loops periodically save their
+#	state to (see solverLoop). Ignored when numProcesses > 1
+# @param checkpointInterval number of seconds between two checkpoints
+# @param resume if True and checkpointFile exists, continue the search saved in it. A run
+#	killed before finishing can then be restarted with the same arguments
+# @param batchSize if given and useLp is False and numProcesses is 1, solverLoopBatched
+#	processes up to batchSize hyperrectangles at once instead of solverLoopNoLp processing
+#	them one at a time. Checkpoints, preconditionerResidual and searchOrder are not used then
 # @return a list of hyperrectangles containing unique dc equilibrium points
-def rambusOscillator(modelType, numStages, g_cc, statVars, kAlpha=1.0, epsilonInflation=0.01, bisectType="bisectMax", numSolutions="all", useLp=False):
-	statVars.update({'numBisection':0, 'numLp':0, 'numK':0, 'numIa':0 ,'numSingleKill':0, 'numDoubleKill':0,
-					'totalKTime':0, 'totalLPTime':0, 'totalIaTime':0,'avgKTime':0, 'avgLPTime':0, 'avgIaTime':0,'stringHyperList':[],
-					'numLpCalls':0, 'numSuccessLpCalls':0, 'numUnsuccessLpCalls':0})
+def rambusOscillator(modelType, numStages, g_cc, statVars, kAlpha=1.0, epsilonInflation=0.01, bisectType="bisectMax", numSolutions="all", useLp=False, numProcesses=1, traceSink=None, useSymmetry=False, lpBackend=None, numLpWorkers=None, lpPoolType="thread", contractor="krawczyk", preconditionerResidual=None, searchOrder="lifo", checkpointFile=None, checkpointInterval=600.0, resume=False, batchSize=None):
+	statVars.update(newStatVars())
+	if traceSink is not None:
+		statVars['stringHyperList'] = traceSink
 	
 	if modelType == "tanh":
 		modelParam = [-5.0, 0.0] # y = tanh(modelParam[0]*x + modelParam[1])
@@ -740,6 +1692,7 @@ def rambusOscillator(modelType, numStages, g_cc, statVars, kAlpha=1.0, epsilonIn
 		model = RambusMosfet(modelType = modelType, modelParam = modelParam, g_cc = g_cc, g_fwd = 1.0, numStages = numStages)
 
 	startExp = time.time()
+	cacheCountsBefore = cacheCounts(model)
 	
 	allHypers = []
 
@@ -755,18 +1708,31 @@ def rambusOscillator(modelType, numStages, g_cc, statVars, kAlpha=1.0, epsilonIn
 		bisectFun = bisectMax
 	if bisectType == "bisectNewton":
 		bisectFun = bisectNewton
-	if useLp:
-		volRedThreshold = 1.0
-		solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle=hyper1)
-	else:
-		solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle = hyper1)
+	# the lp backend and pool are only changed for this run
+	previousLpSettings = lpUtilsMark.applyLpSettings(lpBackend, numLpWorkers, lpPoolType)
+	try:
+		if useLp:
+			volRedThreshold = 1.0
+			if numProcesses > 1:
+				solverLoopParallel(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle=hyper1, numProcesses=numProcesses, useSymmetry=useSymmetry, contractor=contractor, preconditionerResidual=preconditionerResidual)
+			else:
+				solverLoop(uniqueHypers=allHypers, model=model, statVars=statVars, volRedThreshold=volRedThreshold, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle=hyper1, useSymmetry=useSymmetry, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder, checkpointFile=checkpointFile, checkpointInterval=checkpointInterval, resume=resume)
+		elif numProcesses > 1:
+			solverLoopNoLpParallel(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle = hyper1, numProcesses=numProcesses, useSymmetry=useSymmetry, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder)
+		elif batchSize is not None:
+			solverLoopBatched(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle = hyper1, useSymmetry=useSymmetry, contractor=contractor, batchSize=batchSize)
+		else:
+			solverLoopNoLp(uniqueHypers=allHypers, model=model, statVars=statVars, bisectFun=bisectFun, numSolutions=numSolutions, kAlpha=kAlpha, epsilonInflation=epsilonInflation, hyperRectangle = hyper1, useSymmetry=useSymmetry, contractor=contractor, preconditionerResidual=preconditionerResidual, searchOrder=searchOrder, checkpointFile=checkpointFile, checkpointInterval=checkpointInterval, resume=resume)
 	
-	#print ("allHypers")
-	#print (allHypers)
-	#dcUtils.printSol(allHypers, model)
-	#print ("numSolutions", len(allHypers))
+		#print ("allHypers")
+		#print (allHypers)
+		#dcUtils.printSol(allHypers, model)
+		#print ("numSolutions", len(allHypers))
+	finally:
+		lpUtilsMark.restoreLpSettings(previousLpSettings)
 
 	endExp = time.time()
+	addCacheCounts(statVars, model, cacheCountsBefore)
 	#print ("TOTAL TIME ", endExp - startExp)
 
 	if statVars['numLp'] != 0:
@@ -3,6 +3,11 @@
 // Functions that need to be applied by automatic differentiation (FADBAD++) should have
 // data type with F<T> as arguments and return types.
 // Boost is used to export the relevant C++ functions to python
+// The *_batch functions evaluate many devices in one call and exchange
+// (N, 2) float64 numpy arrays through the buffer protocol
+// StMosfet is thread safe: its parameters are fixed at construction and the
+// model functions release the GIL while they evaluate, so one StMosfet can be
+// used from several python threads at once
 
 #include "FADBAD++/fadiff.h"
 #include "FADBAD++/interval.hpp"
@@ -16,11 +21,176 @@ typedef std::vector<MyList> MyListOfList;
 
 typedef mc::Interval I;
 
+// C-contiguous float64 array accessed through the buffer protocol
+// without copying. Used by the batch functions to read the (N, 2) interval
+// arrays passed from python and to fill the arrays they return.
+// The buffer is released when the DoubleArray goes out of scope
+class DoubleArray{
+public:
+    DoubleArray(object obj, bool writable){
+        int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+        if (writable){
+            flags |= PyBUF_WRITABLE;
+        }
+        if (PyObject_GetBuffer(obj.ptr(), &view, flags) != 0){
+            throw_error_already_set();
+        }
+        std::string format = view.format == NULL ? "B" : view.format;
+        if (view.itemsize != sizeof(double) || 
+            (format != "d" && format != "<d" && format != "=d" && format != "@d")){
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_TypeError, "stChannel_py: expected an array of float64");
+            throw_error_already_set();
+        }
+    }
+
+    ~DoubleArray(){
+        PyBuffer_Release(&view);
+    }
+
+    double* data(){
+        return (double*) view.buf;
+    }
+
+    // Number of intervals in an array of shape (N, 2)
+    Py_ssize_t numIntervals(){
+        if (view.ndim != 2 || view.shape[1] != 2){
+            PyErr_SetString(PyExc_ValueError, "stChannel_py: expected an array of shape (N, 2)");
+            throw_error_already_set();
+        }
+        return view.shape[0];
+    }
+
+    void checkNumIntervals(Py_ssize_t numDevices){
+        if (numIntervals() != numDevices){
+            PyErr_SetString(PyExc_ValueError, "stChannel_py: voltage arrays have different numbers of devices");
+            throw_error_already_set();
+        }
+    }
+
+private:
+    Py_buffer view;
+    DoubleArray(const DoubleArray&);
+    DoubleArray& operator=(const DoubleArray&);
+};
+
+// Releases the GIL for as long as it is in scope so that other python
+// threads can run during the model evaluation. Python objects must
+// not be touched while the GIL is released
+class ScopedGILRelease{
+public:
+    ScopedGILRelease(){
+        threadState = PyEval_SaveThread();
+    }
+
+    ~ScopedGILRelease(){
+        PyEval_RestoreThread(threadState);
+    }
+
+private:
+    PyThreadState* threadState;
+    ScopedGILRelease(const ScopedGILRelease&);
+    ScopedGILRelease& operator=(const ScopedGILRelease&);
+};
+
+// Parameters of the short channel model for one transistor type.
+// See model_params for the default values
+struct MosParams{
+    double version, mType, W, Lgdr, dLg, Cg, etov, delta, n0, Rs0, Rd0, Cif, Cof, vxo;
+    double mu, beta, Tjun, phib, gamma, Vt0, alpha, mc, CTM_select, CC, nd, zeta;
+};
+
+// Names of the fields of MosParams as used in model_params
+// and in the parameter dicts passed from python
+struct MosParamName{
+    const char* name;
+    double MosParams::* field;
+};
+
+const MosParamName mosParamNames[] = {
+    {"version", &MosParams::version}, {"mType", &MosParams::mType}, {"W", &MosParams::W},
+    {"Lgdr", &MosParams::Lgdr}, {"dLg", &MosParams::dLg}, {"Cg", &MosParams::Cg},
+    {"etov", &MosParams::etov}, {"delta", &MosParams::delta}, {"n0", &MosParams::n0},
+    {"Rs0", &MosParams::Rs0}, {"Rd0", &MosParams::Rd0}, {"Cif", &MosParams::Cif},
+    {"Cof", &MosParams::Cof}, {"vxo", &MosParams::vxo}, {"mu", &MosParams::mu},
+    {"beta", &MosParams::beta}, {"Tjun", &MosParams::Tjun}, {"phib", &MosParams::phib},
+    {"gamma", &MosParams::gamma}, {"Vt0", &MosParams::Vt0}, {"alpha", &MosParams::alpha},
+    {"mc", &MosParams::mc}, {"CTM_select", &MosParams::CTM_select}, {"CC", &MosParams::CC},
+    {"nd", &MosParams::nd}, {"zeta", &MosParams::zeta}
+};
+const int numMosParams = sizeof(mosParamNames)/sizeof(mosParamNames[0]);
+
 struct StMosfet{
 
+// nfet and pfet parameters, computed once at construction
+MosParams nParams, pParams;
+
+// Copies of the overrides given at construction, so that
+// an instance can be pickled and rebuilt in another process
+dict nOverrides, pOverrides;
+
+// Transistors with the default parameters of model_params
+StMosfet(){
+    nParams = paramsFromMap(model_params('n'));
+    pParams = paramsFromMap(model_params('p'));
+}
+
+// Transistors with the default parameters of model_params
+// replaced by the values in nOverrides for the nfet and pOverrides
+// for the pfet, for example {"W": 900e-7, "Vt0": 0.5}
+StMosfet(const dict& nOverridesIn, const dict& pOverridesIn){
+    nParams = paramsFromMap(model_params('n'));
+    pParams = paramsFromMap(model_params('p'));
+    overrideParams(nOverridesIn, nParams);
+    overrideParams(pOverridesIn, pParams);
+    nOverrides = dict(nOverridesIn.attr("copy")());
+    pOverrides = dict(pOverridesIn.attr("copy")());
+}
+
+MosParams paramsFromMap(const std::map<std::string, double>& paramMap) const{
+    MosParams mosParams;
+    for (int i = 0; i < numMosParams; i++){
+        mosParams.*(mosParamNames[i].field) = paramMap.at(mosParamNames[i].name);
+    }
+    return mosParams;
+}
+
+void overrideParams(const dict& overrides, MosParams& mosParams){
+    list keys = overrides.keys();
+    for (int k = 0; k < len(keys); k++){
+        std::string key = extract<std::string>(keys[k]);
+        int i = 0;
+        while (i < numMosParams && key != mosParamNames[i].name){
+            i++;
+        }
+        if (i == numMosParams){
+            PyErr_SetString(PyExc_KeyError, ("stChannel_py: unknown parameter " + key).c_str());
+            throw_error_already_set();
+        }
+        mosParams.*(mosParamNames[i].field) = extract<double>(overrides[keys[k]]);
+    }
+}
+
+const MosParams& params(const char fetType) const{
+    if (fetType == 'n'){
+        return nParams;
+    }
+    return pParams;
+}
+
+// Python friendly parameters of the nfet (fetType 'n') or pfet (fetType 'p')
+dict paramsPy(const char fetType) const{
+    const MosParams& mosParams = params(fetType);
+    dict paramDict;
+    for (int i = 0; i < numMosParams; i++){
+        paramDict[mosParamNames[i].name] = mosParams.*(mosParamNames[i].field);
+    }
+    return paramDict;
+}
+
 // Returns map of params depending on whether mType indicates
 // an nfet or pfet
-std::map<std::string, double> model_params(const char mType){
+std::map<std::string, double> model_params(const char mType) const{
     std::map<std::string, double> input_params;
     std::string versionS = "version", mTypeS = "mType", WS = "W", LgdrS = "Lgdr", dLgS = "dLg", CgS = "Cg";
     std::string etovS = "etov", deltaS = "delta", n0S = "n0", Rs0S = "Rs0", Rd0S = "Rd0", CifS = "Cif", CofS = "Cof", vxoS = "vxo";
@@ -120,7 +290,7 @@ std::map<std::string, double> model_params(const char mType){
 }
 
 /* Calculate ids from Vds, Vgs, Vbs according to the short channel MOSFET model.
- * @param params map of parameter variables to the subsequent values
+ * @param params parameters of the transistor
  * @param Vds evaluation of (interval drain - interval source)
  * @param Vgs evaluation of (interval gate - interval source)
  * @param Vbs evaluation of (interval body - interval source)
@@ -129,43 +299,35 @@ std::map<std::string, double> model_params(const char mType){
  *          iDir = -1 -> current from source to drain
  * @return interval ids
  */
-F<I> mvs_id(const std::map<std::string, double>& params, 
+F<I> mvs_id(const MosParams& params, 
                         const F<I>& Vds, const F<I>& Vgs,  
-                        const F<I>& Vbs, const int& iDir){
-    std::string versionS = "version", mTypeS = "mType", WS = "W", LgdrS = "Lgdr";
-    std::string dLgS = "dLg", CgS = "Cg";
-    std::string etovS = "etov", delS = "delta", n0S = "n0", Rs0S = "Rs0";
-    std::string Rd0S = "Rd0", CifS = "Cif", CofS = "Cof", vxoS = "vxo";
-    std::string muS = "mu", betaS = "beta", TjunS = "Tjun";
-    std::string phibS = "phib", gammaS = "gamma", Vt0S = "Vt0";
-    std::string alphaS = "alpha", mcS = "mc";
-    std::string CTM_selectS = "CTM_select", CCS = "CC", ndS = "nd", zetaS = "zeta";
-    double version = params.at(versionS);
-    double mType = params.at(mTypeS);
-    double W = params.at(WS);
-    double Lgdr = params.at(LgdrS);
-    double dLg = params.at(dLgS);
-    double Cg = params.at(CgS);
-    double etov = params.at(etovS);
-    double delta = params.at(delS);
-    double n0 = params.at(n0S);
-    double Rs0 = params.at(Rs0S);
-    double Rd0 = params.at(Rd0S);
-    double Cif = params.at(CifS);
-    double Cof = params.at(CofS);
-    double vxo = params.at(vxoS)*1e+7;
-    double mu = params.at(muS);
-    double beta = params.at(betaS);
-    double Tjun = params.at(TjunS);
-    double phib = params.at(phibS);
-    double gamma = params.at(gammaS);
-    double Vt0 = params.at(Vt0S);
-    double alpha = params.at(alphaS);
-    double mc = params.at(mcS);
-    double CTM_select = params.at(CTM_selectS);
-    double CC = params.at(CCS);
-    double nd = params.at(ndS);
-    double zeta = params.at(zetaS);
+                        const F<I>& Vbs, const int& iDir) const{
+    double version = params.version;
+    double mType = params.mType;
+    double W = params.W;
+    double Lgdr = params.Lgdr;
+    double dLg = params.dLg;
+    double Cg = params.Cg;
+    double etov = params.etov;
+    double delta = params.delta;
+    double n0 = params.n0;
+    double Rs0 = params.Rs0;
+    double Rd0 = params.Rd0;
+    double Cif = params.Cif;
+    double Cof = params.Cof;
+    double vxo = params.vxo*1e+7;
+    double mu = params.mu;
+    double beta = params.beta;
+    double Tjun = params.Tjun;
+    double phib = params.phib;
+    double gamma = params.gamma;
+    double Vt0 = params.Vt0;
+    double alpha = params.alpha;
+    double mc = params.mc;
+    double CTM_select = params.CTM_select;
+    double CC = params.CC;
+    double nd = params.nd;
+    double zeta = params.zeta;
 
     // Virtual source not included here
 
@@ -248,7 +410,7 @@ F<I> mvs_id(const std::map<std::string, double>& params,
 // bias voltages are Vd, Vg, Vs, Vb,
 // fetTypes: 'n' means nfet, 'p' means pfet
 F<I> mvs_ids(const F<I>& Vd, const F<I>& Vg,  
-            const F<I>& Vs, const F<I>& Vb, const char& fetType){
+            const F<I>& Vs, const F<I>& Vb, const char& fetType) const{
 
     int mType;
     if (fetType == 'n'){
@@ -257,7 +419,7 @@ F<I> mvs_ids(const F<I>& Vd, const F<I>& Vg,
     else if(fetType == 'p'){
         mType = -1;
     }
-    std::map<std::string, double> mosType = model_params(fetType);
+    const MosParams& mosType = params(fetType);
     F<I> Vds = mType*(Vd - Vs);
     F<I> Vgs = mType*(Vg - Vs);
     F<I> Vbs = mType*(Vb - Vs);
@@ -310,10 +472,9 @@ F<I> mvs_ids(const F<I>& Vd, const F<I>& Vg,
 
 // Differentiate mvs_id function.
 // Return partial derivatives with respect to Vds, Vgs and Vvs respectively
-std::vector<I> mvs_idGradHelp(const std::map<std::string, double>& params, 
+std::vector<I> mvs_idGradHelp(const MosParams& params, 
                                 const F<I>& Vds, const F<I>& Vgs, const F<I>& Vbs, 
-                                const int& iDir){
-    std::map<std::string, double> nmos = model_params('n');
+                                const int& iDir) const{
     F<I> Vdsf, Vgsf, Vbsf;
     Vdsf = Vds;
     Vgsf = Vgs;
@@ -325,17 +486,19 @@ std::vector<I> mvs_idGradHelp(const std::map<std::string, double>& params,
 
     F<I> ff = mvs_id(params, Vdsf, Vgsf, Vbsf, iDir);
 
+    // F<I>::d writes to a shared static when ff has no derivatives
+    // so the derivatives are read from ff.g directly
     std::vector<I> jac;
-    jac.push_back(ff.d(0));
-    jac.push_back(ff.d(1));
-    jac.push_back(ff.d(2));
+    for (int i = 0; i < 3; i++){
+        jac.push_back(ff.g == 0 ? I(0.0) : ff.g[i]);
+    }
     return jac;
 
 }
 
 // Return partial derivatives of ids with respect to Vd, Vg and Vs respectively
-std::vector<I> mvs_idsGrad(I Vd, I Vg, I Vs, I Vb, char& fetType){
-    std::map<std::string, double> mosType = model_params(fetType);
+std::vector<I> mvs_idsGrad(I Vd, I Vg, I Vs, I Vb, char& fetType) const{
+    const MosParams& mosType = params(fetType);
     int mType;
     if (fetType == 'n'){
         mType = 1;
@@ -423,48 +586,113 @@ std::vector<I> mvs_idsGrad(I Vd, I Vg, I Vs, I Vb, char& fetType){
     return jacUnion;
 }
 
-// Python friendly gradient function for nfet
-MyListOfList mvs_idnGradPy(const MyList& Vd, 
-                            const MyList& Vg,
-                            const MyList& Vs,
-                            const MyList& Vb){
+// Evaluate the partial derivatives of ids with respect to Vd, Vg, Vs and Vb
+// for the intervals Vd = [Vd[0], Vd[1]] etc. and write them to jac as
+// [lo, hi] pairs in that order
+void mvs_idsGradVals(const double* Vd, const double* Vg,
+                        const double* Vs, const double* Vb,
+                        char fetType, double* jac) const{
     I Vdf = I(Vd[0], Vd[1]);
     I Vgf = I(Vg[0], Vg[1]);
     I Vsf = I(Vs[0], Vs[1]);
     I Vbf = I(Vb[0], Vb[1]);
-    char fetType = 'n';
-    std::vector<I> jac = mvs_idsGrad(Vdf, Vgf, Vsf, Vbf, fetType);
-    double jacAr0[] = {jac[0].l(), jac[0].u()};
-    MyList jac0(jacAr0, jacAr0 + 2);
-    double jacAr1[] = {jac[1].l(), jac[1].u()};
-    MyList jac1(jacAr1, jacAr1 + 2);
-    double jacAr2[] = {jac[2].l(), jac[2].u()};
-    MyList jac2(jacAr2, jacAr2 + 2);
-    double jacAr3[] = {jac[3].l(), jac[3].u()};
-    MyList jac3(jacAr3, jacAr3 + 2);
-
-    MyList overallJacAr[] = {jac0, jac1, jac2, jac3};
-    MyListOfList overallJac (overallJacAr, overallJacAr+4);
+    std::vector<I> jacI = mvs_idsGrad(Vdf, Vgf, Vsf, Vbf, fetType);
+    for (int i = 0; i < 4; i++){
+        jac[2*i] = jacI[i].l();
+        jac[2*i + 1] = jacI[i].u();
+    }
+}
+
+// Evaluate ids for the intervals Vd = [Vd[0], Vd[1]] etc. and write
+// [lo, hi] to ids. This gives tighter intervals than mvs_ids because
+// it takes advantage of monotonicity
+void mvs_idsMon(const double* Vd, const double* Vg,
+                    const double* Vs, const double* Vb,
+                    char fetType, double* ids) const{
+    F<I> Vbf = I(Vb[0], Vb[1]);
+    F<I> VdfLow = I(Vd[0], Vd[0]);
+    F<I> VgfLow = I(Vg[0], Vg[0]);
+    F<I> VsfLow = I(Vs[0], Vs[0]);
+
+    F<I> VdfHigh = I(Vd[1], Vd[1]);
+    F<I> VgfHigh = I(Vg[1], Vg[1]);
+    F<I> VsfHigh = I(Vs[1], Vs[1]);
+    F<I> ids1, ids2;
+    if (fetType == 'n'){
+        if (Vs[1] <= Vd[0]){
+            ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
+        }
+        else if(Vd[1] < Vs[0]){
+            ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
+        }
+        else{
+            ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
+        }
+    }
+    else{
+        if (Vd[1] <= Vs[0]){
+            ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
+        }
+        else if(Vs[1] < Vd[0]){
+            ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
+        }
+        else{
+            ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
+            ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
+        }
+    }
+    ids[0] = ids1.v.l();
+    ids[1] = ids2.v.u();
+}
+
+// Python friendly gradient function for nfet
+MyListOfList mvs_idnGradPy(const MyList& Vd, 
+                            const MyList& Vg,
+                            const MyList& Vs,
+                            const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double jac[8];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsGradVals(V, V + 2, V + 4, V + 6, 'n', jac);
+    }
+    MyListOfList overallJac;
+    for (int i = 0; i < 4; i++){
+        overallJac.push_back(MyList(jac + 2*i, jac + 2*i + 2));
+    }
     return overallJac;
 
 }
 
+// Evaluate ids for the intervals Vd = [V[0], V[1]], Vg = [V[2], V[3]],
+// Vs = [V[4], V[5]] and Vb = [V[6], V[7]] and write [lo, hi] to ids
+void mvs_idsVals(const double* V, char fetType, double* ids) const{
+    F<I> Vdf = I(V[0], V[1]);
+    F<I> Vgf = I(V[2], V[3]);
+    F<I> Vsf = I(V[4], V[5]);
+    F<I> Vbf = I(V[6], V[7]);
+    F<I> idsf = mvs_ids(Vdf, Vgf, Vsf, Vbf, fetType);
+    ids[0] = idsf.v.l();
+    ids[1] = idsf.v.u();
+}
 
 // Python friendly nfet ids function
 MyList mvs_idnPy(const MyList& Vd,
                     const MyList& Vg,
                     const MyList& Vs,
-                    const MyList& Vb){
-    F<I> Vdf = I(Vd[0], Vd[1]);
-    F<I> Vgf = I(Vg[0], Vg[1]);
-    F<I> Vsf = I(Vs[0], Vs[1]);
-    F<I> Vbf = I(Vb[0], Vb[1]);
-    char fetType = 'n';
-    F<I> ids = mvs_ids(Vdf, Vgf, Vsf, Vbf, fetType);
-    MyList idsVec;
-    idsVec.push_back(ids.v.l());
-    idsVec.push_back(ids.v.u());
-    return idsVec;
+                    const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double ids[2];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsVals(V, 'n', ids);
+    }
+    return MyList(ids, ids + 2);
 
 }
 
@@ -474,47 +702,14 @@ MyList mvs_idnPy(const MyList& Vd,
 MyList mvs_idnMonPy(const MyList& Vd,
                     const MyList& Vg,
                     const MyList& Vs,
-                    const MyList& Vb){
-    F<I> Vbf = I(Vb[0], Vb[1]);     
-    F<I> VdfLow = I(Vd[0], Vd[0]);
-    F<I> VgfLow = I(Vg[0], Vg[0]);
-    F<I> VsfLow = I(Vs[0], Vs[0]);
-
-    F<I> VdfHigh = I(Vd[1], Vd[1]);
-    F<I> VgfHigh = I(Vg[1], Vg[1]);
-    F<I> VsfHigh = I(Vs[1], Vs[1]);
-    char fetType = 'n';
-    //std::cout << "Vbf " << Vbf << "\n";
-    //std::cout << "VdfLow " << VdfLow << " VgfLow " << VgfLow << " VsfLow " << VsfLow << "\n"; 
-    //std::cout << "VdfHigh " << VdfHigh << " VgfHigh " << VgfHigh << " VsfHigh " << VsfHigh << "\n"; 
-    if (Vs[1] <= Vd[0]){
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-        return ids;
-    }
-    else if(Vd[1] < Vs[0] ){
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-        return ids;
-
-    }
-    else{
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-        return ids;
+                    const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double ids[2];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsMon(V, V + 2, V + 4, V + 6, 'n', ids);
     }
-
-
-    return mvs_idnPy(Vd, Vg, Vs, Vb);
+    return MyList(ids, ids + 2);
 
 }
 
@@ -522,17 +717,14 @@ MyList mvs_idnMonPy(const MyList& Vd,
 MyList mvs_idpPy(const MyList& Vd,
                     const MyList& Vg,
                     const MyList& Vs,
-                    const MyList& Vb){
-    F<I> Vdf = I(Vd[0], Vd[1]);
-    F<I> Vgf = I(Vg[0], Vg[1]);
-    F<I> Vsf = I(Vs[0], Vs[1]);
-    F<I> Vbf = I(Vb[0], Vb[1]);
-    char fetType = 'p';
-    F<I> ids = mvs_ids(Vdf, Vgf, Vsf, Vbf, fetType);
-    MyList idsVec;
-    idsVec.push_back(ids.v.l());
-    idsVec.push_back(ids.v.u());
-    return idsVec;
+                    const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double ids[2];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsVals(V, 'p', ids);
+    }
+    return MyList(ids, ids + 2);
 
 }
 
@@ -542,46 +734,14 @@ MyList mvs_idpPy(const MyList& Vd,
 MyList mvs_idpMonPy(const MyList& Vd,
                     const MyList& Vg,
                     const MyList& Vs,
-                    const MyList& Vb){
-    F<I> Vbf = I(Vb[0], Vb[1]);     
-    F<I> VdfLow = I(Vd[0], Vd[0]);
-    F<I> VgfLow = I(Vg[0], Vg[0]);
-    F<I> VsfLow = I(Vs[0], Vs[0]);
-
-    F<I> VdfHigh = I(Vd[1], Vd[1]);
-    F<I> VgfHigh = I(Vg[1], Vg[1]);
-    F<I> VsfHigh = I(Vs[1], Vs[1]);
-    char fetType = 'p';
-    //std::cout << "Vbf " << Vbf << "\n";
-    //std::cout << "VdfLow " << VdfLow << " VgfLow " << VgfLow << " VsfLow " << VsfLow << "\n"; 
-    //std::cout << "VdfHigh " << VdfHigh << " VgfHigh " << VgfHigh << " VsfHigh " << VsfHigh << "\n"; 
-    if (Vd[1] <= Vs[0] ){
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfHigh, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-
-        return ids;
-    }
-    else if(Vs[1] < Vd[0]){
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfHigh, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-        return ids;
-    }
-    else{
-        MyList ids;
-        F<I> ids1 = mvs_ids(VdfLow, VgfLow, VsfHigh, Vbf, fetType);
-        F<I> ids2 = mvs_ids(VdfHigh, VgfLow, VsfLow, Vbf, fetType);
-        ids.push_back(ids1.v.l());
-        ids.push_back(ids2.v.u());
-        return ids;
+                    const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double ids[2];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsMon(V, V + 2, V + 4, V + 6, 'p', ids);
     }
-
-    return mvs_idpPy(Vd, Vg, Vs, Vb);
+    return MyList(ids, ids + 2);
 
 }
 
@@ -590,28 +750,94 @@ MyList mvs_idpMonPy(const MyList& Vd,
 MyListOfList mvs_idpGradPy(const MyList& Vd, 
                             const MyList& Vg,
                             const MyList& Vs,
-                            const MyList& Vb){
-    I Vdf = I(Vd[0], Vd[1]);
-    I Vgf = I(Vg[0], Vg[1]);
-    I Vsf = I(Vs[0], Vs[1]);
-    I Vbf = I(Vb[0], Vb[1]);
-    char fetType = 'p';
-    std::vector<I> jac = mvs_idsGrad(Vdf, Vgf, Vsf, Vbf, fetType);
-    double jacAr0[] = {jac[0].l(), jac[0].u()};
-    MyList jac0(jacAr0, jacAr0 + 2);
-    double jacAr1[] = {jac[1].l(), jac[1].u()};
-    MyList jac1(jacAr1, jacAr1 + 2);
-    double jacAr2[] = {jac[2].l(), jac[2].u()};
-    MyList jac2(jacAr2, jacAr2 + 2);
-    double jacAr3[] = {jac[3].l(), jac[3].u()};
-    MyList jac3(jacAr3, jacAr3 + 2);
-
-    MyList overallJacAr[] = {jac0, jac1, jac2, jac3};
-    MyListOfList overallJac (overallJacAr, overallJacAr+4);
+                            const MyList& Vb) const{
+    double V[8] = {Vd[0], Vd[1], Vg[0], Vg[1], Vs[0], Vs[1], Vb[0], Vb[1]};
+    double jac[8];
+    {
+        ScopedGILRelease noGil;
+        mvs_idsGradVals(V, V + 2, V + 4, V + 6, 'p', jac);
+    }
+    MyListOfList overallJac;
+    for (int i = 0; i < 4; i++){
+        overallJac.push_back(MyList(jac + 2*i, jac + 2*i + 2));
+    }
     return overallJac;
 }
 
+// Batch version of mvs_idsMon. Vd, Vg, Vs and Vb are float64 arrays
+// of shape (N, 2) holding one interval per device.
+// Returns a numpy array of shape (N, 2) with the interval ids of each device
+object mvs_idsMonBatch(object Vd, object Vg, object Vs, object Vb, char fetType) const{
+    DoubleArray VdA(Vd, false), VgA(Vg, false), VsA(Vs, false), VbA(Vb, false);
+    Py_ssize_t numDevices = VdA.numIntervals();
+    VgA.checkNumIntervals(numDevices);
+    VsA.checkNumIntervals(numDevices);
+    VbA.checkNumIntervals(numDevices);
+
+    object ids = import("numpy").attr("empty")(make_tuple(numDevices, 2));
+    DoubleArray idsA(ids, true);
+    {
+        ScopedGILRelease noGil;
+        for (Py_ssize_t i = 0; i < numDevices; i++){
+            mvs_idsMon(VdA.data() + 2*i, VgA.data() + 2*i, VsA.data() + 2*i,
+                        VbA.data() + 2*i, fetType, idsA.data() + 2*i);
+        }
+    }
+    return ids;
+}
 
+// Batch version of mvs_idsGradVals. Vd, Vg, Vs and Vb are float64 arrays
+// of shape (N, 2) holding one interval per device.
+// Returns a numpy array of shape (N, 4, 2) with the interval partial derivatives
+// of each device with respect to Vd, Vg, Vs and Vb
+object mvs_idsGradBatch(object Vd, object Vg, object Vs, object Vb, char fetType) const{
+    DoubleArray VdA(Vd, false), VgA(Vg, false), VsA(Vs, false), VbA(Vb, false);
+    Py_ssize_t numDevices = VdA.numIntervals();
+    VgA.checkNumIntervals(numDevices);
+    VsA.checkNumIntervals(numDevices);
+    VbA.checkNumIntervals(numDevices);
+
+    object jac = import("numpy").attr("empty")(make_tuple(numDevices, 4, 2));
+    DoubleArray jacA(jac, true);
+    {
+        ScopedGILRelease noGil;
+        for (Py_ssize_t i = 0; i < numDevices; i++){
+            mvs_idsGradVals(VdA.data() + 2*i, VgA.data() + 2*i, VsA.data() + 2*i,
+                            VbA.data() + 2*i, fetType, jacA.data() + 8*i);
+        }
+    }
+    return jac;
+}
+
+// Python friendly batch nfet ids function
+object mvs_idnMonBatchPy(object Vd, object Vg, object Vs, object Vb) const{
+    return mvs_idsMonBatch(Vd, Vg, Vs, Vb, 'n');
+}
+
+// Python friendly batch pfet ids function
+object mvs_idpMonBatchPy(object Vd, object Vg, object Vs, object Vb) const{
+    return mvs_idsMonBatch(Vd, Vg, Vs, Vb, 'p');
+}
+
+// Python friendly batch nfet gradient function
+object mvs_idnGradBatchPy(object Vd, object Vg, object Vs, object Vb) const{
+    return mvs_idsGradBatch(Vd, Vg, Vs, Vb, 'n');
+}
+
+// Python friendly batch pfet gradient function
+object mvs_idpGradBatchPy(object Vd, object Vg, object Vs, object Vb) const{
+    return mvs_idsGradBatch(Vd, Vg, Vs, Vb, 'p');
+}
+
+
+};
+
+// Pickles an StMosfet as the overrides it was constructed with so that
+// models holding one can be sent to processes started with spawn
+struct StMosfetPickleSuite : pickle_suite{
+    static tuple getinitargs(const StMosfet& mosfet){
+        return make_tuple(mosfet.nOverrides, mosfet.pOverrides);
+    }
 };
 
 // Exporting classes to python
@@ -623,11 +849,18 @@ BOOST_PYTHON_MODULE(stChannel_py){
         .def(vector_indexing_suite<MyListOfList>() );
 
     class_<StMosfet>("StMosfet")
+        .def(init<dict, dict>())
+        .def("params", &StMosfet::paramsPy)
         .def("mvs_idn", &StMosfet::mvs_idnPy)
         .def("mvs_idnMon", &StMosfet::mvs_idnMonPy)
         .def("mvs_idnGrad", &StMosfet::mvs_idnGradPy)
         .def("mvs_idp", &StMosfet::mvs_idpPy)
         .def("mvs_idpMon", &StMosfet::mvs_idpMonPy)
-        .def("mvs_idpGrad", &StMosfet::mvs_idpGradPy);
+        .def("mvs_idpGrad", &StMosfet::mvs_idpGradPy)
+        .def("mvs_idnMon_batch", &StMosfet::mvs_idnMonBatchPy)
+        .def("mvs_idnGrad_batch", &StMosfet::mvs_idnGradBatchPy)
+        .def("mvs_idpMon_batch", &StMosfet::mvs_idpMonBatchPy)
+        .def("mvs_idpGrad_batch", &StMosfet::mvs_idpGradBatchPy)
+        .def_pickle(StMosfetPickleSuite());
 }
 
@@ -0,0 +1,159 @@
+# Sinks for the trace of operations kept by the solver in
+# statVars['stringHyperList']. Every interval evaluation, Krawczyk call,
+# LP call and bisection adds an entry like ("ia", True) or ("b", [lHyp, rHyp]).
+# A plain list keeps every entry in memory. The sinks here either drop the
+# entries (NullTrace), keep only the last few (RingTrace) or write them
+# to a file as they come (StreamTrace) which can be read back with readTrace
+
+import collections
+import struct
+import numpy as np
+
+# Tags used by StreamTrace to encode the values in an entry
+NONE_TAG = 0
+BOOL_TAG = 1
+FLOAT_TAG = 2
+ARRAY_TAG = 3
+LIST_TAG = 4
+
+# Kinds of entries written by the solver. Kinds not in this list
+# are written with their name
+TRACE_KINDS = ["i", "ia", "g", "b", "l"]
+
+
+# Trace sink that drops every entry
+class NullTrace:
+	def append(self, entry):
+		pass
+
+	def extend(self, entries):
+		pass
+
+	def close(self):
+		pass
+
+	def __len__(self):
+		return 0
+
+	def __iter__(self):
+		return iter([])
+
+
+# True if the entries appended to sink are kept, so that the solver only
+# builds entries that are expensive to compute when they are used. A plain
+# list and the sinks other than NullTrace keep them
+def isTraceEnabled(sink):
+	return not(isinstance(sink, NullTrace))
+
+
+# Trace sink that only keeps the last maxLen entries
+class RingTrace:
+	# @param maxLen maximum number of entries kept
+	def __init__(self, maxLen=10000):
+		self.entries = collections.deque(maxlen=maxLen)
+
+	def append(self, entry):
+		self.entries.append(entry)
+
+	def extend(self, entries):
+		self.entries.extend(entries)
+
+	def close(self):
+		pass
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __iter__(self):
+		return iter(self.entries)
+
+
+# Trace sink that writes every entry to a binary file. Each entry is written
+# as a byte for its kind followed by its value. Values are encoded as a tag byte
+# followed by the value: nothing for None, a byte for booleans, a double for
+# numbers, the shape and the doubles for arrays and the length and the items
+# for lists and tuples
+class StreamTrace:
+	# @param fileName name of the file the trace is written to
+	def __init__(self, fileName):
+		self.traceFile = open(fileName, "wb")
+		self.numEntries = 0
+
+	def append(self, entry):
+		kind, value = entry
+		if kind in TRACE_KINDS:
+			self.traceFile.write(struct.pack("<B", TRACE_KINDS.index(kind)))
+		else:
+			kindBytes = kind.encode("utf-8")
+			self.traceFile.write(struct.pack("<BB", 255, len(kindBytes)))
+			self.traceFile.write(kindBytes)
+		self.writeValue(value)
+		self.numEntries += 1
+
+	def extend(self, entries):
+		for entry in entries:
+			self.append(entry)
+
+	def writeValue(self, value):
+		if value is None:
+			self.traceFile.write(struct.pack("<B", NONE_TAG))
+		elif isinstance(value, (bool, np.bool_)):
+			self.traceFile.write(struct.pack("<BB", BOOL_TAG, bool(value)))
+		elif isinstance(value, np.ndarray):
+			self.traceFile.write(struct.pack("<BB", ARRAY_TAG, value.ndim))
+			self.traceFile.write(struct.pack("<" + "I"*value.ndim, *value.shape))
+			self.traceFile.write(np.ascontiguousarray(value, dtype="<f8").tobytes())
+		elif isinstance(value, (list, tuple)):
+			self.traceFile.write(struct.pack("<BI", LIST_TAG, len(value)))
+			for item in value:
+				self.writeValue(item)
+		else:
+			self.traceFile.write(struct.pack("<Bd", FLOAT_TAG, value))
+
+	def close(self):
+		if not(self.traceFile.closed):
+			self.traceFile.close()
+
+	def __len__(self):
+		return self.numEntries
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, tb):
+		self.close()
+
+
+def readValue(traceFile):
+	tag = struct.unpack("<B", traceFile.read(1))[0]
+	if tag == NONE_TAG:
+		return None
+	if tag == BOOL_TAG:
+		return struct.unpack("<B", traceFile.read(1))[0] == 1
+	if tag == FLOAT_TAG:
+		return struct.unpack("<d", traceFile.read(8))[0]
+	if tag == ARRAY_TAG:
+		ndim = struct.unpack("<B", traceFile.read(1))[0]
+		shape = struct.unpack("<" + "I"*ndim, traceFile.read(4*ndim))
+		numBytes = 8*int(np.prod(shape))
+		return np.frombuffer(traceFile.read(numBytes), dtype="<f8").reshape(shape).copy()
+	if tag == LIST_TAG:
+		length = struct.unpack("<I", traceFile.read(4))[0]
+		return [readValue(traceFile) for i in range(length)]
+	raise Exception("traceUtils.py readValue: unknown tag " + str(tag))
+
+# Read back the entries written by StreamTrace to fileName one at a time.
+# Tuples are read back as lists
+def readTrace(fileName):
+	with open(fileName, "rb") as traceFile:
+		while True:
+			kindByte = traceFile.read(1)
+			if len(kindByte) == 0:
+				return
+			kindIndex = struct.unpack("<B", kindByte)[0]
+			if kindIndex == 255:
+				kindLen = struct.unpack("<B", traceFile.read(1))[0]
+				kind = traceFile.read(kindLen).decode("utf-8")
+			else:
+				kind = TRACE_KINDS[kindIndex]
+			yield (kind, readValue(traceFile))